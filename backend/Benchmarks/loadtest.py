@@ -0,0 +1,193 @@
+"""
+Load generator for the Flask API
+
+Drives /api/profiler, /api/recommender and /api/assistant at a target request rate
+(open loop: requests are sent on schedule whether or not earlier ones have returned)
+and reports p50/p95/p99 latency, throughput and status codes per endpoint.
+
+Run the API against the offline model so benchmarks neither cost money nor depend on xAI:
+
+    LLM_BACKEND=mock MOCK_LLM_LATENCY_SECONDS=0.8 python backend/api.py
+    python backend/Benchmarks/loadtest.py --rps 20 --duration 60 --no-cache
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+PROFILER_ACTIONS = ['analyze_behavior', 'identify_learning_style', 'calculate_engagement', 'get_full_profile']
+RECOMMENDER_ACTIONS = ['recommend_content', 'build_learning_path', 'get_next_content']
+GOALS = ['Devenir Data Analyst', 'Maîtriser Python', 'Manager une équipe']
+QUESTIONS = [
+    "Qu'est-ce que le machine learning ?",
+    "Comment progresser en SQL ?",
+    "Quelle est ma progression ce mois-ci ?",
+    "Je n'arrive pas à lancer une vidéo, que faire ?"
+]
+
+
+def build_request(endpoint, user_id, no_cache):
+    """
+    Build a realistic request body for an endpoint
+    """
+    if endpoint == 'profiler':
+        body = {'user_id': user_id, 'action': random.choice(PROFILER_ACTIONS)}
+    elif endpoint == 'recommender':
+        body = {'user_id': user_id, 'action': random.choice(RECOMMENDER_ACTIONS)}
+        if body['action'] == 'build_learning_path':
+            body['goal'] = random.choice(GOALS)
+    else:
+        body = {'user_id': user_id, 'question': random.choice(QUESTIONS)}
+
+    # Also bypasses the assistant's semantic answer cache
+    if no_cache:
+        body['no_cache'] = True
+    return body
+
+
+def send(base_url, endpoint, body, timeout, scheduled_at=None):
+    """
+    POST one request and return (status code, latency in seconds)
+
+    Latency is measured from `scheduled_at` (a perf_counter time) when given, so time spent
+    waiting for a free sender counts (no coordinated omission), else from the send.
+    """
+    data = json.dumps(body).encode('utf-8')
+    req = urllib.request.Request(
+        f"{base_url}/api/{endpoint}", data=data, headers={'Content-Type': 'application/json'}, method='POST'
+    )
+    started = time.perf_counter() if scheduled_at is None else scheduled_at
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0  # Connection error or client-side timeout
+    return status, time.perf_counter() - started
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(1, rank)) - 1]
+
+
+def summarize(samples, elapsed):
+    """
+    Latency percentiles (ms), throughput and status codes for a list of (status, latency) samples
+    """
+    latencies = sorted(latency for _, latency in samples)
+    statuses = {}
+    for status, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    succeeded = sum(1 for status, _ in samples if 200 <= status < 300)
+
+    return {
+        'requests': len(samples),
+        'succeeded': succeeded,
+        'error_rate': round(1 - succeeded / len(samples), 4) if samples else 0.0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(1000 * percentile(latencies, 0.50), 1),
+        'p95_ms': round(1000 * percentile(latencies, 0.95), 1),
+        'p99_ms': round(1000 * percentile(latencies, 0.99), 1),
+        'max_ms': round(1000 * latencies[-1], 1) if latencies else 0.0,
+        'status_codes': statuses
+    }
+
+
+def run_load(base_url, endpoints, rps, duration, users, no_cache, timeout, max_in_flight):
+    """
+    Send requests at `rps` for `duration` seconds, spread over the endpoints, and
+    return the per-endpoint and overall summaries
+    """
+    results = {endpoint: [] for endpoint in endpoints}
+    lock = threading.Lock()
+    user_ids = [f"U{index:04d}" for index in range(1, users + 1)]
+
+    def fire(endpoint, body, scheduled_at):
+        sample = send(base_url, endpoint, body, timeout, scheduled_at)
+        with lock:
+            results[endpoint].append(sample)
+
+    started = time.perf_counter()
+    total = int(rps * duration)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for index in range(total):
+            # Open loop: wait for this request's scheduled send time. Its latency counts from
+            # that time, so a request queued behind busy senders is not reported as fast
+            scheduled_at = started + index / rps
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            endpoint = endpoints[index % len(endpoints)]
+            executor.submit(fire, endpoint, build_request(endpoint, random.choice(user_ids), no_cache), scheduled_at)
+    elapsed = time.perf_counter() - started
+
+    report = {endpoint: summarize(samples, elapsed) for endpoint, samples in results.items()}
+    report['overall'] = summarize([sample for samples in results.values() for sample in samples], elapsed)
+    report['config'] = {'target_rps': rps, 'duration_seconds': duration, 'elapsed_seconds': round(elapsed, 2)}
+    return report
+
+
+def print_report(report):
+    header = f"{'endpoint':<14}{'reqs':>7}{'ok':>7}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  status codes"
+    print(header)
+    print("-" * len(header))
+    for name, summary in report.items():
+        if name == 'config':
+            continue
+        print(
+            f"{name:<14}{summary['requests']:>7}{summary['succeeded']:>7}{summary['throughput_rps']:>8}"
+            f"{summary['p50_ms']:>10}{summary['p95_ms']:>10}{summary['p99_ms']:>10}{summary['max_ms']:>10}"
+            f"  {summary['status_codes']}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Edflex Personalised Learning API")
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--endpoints', default='profiler,recommender,assistant',
+                        help="Comma-separated endpoints, requests are spread evenly over them")
+    parser.add_argument('--rps', type=float, default=10, help="Target requests per second")
+    parser.add_argument('--duration', type=float, default=30, help="Test duration in seconds")
+    parser.add_argument('--users', type=int, default=100, help="Number of distinct learner ids")
+    parser.add_argument('--no-cache', action='store_true', help="Bypass the response and semantic answer caches")
+    parser.add_argument('--timeout', type=float, default=300, help="Per-request timeout in seconds")
+    parser.add_argument('--max-in-flight', type=int, default=512, help="Maximum concurrent client connections")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    endpoints = [endpoint.strip() for endpoint in args.endpoints.split(',') if endpoint.strip()]
+    unknown = set(endpoints) - {'profiler', 'recommender', 'assistant'}
+    if unknown or not endpoints:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown)) or '(none given)'}")
+
+    report = run_load(
+        args.base_url.rstrip('/'), endpoints, args.rps, args.duration,
+        args.users, args.no_cache, args.timeout, args.max_in_flight
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    return 0 if report['overall']['requests'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Prompt size report per API action
+
+For every profiler / recommender action, compares the input sent on each model call by
+the full agent (complete description, instructions, examples and every tool schema) with
+the action-scoped compact agent (see ActionPrompts.py):
+
+    python backend/Benchmarks/prompt_tokens.py
+    python backend/Benchmarks/prompt_tokens.py --json
+
+Tokens are counted with tiktoken when it is installed, otherwise estimated at 4
+characters per token.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'Modules', 'PersonnalisationAndRecommendation'))
+
+# Prompt sizes do not depend on the model; avoid building provider clients
+os.environ.setdefault('LLM_BACKEND', 'mock')
+
+from Modules.PersonnalisationAndRecommendation.PersonalisedLearning import (
+    create_learner_profiler_agent,
+    create_path_recommender_agent,
+    create_action_agent
+)
+from ActionPrompts import ACTION_PROMPTS
+
+
+FULL_AGENT_FACTORIES = {
+    'learner_profiler': create_learner_profiler_agent,
+    'path_recommender': create_path_recommender_agent
+}
+
+
+def get_token_counter():
+    """
+    Return (count function, estimator name)
+    """
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding('cl100k_base')
+        return (lambda text: len(encoding.encode(text))), 'tiktoken cl100k_base'
+    except ImportError:
+        return (lambda text: max(1, len(text) // 4)), 'estimate (4 chars/token)'
+
+
+def prompt_sizes(agent, count_tokens):
+    """
+    Return the token counts of the system message and of the tool schemas sent with each model call
+    """
+    session_id = 'prompt-token-report'
+    agent.determine_tools_for_model(model=agent.model, session_id=session_id)
+    system_message = agent.get_system_message(session_id=session_id)
+    system_text = system_message.get_content_string() if system_message is not None else ''
+    tools_text = json.dumps(agent._tools_for_model or [])
+
+    system_tokens = count_tokens(system_text)
+    tools_tokens = count_tokens(tools_text)
+    return {
+        'system_tokens': system_tokens,
+        'tools_tokens': tools_tokens,
+        'tool_count': len(agent._tools_for_model or []),
+        'total_tokens': system_tokens + tools_tokens
+    }
+
+
+def build_report():
+    count_tokens, estimator = get_token_counter()
+    full_sizes = {name: prompt_sizes(factory(), count_tokens) for name, factory in FULL_AGENT_FACTORIES.items()}
+
+    actions = []
+    for (agent_name, action) in ACTION_PROMPTS:
+        full = full_sizes[agent_name]
+        compact = prompt_sizes(create_action_agent(agent_name, action), count_tokens)
+        actions.append({
+            'agent': agent_name,
+            'action': action,
+            'full': full,
+            'compact': compact,
+            'saved_tokens': full['total_tokens'] - compact['total_tokens'],
+            'saved_percent': round(100 * (1 - compact['total_tokens'] / full['total_tokens']), 1)
+        })
+
+    return {'estimator': estimator, 'actions': actions}
+
+
+def print_report(report):
+    print(f"Prompt tokens per model call ({report['estimator']})\n")
+    header = f"{'agent':<18}{'action':<26}{'full':>8}{'compact':>9}{'tools':>8}{'saved':>8}{'saved %':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in report['actions']:
+        print(
+            f"{row['agent']:<18}{row['action']:<26}{row['full']['total_tokens']:>8}{row['compact']['total_tokens']:>9}"
+            f"{row['full']['tool_count']:>4}>{row['compact']['tool_count']:<3}{row['saved_tokens']:>8}{row['saved_percent']:>8}%"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare full and compact prompt sizes per API action")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = build_report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
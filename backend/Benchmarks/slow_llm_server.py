@@ -0,0 +1,170 @@
+"""
+Local stand-in for the xAI chat completions API with injected slowness and errors
+
+Answers OpenAI-compatible /v1/chat/completions requests (streaming or not) with a short
+text answer after a configurable delay, so deadline budgets, hedging and the circuit
+breaker can be exercised without calling xAI. Faults can be changed while the API runs:
+
+    python backend/Benchmarks/slow_llm_server.py --port 8400 --latency 0.5 --slow-rate 0.05 --slow-latency 20
+    XAI_BASE_URL=http://localhost:8400/v1 XAI_API_KEY=local python backend/api.py
+
+    # Simulate an outage: every call fails, then recover
+    curl -X POST localhost:8400/faults -d '{"error_rate": 1.0}'
+    curl -X POST localhost:8400/faults -d '{"error_rate": 0.0}'
+
+The answer never calls tools, so every agent run is a single model call.
+"""
+
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+ANSWER = "Réponse du serveur de substitution: le modèle n'a pas été appelé."
+
+
+class Faults:
+    """
+    Injected latency and error settings, editable at runtime through /faults.
+    """
+
+    FIELDS = ('latency', 'jitter', 'slow_rate', 'slow_latency', 'error_rate', 'error_status')
+
+    def __init__(self, **settings):
+        self._lock = threading.Lock()
+        self._settings = dict(settings)
+        self.calls = 0
+
+    def get(self):
+        with self._lock:
+            return {**self._settings, 'calls': self.calls}
+
+    def update(self, changes):
+        unknown = set(changes) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fault settings: {', '.join(sorted(unknown))}")
+        with self._lock:
+            self._settings.update(changes)
+            return dict(self._settings)
+
+    def draw(self):
+        """
+        Return (delay in seconds, error status or None) for one call.
+        """
+        with self._lock:
+            self.calls += 1
+            settings = dict(self._settings)
+        if random.random() < settings['error_rate']:
+            return settings['latency'], int(settings['error_status'])
+        base = settings['slow_latency'] if random.random() < settings['slow_rate'] else settings['latency']
+        return max(0.0, base + random.uniform(-settings['jitter'], settings['jitter'])), None
+
+
+def make_handler(faults):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def do_GET(self):
+            if self.path == '/faults':
+                return self._json(200, faults.get())
+            self._json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path == '/faults':
+                try:
+                    return self._json(200, faults.update(self._body()))
+                except ValueError as e:
+                    return self._json(400, {'error': str(e)})
+
+            if not self.path.endswith('/chat/completions'):
+                return self._json(404, {'error': 'not found'})
+
+            request = self._body()
+            delay, error_status = faults.draw()
+            time.sleep(delay)
+            if error_status is not None:
+                return self._json(error_status, {'error': {'message': 'Injected failure', 'type': 'server_error'}})
+
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            model = request.get('model', 'grok-3')
+            prompt_tokens = sum(len(str(message.get('content') or '')) for message in request.get('messages', [])) // 4
+            usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': len(ANSWER) // 4,
+                     'total_tokens': prompt_tokens + len(ANSWER) // 4}
+
+            if not request.get('stream'):
+                return self._json(200, {
+                    'id': completion_id,
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': model,
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': ANSWER}, 'finish_reason': 'stop'}],
+                    'usage': usage
+                })
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model}
+            events = [
+                {**chunk, 'choices': [{'index': 0, 'delta': {'role': 'assistant', 'content': word}, 'finish_reason': None}]}
+                for word in ANSWER.split(' ')
+            ]
+            events.append({**chunk, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}], 'usage': usage})
+            for index, event in enumerate(events):
+                if index and index < len(events) - 1:
+                    event['choices'][0]['delta']['content'] = ' ' + event['choices'][0]['delta']['content']
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8400)
+    parser.add_argument('--latency', type=float, default=0.5, help="Seconds per call (default: 0.5)")
+    parser.add_argument('--jitter', type=float, default=0.1, help="Random latency variation, in seconds (default: 0.1)")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="Share of calls answered after --slow-latency")
+    parser.add_argument('--slow-latency', type=float, default=30.0, help="Seconds per slow call (default: 30)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of calls failing with --error-status")
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args(argv)
+
+    faults = Faults(
+        latency=args.latency, jitter=args.jitter, slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency, error_rate=args.error_rate, error_status=args.error_status
+    )
+    server = ThreadingHTTPServer(('0.0.0.0', args.port), make_handler(faults))
+    server.daemon_threads = True
+    print(f"Stand-in model server on http://localhost:{args.port}/v1 (faults: {faults.get()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
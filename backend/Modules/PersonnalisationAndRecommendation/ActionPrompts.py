@@ -0,0 +1,187 @@
+"""
+Action-scoped compact prompts
+
+The agents in PersonalisedLearning.py carry every responsibility, tool guideline, output
+schema and worked example on every run. For a narrow API action such as
+`calculate_engagement` most of it is dead weight, and input tokens dominate latency and
+cost. Each entry below keeps only the instructions and tools one action needs; it is
+used by `create_action_agent()` when the API runs in compact prompt mode.
+
+Run `python backend/Benchmarks/prompt_tokens.py` to compare prompt sizes per action.
+"""
+
+from textwrap import dedent
+from agno.tools.reasoning import ReasoningTools
+from agno.tools.calculator import CalculatorTools
+from Tools.learner_tools import (
+    get_learner_behavior_history,
+    calculate_learning_style_score,
+    identify_skill_gaps,
+    get_engagement_metrics,
+    get_learner_profile_from_db
+)
+from Tools.recommendation_tools import (
+    get_learner_profile,
+    search_content_catalog,
+    calculate_content_relevance_score,
+    build_learning_path,
+    get_next_best_content,
+    log_recommendation,
+    check_prerequisite_completion,
+    get_content_metadata
+)
+
+
+PROFILER_ROLE = "Analyze learner behavior and build comprehensive learner profiles."
+RECOMMENDER_ROLE = "Generate personalized learning paths and content recommendations."
+
+PROFILER_DESCRIPTION = "You are the Learner Profiler Agent of Edflex's Personalized Learning module."
+RECOMMENDER_DESCRIPTION = "You are the Path Recommender Agent of Edflex's Personalized Learning module."
+
+# Rules shared by every action of an agent (kept from the full instructions)
+PROFILER_RULES = dedent("""
+    ## RULES
+    1. Answer ONLY from tool data - never invent or assume profile attributes
+    2. If data is missing, state "No data available for [field]"
+    3. Never expose raw interaction logs - only aggregated insights
+    4. When uncertain, include a confidence score (0-1)
+""")
+
+RECOMMENDER_RULES = dedent("""
+    ## RULES
+    1. Every recommendation must have a clear "why"
+    2. Only recommend content returned by the tools - never invent content
+    3. Never recommend advanced content whose prerequisites are not met
+    4. Compliance and mandatory training always take priority
+""")
+
+
+# (agent, action) -> description, instructions and a factory for the action's tools
+# (toolkits are instantiated per agent; @tool functions are shared)
+ACTION_PROMPTS = {
+    ('learner_profiler', 'analyze_behavior'): {
+        'role': PROFILER_ROLE,
+        'description': PROFILER_DESCRIPTION,
+        'instructions': dedent("""
+            ## TASK: Analyze learning behavior
+            1. Call `get_learner_behavior_history(user_id, days_back=30)`
+            2. Identify consumption patterns: preferred times, session lengths, content formats
+            3. Compute completion rates and time-on-content (use the calculator for averages)
+            4. Detect drop-off points and content preferences
+            5. Return the patterns found and 2-3 actionable insights
+        """) + PROFILER_RULES,
+        'tools': lambda: [CalculatorTools(), get_learner_behavior_history]
+    },
+    ('learner_profiler', 'identify_learning_style'): {
+        'role': PROFILER_ROLE,
+        'description': PROFILER_DESCRIPTION,
+        'instructions': dedent("""
+            ## TASK: Identify the learning style
+            1. Call `calculate_learning_style_score(user_id)` (scores 0-100 per style)
+            2. Classify the dominant style: visual, auditory, reading-writing or kinesthetic
+            3. Return the scores, the dominant style and the content formats it implies
+        """) + PROFILER_RULES,
+        'tools': lambda: [calculate_learning_style_score]
+    },
+    ('learner_profiler', 'detect_skill_gaps'): {
+        'role': PROFILER_ROLE,
+        'description': PROFILER_DESCRIPTION,
+        'instructions': dedent("""
+            ## TASK: Detect skill gaps
+            1. If the job role is not given, read it from `get_learner_profile_from_db(user_id)`
+            2. Call `identify_skill_gaps(user_id, job_role)`
+            3. Prioritize gaps by business criticality (compliance > strategic > nice-to-have),
+               then quick wins, then learner interest
+            4. Return the top 3-5 gaps with priority (high/medium/low) and justification
+        """) + PROFILER_RULES,
+        'tools': lambda: [get_learner_profile_from_db, identify_skill_gaps]
+    },
+    ('learner_profiler', 'calculate_engagement'): {
+        'role': PROFILER_ROLE,
+        'description': PROFILER_DESCRIPTION,
+        'instructions': dedent("""
+            ## TASK: Calculate engagement
+            1. Call `get_engagement_metrics(user_id, period_days=7)`
+            2. Classify the learner:
+               - At-risk: <2 sessions/week, <50% completion rate
+               - Engaged: >4 sessions/week, >70% completion rate
+               - Highly engaged: >7 sessions/week, >85% completion rate
+            3. Return the key metrics, the classification and the churn risk (low/medium/high)
+        """) + PROFILER_RULES,
+        'tools': lambda: [get_engagement_metrics]
+    },
+    ('learner_profiler', 'get_full_profile'): {
+        'role': PROFILER_ROLE,
+        'description': PROFILER_DESCRIPTION,
+        'instructions': dedent("""
+            ## TASK: Return the full learner profile
+            1. Call `get_learner_profile_from_db(user_id)`
+            2. Summarize learning style, content preferences, behavioral patterns, skill profile
+               and engagement metrics from the retrieved data
+        """) + PROFILER_RULES,
+        'tools': lambda: [get_learner_profile_from_db]
+    },
+    ('path_recommender', 'recommend_content'): {
+        'role': RECOMMENDER_ROLE,
+        'description': RECOMMENDER_DESCRIPTION,
+        'instructions': dedent("""
+            ## TASK: Recommend personalized content
+            1. Call `get_learner_profile(user_id)` to understand the learner
+            2. Identify the top priority (active path, compliance deadline, skill gap)
+            3. Call `search_content_catalog` with filters from the profile (skills, format, difficulty)
+            4. Rank candidates with `calculate_content_relevance_score`
+            5. Keep the top 5, varying formats and topics (max 2 consecutive videos)
+            6. Call `log_recommendation` for each recommended item
+            7. Return each item with rank, title, format, duration, relevance score and explanation
+        """) + RECOMMENDER_RULES,
+        'tools': lambda: [
+            ReasoningTools(add_instructions=True),
+            get_learner_profile,
+            search_content_catalog,
+            calculate_content_relevance_score,
+            log_recommendation
+        ]
+    },
+    ('path_recommender', 'build_learning_path'): {
+        'role': RECOMMENDER_ROLE,
+        'description': RECOMMENDER_DESCRIPTION,
+        'instructions': dedent("""
+            ## TASK: Build a learning path
+            1. Call `get_learner_profile(user_id)` to understand constraints and preferences
+            2. Call `build_learning_path(skill_target, user_id, max_content_items)`
+            3. Check prerequisite order, difficulty progression and total duration
+            4. Adapt to preferences (format, session length, weekly availability)
+            5. Return the path with milestones, estimated duration and why it is structured this way
+        """) + RECOMMENDER_RULES,
+        'tools': lambda: [CalculatorTools(), get_learner_profile, build_learning_path]
+    },
+    ('path_recommender', 'get_next_content'): {
+        'role': RECOMMENDER_ROLE,
+        'description': RECOMMENDER_DESCRIPTION,
+        'instructions': dedent("""
+            ## TASK: Recommend the next best content
+            1. Call `get_next_best_content(user_id, count=5)`
+            2. Use `get_content_metadata(content_id)` only if an explanation needs more detail
+            3. Return the items in order, each with a one-sentence explanation
+        """) + RECOMMENDER_RULES,
+        'tools': lambda: [get_next_best_content, get_content_metadata]
+    },
+    ('path_recommender', 'check_prerequisites'): {
+        'role': RECOMMENDER_ROLE,
+        'description': RECOMMENDER_DESCRIPTION,
+        'instructions': dedent("""
+            ## TASK: Check prerequisites
+            1. Call `check_prerequisite_completion(user_id, content_id)`
+            2. If prerequisites are missing, list them in the order they should be taken
+            3. Return whether the learner can start the content and what to do first otherwise
+        """) + RECOMMENDER_RULES,
+        'tools': lambda: [check_prerequisite_completion, get_content_metadata]
+    },
+}
+
+
+def supports_compact(agent_name, action):
+    """
+    Return True if an action has a compact prompt for this agent.
+    """
+    return (agent_name, action) in ACTION_PROMPTS
@@ -0,0 +1,214 @@
+"""
+Offline stand-in for the xAI model
+
+MockModel replays recorded responses and tool-call sequences (see recordings/*.json)
+with a configurable synthetic latency, so the API can be load-tested and benchmarked
+without calling xAI. A system prompt seen before is reported as cached tokens, like the
+provider's prompt cache. Tools are still executed for real by the agent; only the model
+round trips are simulated. When the agent asks for JSON output (response_model), a final
+step's recorded `json` is answered instead of its markdown `content`, so structured runs
+validate like they would against the provider.
+
+Select it with LLM_BACKEND=mock (see get_model() in PersonalisedLearning.py).
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import random
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(__file__), 'recordings')
+
+MOCK_LLM_LATENCY_SECONDS = float(os.getenv('MOCK_LLM_LATENCY_SECONDS', '0.5'))
+MOCK_LLM_LATENCY_JITTER = float(os.getenv('MOCK_LLM_LATENCY_JITTER', '0.2'))
+MOCK_LLM_STREAM_CHUNK_DELAY_SECONDS = float(os.getenv('MOCK_LLM_STREAM_CHUNK_DELAY_SECONDS', '0.01'))
+# Latency of the fast model tier relative to the standard one
+MOCK_LLM_FAST_LATENCY_FACTOR = float(os.getenv('MOCK_LLM_FAST_LATENCY_FACTOR', '0.4'))
+
+# Values substituted into the recordings, extracted from the API prompts
+PLACEHOLDER_PATTERNS = {
+    'user_id': [r"user_id:\s*([\w-]+)"],
+    'goal': [r"objectif:\s*(.+)"],
+    'question': [r"question:\s*(.+)"]
+}
+
+
+@lru_cache(maxsize=None)
+def load_recording(name: str) -> Dict:
+    """
+    Load a recording file (e.g. "learner_profiler") from the recordings directory.
+    """
+    with open(os.path.join(RECORDINGS_DIR, f"{name}.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _extract_placeholders(prompt: str) -> Dict[str, str]:
+    values = {}
+    for name, patterns in PLACEHOLDER_PATTERNS.items():
+        values[name] = ""
+        for pattern in patterns:
+            match = re.search(pattern, prompt)
+            if match:
+                values[name] = match.group(1).strip()
+                break
+    return values
+
+
+def _substitute(value: Any, values: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        for name, replacement in values.items():
+            value = value.replace("{" + name + "}", replacement)
+        return value
+    if isinstance(value, list):
+        return [_substitute(item, values) for item in value]
+    if isinstance(value, dict):
+        return {key: _substitute(item, values) for key, item in value.items()}
+    return value
+
+
+# System prompts already sent, to report them as cached like a provider-side prompt cache
+_seen_system_prompts = set()
+
+
+def _estimate_tokens(text: str) -> int:
+    # Roughly 4 characters per token, enough for relative benchmarks
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class MockModel(Model):
+    """
+    Model replaying a recorded conversation script instead of calling a provider.
+
+    Each recording holds scenarios; the first scenario whose `match` keywords appear in
+    the learner's prompt is replayed (an empty `match` list is the fallback). A scenario
+    is a list of steps, one per model call: either `tool_calls` or the final `content`
+    (with its structured `json` variant when the action has a response model).
+
+    Example:
+        >>> agent = Agent(model=MockModel(recording="learner_profiler", latency=0.2), tools=[...])
+        >>> agent.run("Calculer les métriques d'engagement de l'apprenant.\\n\\nuser_id: User123").content
+        "## Engagement de User123 (7 derniers jours) ..."
+    """
+
+    id: str = "mock-grok-3"
+    name: str = "MockModel"
+    provider: str = "Mock"
+
+    recording: str = "learner_profiler"
+    tier: str = "standard"
+    latency: float = MOCK_LLM_LATENCY_SECONDS
+    latency_jitter: float = MOCK_LLM_LATENCY_JITTER
+    stream_chunk_delay: float = MOCK_LLM_STREAM_CHUNK_DELAY_SECONDS
+
+    def _delay(self) -> float:
+        delay = max(0.0, self.latency + random.uniform(-self.latency_jitter, self.latency_jitter))
+        return delay * MOCK_LLM_FAST_LATENCY_FACTOR if self.tier == 'fast' else delay
+
+    def _next_step(self, messages: List[Message], json_output: bool = False) -> Dict:
+        # The current run starts at the last user message; the number of model calls
+        # made since then gives the position in the scenario
+        prompt = ""
+        calls_made = 0
+        for message in reversed(messages or []):
+            if message.role == 'user':
+                prompt = message.get_content_string() if hasattr(message, 'get_content_string') else str(message.content)
+                break
+            if message.role == 'assistant':
+                calls_made += 1
+
+        scenarios = load_recording(self.recording)['scenarios']
+        lowered = prompt.lower()
+        scenario = next(
+            (s for s in scenarios if not s['match'] or any(keyword.lower() in lowered for keyword in s['match'])),
+            scenarios[-1]
+        )
+        steps = scenario['steps']
+        step = _substitute(steps[min(calls_made, len(steps) - 1)], _extract_placeholders(prompt))
+        structured = step.pop('json', None)
+        if json_output and structured is not None:
+            step['content'] = json.dumps(structured, ensure_ascii=False)
+
+        input_text = "".join(str(message.content or "") for message in messages or [])
+        output_text = step.get('content') or json.dumps(step.get('tool_calls'))
+
+        cached_tokens = 0
+        if messages and messages[0].role == 'system':
+            system_prompt = str(messages[0].content or "")
+            if system_prompt in _seen_system_prompts:
+                cached_tokens = _estimate_tokens(system_prompt)
+            _seen_system_prompts.add(system_prompt)
+
+        return {
+            **step,
+            'usage': {
+                'input_tokens': _estimate_tokens(input_text),
+                'output_tokens': _estimate_tokens(output_text),
+                'cached_tokens': cached_tokens
+            }
+        }
+
+    def _chunks(self, step: Dict) -> List[Dict]:
+        if 'content' not in step:
+            return [step]
+        words = re.split(r"(?<=\s)", step['content'])
+        chunks = [{'content': "".join(words[i:i + 8])} for i in range(0, len(words), 8)]
+        # Usage is reported once, on the last chunk
+        chunks[-1]['usage'] = step['usage']
+        return chunks
+
+    def invoke(self, messages: List[Message], **kwargs) -> Dict:
+        time.sleep(self._delay())
+        return self._next_step(messages, kwargs.get('response_format') is not None)
+
+    async def ainvoke(self, messages: List[Message], **kwargs) -> Dict:
+        await asyncio.sleep(self._delay())
+        return self._next_step(messages, kwargs.get('response_format') is not None)
+
+    def invoke_stream(self, messages: List[Message], **kwargs) -> Iterator[Dict]:
+        time.sleep(self._delay())
+        for index, chunk in enumerate(self._chunks(self._next_step(messages, kwargs.get('response_format') is not None))):
+            if index:
+                time.sleep(self.stream_chunk_delay)
+            yield chunk
+
+    async def ainvoke_stream(self, messages: List[Message], **kwargs) -> AsyncIterator[Dict]:
+        await asyncio.sleep(self._delay())
+        for index, chunk in enumerate(self._chunks(self._next_step(messages, kwargs.get('response_format') is not None))):
+            if index:
+                await asyncio.sleep(self.stream_chunk_delay)
+            yield chunk
+
+    def parse_provider_response(self, response: Dict, **kwargs) -> ModelResponse:
+        model_response = ModelResponse(role="assistant")
+
+        if response.get('tool_calls'):
+            model_response.tool_calls = [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": call['name'], "arguments": json.dumps(call.get('arguments', {}))}
+                }
+                for call in response['tool_calls']
+            ]
+        if response.get('content') is not None:
+            model_response.content = response['content']
+        if response.get('usage'):
+            model_response.response_usage = response['usage']
+
+        return model_response
+
+    def parse_provider_response_delta(self, response: Dict) -> ModelResponse:
+        return self.parse_provider_response(response)
+
@@ -2,13 +2,10 @@ import os
 from agno.agent import Agent
 from textwrap import dedent
 from dotenv import load_dotenv
-from agno.models.xai import xAI
-from agno.vectordb.pgvector import PgVector
 from agno.tools.reasoning import ReasoningTools
 from agno.tools.calculator import CalculatorTools
-from agno.storage.sqlite import SqliteStorage
-from agno.memory.v2.db.sqlite import SqliteMemoryDb
-from agno.tools.exa import ExaTools
+from agno.tools.function import Function
+from Tools import learner_tools, recommendation_tools, assistant_tools
 from Tools.learner_tools import (
     track_content_interaction,
     get_learner_behavior_history,
@@ -27,6 +24,7 @@ from Tools.recommendation_tools import (
     check_prerequisite_completion,
     get_content_metadata
 )
+from ActionPrompts import ACTION_PROMPTS
 from Tools.assistant_tools import (
     search_edflex_knowledge_base,
     get_content_summary,
@@ -44,15 +42,110 @@ load_dotenv()
 
 EXA_API_KEY = os.getenv('EXA_API_KEY')
 XAI_API_KEY = os.getenv('XAI_API_KEY')
+# OpenAI-compatible endpoint of the xAI models; point it at Benchmarks/slow_llm_server.py to
+# test deadlines, hedging and the circuit breaker against a slow or failing provider
+XAI_BASE_URL = os.getenv('XAI_BASE_URL', 'https://api.x.ai/v1')
 db_url = "sqlite:///tmp/learner_profiler.db"
 db_file = "tmp/learner_profiler.db"
 
+# "xai" (default) or "mock" to replay recorded responses without calling xAI
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'xai')
 
-def create_learner_profiler_agent():
+# xAI model per tier: simple intents run on the fast tier, path building and multi-step
+# reasoning on the standard one (tiers are picked per request, see Services/model_router.py)
+MODEL_IDS = {
+    'fast': os.getenv('MODEL_FAST_ID', 'grok-3-mini'),
+    'standard': os.getenv('MODEL_STANDARD_ID', 'grok-3')
+}
+
+
+# Tools that write or notify: their result must never be reused within a run
+SIDE_EFFECT_TOOLS = frozenset({
+    'track_content_interaction',
+    'log_recommendation',
+    'log_chatbot_interaction',
+    'send_encouragement_notification'
+})
+
+
+def shared_tools(*modules):
+    """
+    Return the @tool functions defined in the given modules.
+    """
+    return [value for module in modules for value in vars(module).values() if isinstance(value, Function)]
+
+
+SHARED_TOOLS = shared_tools(learner_tools, recommendation_tools, assistant_tools)
+
+# Read-only tools whose result can be reused for identical calls within one run
+MEMOIZABLE_TOOLS = frozenset(function.name for function in SHARED_TOOLS) - SIDE_EFFECT_TOOLS
+
+
+def settle_tool_schemas(functions):
+    """
+    Process the shared @tool functions once, up front.
+
+    The @tool functions are module-level objects shared by every agent instance. Agno
+    derives their JSON schema on the first processing and adds `additionalProperties: false`
+    on every later one, so the first agent built would send different tool definitions than
+    all the others and miss the provider's prompt cache.
+    """
+    for function in functions:
+        function.process_entrypoint()
+
+
+settle_tool_schemas(SHARED_TOOLS)
+
+
+def get_model(agent_name, tier='standard'):
+    """
+    Return the model used by an agent on a model tier, according to LLM_BACKEND.
+
+    The mock backend replays Models/recordings/<agent_name>.json with synthetic latency
+    (MOCK_LLM_LATENCY_SECONDS, scaled by MOCK_LLM_FAST_LATENCY_FACTOR on the fast tier),
+    for benchmarks and load tests.
+    """
+    if LLM_BACKEND == 'mock':
+        from Models.mock_model import MockModel
+        return MockModel(recording=agent_name, id=f"mock-{MODEL_IDS[tier]}", tier=tier)
+
+    # Deferred: the xAI client pulls in the whole openai SDK
+    from agno.models.xai import xAI
+    return xAI(id=MODEL_IDS[tier], api_key=XAI_API_KEY, base_url=XAI_BASE_URL)
+
+
+def reasoning_tools(reasoning):
+    """
+    Return the ReasoningTools toolkit, or nothing for agents serving a "none" reasoning budget
+    """
+    return [ReasoningTools(add_instructions=True)] if reasoning else []
+
+
+def web_search_tools():
+    """
+    Return the ExaTools toolkit, or nothing with the mock backend: the recordings never call
+    it, and it cannot be created without EXA_API_KEY
+    """
+    if LLM_BACKEND == 'mock':
+        return []
+    # Deferred: ExaTools pulls in the exa_py client
+    from agno.tools.exa import ExaTools
+    return [ExaTools(text_length_limit=500, api_key=EXA_API_KEY)]
+
+
+def reasoning_guidelines(reasoning, guidelines):
+    """
+    Return the ReasoningTools guidelines of an agent's instructions, or nothing when the
+    toolkit is left out (see reasoning_tools()), so the agent is never told to call it
+    """
+    return guidelines if reasoning else ""
+
+
+def create_learner_profiler_agent(tier='standard', reasoning=True, response_model=None):
     LearnerProfiler = Agent(
         name="Learner Profiler",
         agent_id="learner_profiler_001",
-        model=xAI(id="grok-3", api_key=XAI_API_KEY),
+        model=get_model("learner_profiler", tier),
         role="Analyze learner behavior and build comprehensive learner profiles.",
         description=dedent("""
             You are an AI agent focused on understanding how learners interact with educational content.
@@ -140,7 +233,7 @@ def create_learner_profiler_agent():
         - Input: user_id
         - Purpose: Get the current learner profile to answer queries or make updates
         - Returns: Full profile JSON with all preferences, scores, and metadata
-
+        """) + reasoning_guidelines(reasoning, dedent("""
         **ReasoningTools (chain-of-thought)**
         - Use when: Making complex inferences from data
         - Examples:
@@ -148,7 +241,7 @@ def create_learner_profiler_agent():
           * "What pattern explains low completion rates?"
           * "Which skill should be prioritized next?"
         - Always use reasoning for non-trivial profile decisions
-
+        """)) + dedent("""
         **CalculatorTools**
         - Use when: Performing calculations on behavioral data
         - Examples:
@@ -351,7 +444,7 @@ def create_learner_profiler_agent():
         }
         """),
         tools=[
-            ReasoningTools(add_instructions=True),
+            *reasoning_tools(reasoning),
             CalculatorTools(),
             track_content_interaction,
             get_learner_behavior_history,
@@ -360,19 +453,20 @@ def create_learner_profiler_agent():
             get_engagement_metrics,
             get_learner_profile_from_db
         ],
-        markdown=True,
-        response_model=None,
+        markdown=response_model is None,
+        response_model=response_model,
+        use_json_mode=response_model is not None,
         show_tool_calls=False,
     )
 
     return LearnerProfiler
 
 
-def create_path_recommender_agent():
+def create_path_recommender_agent(tier='standard', reasoning=True, response_model=None):
     PathRecommender = Agent(
         name="Path Recommender",
         agent_id="path_recommender_001",
-        model=xAI(id="grok-3", api_key=XAI_API_KEY),
+        model=get_model("path_recommender", tier),
         role="Generate personalized learning paths and content recommendations.",
         description=dedent("""
             You are an AI agent focused on creating hyper-personalized learning experiences.
@@ -481,11 +575,11 @@ def create_path_recommender_agent():
         - Input: content_id
         - Purpose: Get full metadata (title, description, skills, duration, publisher, etc.)
         - Use this to explain WHY you recommended something
-
+        """) + reasoning_guidelines(reasoning, dedent("""
         **ReasoningTools**
         - Use when: Making complex recommendation decisions
         - Always use reasoning for non-obvious recommendation logic
-
+        """)) + dedent("""
         **CalculatorTools**
         - Use when: Performing calculations for recommendations
         - Examples: Weighted relevance score, estimated completion time, diversity score
@@ -612,7 +706,7 @@ def create_path_recommender_agent():
         }
         """),
         tools=[
-            ReasoningTools(add_instructions=True),
+            *reasoning_tools(reasoning),
             CalculatorTools(),
             get_learner_profile,
             search_content_catalog,
@@ -623,19 +717,20 @@ def create_path_recommender_agent():
             check_prerequisite_completion,
             get_content_metadata
         ],
-        markdown=True,
-        response_model=None,
+        markdown=response_model is None,
+        response_model=response_model,
+        use_json_mode=response_model is not None,
         show_tool_calls=False,
     )
 
     return PathRecommender
 
 
-def create_learning_assistant_agent():
+def create_learning_assistant_agent(tier='standard', reasoning=True, response_model=None):
     LearningAssistant = Agent(
         name="Learning Assistant",
         agent_id="learning_assistant_001",
-        model=xAI(id="grok-3", api_key=XAI_API_KEY),
+        model=get_model("learning_assistant", tier),
         role="Provide real-time conversational support and guidance to learners.",
         description=dedent("""
             You are an AI agent focused on being a personal learning companion for Edflex users.
@@ -738,10 +833,10 @@ def create_learning_assistant_agent():
         **ExaTools**
         - Use when: Question requires external knowledge
         - Purpose: Search web for explanations, examples
-
+        """) + reasoning_guidelines(reasoning, dedent("""
         **ReasoningTools**
         - Use when: Complex questions requiring multi-step reasoning
-
+        """)) + dedent("""
 
         ## DECISION RULES
 
@@ -799,8 +894,8 @@ def create_learning_assistant_agent():
         }
         """),
         tools=[
-            ReasoningTools(add_instructions=True),
-            ExaTools(text_length_limit=500, api_key=EXA_API_KEY),
+            *reasoning_tools(reasoning),
+            *web_search_tools(),
             search_edflex_knowledge_base,
             get_content_summary,
             search_similar_content,
@@ -811,9 +906,67 @@ def create_learning_assistant_agent():
             get_troubleshooting_help,
             get_learner_context
         ],
-        markdown=True,
-        response_model=None,
+        markdown=response_model is None,
+        response_model=response_model,
+        use_json_mode=response_model is not None,
         show_tool_calls=False,
     )
 
     return LearningAssistant
+
+
+AGENT_DISPLAY_NAMES = {
+    'learner_profiler': "Learner Profiler",
+    'path_recommender': "Path Recommender"
+}
+
+
+def create_action_agent(agent_name, action, tier='standard', reasoning=True, response_model=None):
+    """
+    Build an agent scoped to a single API action (compact prompt mode).
+
+    It only carries the instructions and tools that action needs (see ActionPrompts.py),
+    instead of the full description, instructions and JSON examples of the agent. With a
+    `response_model` (see ResponseModels.py) the agent answers in JSON validated against it.
+    """
+    spec = ACTION_PROMPTS[(agent_name, action)]
+    tools = [tool for tool in spec['tools']() if reasoning or not isinstance(tool, ReasoningTools)]
+
+    ActionAgent = Agent(
+        name=f"{AGENT_DISPLAY_NAMES[agent_name]} ({action})",
+        agent_id=f"{agent_name}_{action}_001",
+        model=get_model(agent_name, tier),
+        role=spec['role'],
+        description=spec['description'],
+        instructions=spec['instructions'],
+        tools=tools,
+        markdown=response_model is None,
+        response_model=response_model,
+        use_json_mode=response_model is not None,
+        show_tool_calls=False,
+    )
+
+    return ActionAgent
+
+
+def create_session_summarizer_agent(tier='fast'):
+    """
+    Build the tool-less agent folding old Learning Assistant turns into the session summary
+    (see Services/assistant_sessions.py).
+    """
+    SessionSummarizer = Agent(
+        name="Session Summarizer",
+        agent_id="session_summarizer_001",
+        model=get_model("session_summarizer", tier),
+        role="Summarize a learner's conversation with the Learning Assistant.",
+        instructions=dedent("""
+            Merge the previous summary and the new exchanges into one short summary, in French.
+            Keep what the assistant needs to follow the conversation: topics discussed,
+            the learner's goals, difficulties and preferences, and advice already given.
+            Write at most 5 sentences, in plain text, without headings or lists.
+        """),
+        markdown=False,
+        show_tool_calls=False,
+    )
+
+    return SessionSummarizer
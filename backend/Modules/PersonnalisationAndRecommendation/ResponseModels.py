@@ -0,0 +1,207 @@
+"""
+Structured response models
+
+The agents used to answer in free-text markdown, which the frontend re-parsed with regular
+expressions and which could neither be cached nor rendered field by field. Each action now
+has a Pydantic response model: the agent runs in JSON mode with the model's schema, agno
+validates its output, and the API returns the validated fields.
+
+Validation is lenient (every field but the assistant's answer is optional, enumerations are
+plain strings) so a partial answer still validates. If the output is not valid JSON for the
+model, `parse_structured()` tries once more on the outermost JSON object of the text, and
+the API otherwise falls back to the text answer (`format: "text"`).
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, Field, ValidationError
+
+
+class ResponseFormatError(ValueError):
+    """Raised when a request asks for an unknown response format."""
+
+
+# ---------------------------------------------------------------------------
+# Learner Profiler
+# ---------------------------------------------------------------------------
+
+class LearningStyle(BaseModel):
+    dominant_style: Optional[str] = Field(None, description="visual|auditory|reading-writing|kinesthetic")
+    scores: Optional[Dict[str, float]] = Field(None, description="Score 0-100 per learning style")
+
+
+class ContentPreferences(BaseModel):
+    preferred_format: Optional[str] = Field(None, description="video|article|podcast|interactive")
+    optimal_duration_minutes: Optional[float] = None
+    preferred_difficulty: Optional[str] = Field(None, description="beginner|intermediate|advanced")
+    preferred_language: Optional[str] = None
+    favorite_publishers: Optional[List[str]] = None
+    favorite_instructors: Optional[List[str]] = None
+
+
+class BehavioralPatterns(BaseModel):
+    peak_learning_hours: Optional[List[str]] = None
+    avg_session_duration_minutes: Optional[float] = None
+    sessions_per_week: Optional[float] = None
+    learning_pace: Optional[str] = Field(None, description="slow|moderate|fast")
+
+
+class Skill(BaseModel):
+    skill: str
+    proficiency: Optional[str] = Field(None, description="beginner|intermediate|advanced")
+
+
+class SkillGap(BaseModel):
+    skill: str
+    priority: Optional[str] = Field(None, description="high|medium|low")
+    reason: Optional[str] = None
+
+
+class SkillProfile(BaseModel):
+    current_skills: Optional[List[Skill]] = None
+    skill_gaps: Optional[List[SkillGap]] = None
+    certifications_in_progress: Optional[List[str]] = None
+    certifications_completed: Optional[List[str]] = None
+
+
+class EngagementMetrics(BaseModel):
+    engagement_score: Optional[float] = Field(None, description="0-100")
+    completion_rate_percent: Optional[float] = None
+    content_diversity_score: Optional[float] = Field(None, description="0-100")
+    motivation_level: Optional[str] = Field(None, description="low|medium|high")
+    autonomy_score: Optional[float] = Field(None, description="0-100")
+    risk_of_churn: Optional[str] = Field(None, description="low|medium|high")
+
+
+class LearnerProfile(BaseModel):
+    """
+    Profile sections returned by the Learner Profiler; an action only fills the sections it computed.
+    """
+    user_id: str
+    learning_style: Optional[LearningStyle] = None
+    content_preferences: Optional[ContentPreferences] = None
+    behavioral_patterns: Optional[BehavioralPatterns] = None
+    skill_profile: Optional[SkillProfile] = None
+    engagement_metrics: Optional[EngagementMetrics] = None
+    insights: Optional[List[str]] = Field(None, description="2-5 actionable insights, in French")
+    summary: Optional[str] = Field(None, description="Short summary for the learner, in French")
+
+
+# ---------------------------------------------------------------------------
+# Path Recommender
+# ---------------------------------------------------------------------------
+
+class ContentRecommendation(BaseModel):
+    rank: Optional[int] = None
+    content_id: str
+    title: str
+    format: Optional[str] = Field(None, description="video|article|podcast|interactive")
+    duration_minutes: Optional[float] = None
+    difficulty: Optional[str] = Field(None, description="beginner|intermediate|advanced")
+    skills_covered: Optional[List[str]] = None
+    relevance_score: Optional[float] = Field(None, description="0-100")
+    recommendation_reason: Optional[str] = None
+    explanation: Optional[str] = None
+    prerequisites_met: Optional[bool] = None
+
+
+class RecommendationContext(BaseModel):
+    primary_goal: Optional[str] = None
+    skill_focus: Optional[str] = None
+
+
+class RecommendationList(BaseModel):
+    user_id: str
+    recommendation_type: Optional[str] = Field(None, description="next_best_content|skill_focused")
+    recommendations: List[ContentRecommendation] = Field(default_factory=list)
+    diversity_score: Optional[float] = Field(None, description="0-100")
+    context: Optional[RecommendationContext] = None
+    summary: Optional[str] = Field(None, description="Short summary for the learner, in French")
+
+
+class PathContentItem(BaseModel):
+    sequence: Optional[int] = None
+    content_id: str
+    title: str
+    format: Optional[str] = None
+    duration_minutes: Optional[float] = None
+    difficulty: Optional[str] = None
+    skills_covered: Optional[List[str]] = None
+    why_included: Optional[str] = None
+
+
+class PathPhase(BaseModel):
+    phase: Optional[int] = None
+    phase_name: str
+    phase_duration_hours: Optional[float] = None
+    checkpoint: Optional[str] = None
+    content_items: List[PathContentItem] = Field(default_factory=list)
+
+
+class LearningPath(BaseModel):
+    user_id: str
+    skill_target: str
+    total_content_items: Optional[int] = None
+    estimated_total_duration_hours: Optional[float] = None
+    estimated_completion_date: Optional[str] = None
+    phases: List[PathPhase] = Field(default_factory=list)
+    prerequisites: Optional[List[str]] = None
+    certification_available: Optional[str] = None
+    summary: Optional[str] = Field(None, description="Why the path is structured this way, in French")
+
+
+# ---------------------------------------------------------------------------
+# Learning Assistant
+# ---------------------------------------------------------------------------
+
+class SuggestedContent(BaseModel):
+    content_id: Optional[str] = None
+    title: str
+    reason: Optional[str] = None
+
+
+class AssistantAnswer(BaseModel):
+    answer: str = Field(..., description="Answer to the learner, in markdown")
+    suggested_content: Optional[List[SuggestedContent]] = None
+    follow_up_questions: Optional[List[str]] = None
+
+
+# Response model per (agent, action); (agent, None) applies to the agent's other actions.
+# Actions without a model (e.g. check_prerequisites) keep the text answer.
+RESPONSE_MODELS = {
+    ('learner_profiler', None): LearnerProfile,
+    ('path_recommender', 'recommend_content'): RecommendationList,
+    ('path_recommender', 'get_next_content'): RecommendationList,
+    ('path_recommender', 'build_learning_path'): LearningPath,
+    ('learning_assistant', None): AssistantAnswer,
+}
+
+
+def response_model_for(agent_name: str, action: Optional[str]) -> Optional[Type[BaseModel]]:
+    """
+    Return the response model of an agent action, or None if it answers in text.
+    """
+    return RESPONSE_MODELS.get((agent_name, action)) or RESPONSE_MODELS.get((agent_name, None))
+
+
+def parse_structured(content: Any, model: Type[BaseModel]) -> Tuple[Optional[Dict], str]:
+    """
+    Validate an agent's output against its response model.
+
+    Returns:
+        Tuple of (fields, outcome): outcome is "parsed" when agno already validated the
+        output, "repaired" when the outermost JSON object of the text validated, and
+        "fallback" (fields None) when the text answer should be served instead
+    """
+    if isinstance(content, model):
+        return content.model_dump(exclude_none=True), 'parsed'
+
+    if isinstance(content, str):
+        # Models often wrap the JSON in a ```json fence or a sentence
+        start, end = content.find('{'), content.rfind('}')
+        if start != -1 and end > start:
+            try:
+                return model.model_validate_json(content[start:end + 1]).model_dump(exclude_none=True), 'repaired'
+            except ValidationError:
+                pass
+
+    return None, 'fallback'
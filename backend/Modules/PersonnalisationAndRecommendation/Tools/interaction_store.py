@@ -0,0 +1,390 @@
+"""
+Write-behind, append-only store of content interactions
+
+`track_content_interaction` receives thousands of view / complete / abandon events per
+second. Writing each one in its own SQLite transaction would pay a commit (and an fsync)
+per event on the request path, so `InteractionStore` only appends the event to an
+in-memory buffer and returns. A writer thread drains the buffer in batched group commits:
+one transaction per INTERACTION_STORE_BATCH_SIZE events, or every
+INTERACTION_STORE_FLUSH_INTERVAL_SECONDS, whichever comes first.
+
+The database is SQLite in WAL mode, in its own file so event writes never contend with the
+agents' storage. INTERACTION_STORE_DURABILITY sets what a group commit guarantees:
+
+- off:    no fsync; a crash of the machine may lose or corrupt recent commits
+- normal: WAL with synchronous=NORMAL (default); commits survive a process crash, the last
+          ones may be lost on power failure
+- full:   fsync on every group commit
+
+Whatever the setting, events still in the buffer (at most one flush interval) are lost if
+the process dies; the buffer is flushed on a normal shutdown, for at most
+INTERACTION_STORE_SHUTDOWN_TIMEOUT_SECONDS. When the buffer is full, producers wait for the
+writer, up to INTERACTION_STORE_APPEND_TIMEOUT_SECONDS, then write their event themselves.
+
+A batch whose commit keeps failing (read-only file, full disk, corrupt database) is retried
+with a backoff INTERACTION_STORE_MAX_RETRIES times, then dropped and counted, so one bad
+batch cannot block every producer behind a full buffer.
+
+`recent()` reads a learner's events back, including the ones not committed yet.
+"""
+
+import os
+import time
+import uuid
+import atexit
+import sqlite3
+import threading
+from contextlib import closing
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+INTERACTION_STORE_DB_FILE = os.getenv('INTERACTION_STORE_DB_FILE', 'tmp/interactions.db')
+INTERACTION_STORE_BATCH_SIZE = int(os.getenv('INTERACTION_STORE_BATCH_SIZE', '500'))
+INTERACTION_STORE_FLUSH_INTERVAL_SECONDS = float(os.getenv('INTERACTION_STORE_FLUSH_INTERVAL_SECONDS', '0.2'))
+INTERACTION_STORE_MAX_BUFFER = int(os.getenv('INTERACTION_STORE_MAX_BUFFER', '50000'))
+INTERACTION_STORE_DURABILITY = os.getenv('INTERACTION_STORE_DURABILITY', 'normal')
+INTERACTION_STORE_MAX_RETRIES = int(os.getenv('INTERACTION_STORE_MAX_RETRIES', '5'))
+INTERACTION_STORE_APPEND_TIMEOUT_SECONDS = float(os.getenv('INTERACTION_STORE_APPEND_TIMEOUT_SECONDS', '5'))
+INTERACTION_STORE_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv('INTERACTION_STORE_SHUTDOWN_TIMEOUT_SECONDS', '10'))
+
+# PRAGMA synchronous value per durability setting
+SYNCHRONOUS = {'off': 'OFF', 'normal': 'NORMAL', 'full': 'FULL'}
+
+_COLUMNS = (
+    'interaction_id', 'user_id', 'content_id', 'interaction_type',
+    'duration_seconds', 'completion_percentage', 'timestamp', 'stored_at'
+)
+
+
+class InteractionStoreUnavailable(RuntimeError):
+    """Raised by `append()` when the buffer stayed full and the event could not be written directly either."""
+
+
+class InteractionStore:
+    """
+    Buffered, append-only interaction log in SQLite, written by a background group-commit writer.
+
+    Example:
+        >>> store = InteractionStore(db_file="tmp/interactions.db", durability="normal")
+        >>> record = store.append({"user_id": "User123", "content_id": "V456", "interaction_type": "view",
+        ...                        "duration_seconds": 480, "completion_percentage": 0.8,
+        ...                        "timestamp": "2025-10-06T14:30:00Z"})
+        >>> record["interaction_id"]
+        'int_3f9c1a0b7d2e'
+        >>> store.recent("User123", limit=1)[0]["content_id"]  # buffered events included
+        'V456'
+    """
+
+    def __init__(
+        self,
+        db_file: str = INTERACTION_STORE_DB_FILE,
+        batch_size: int = INTERACTION_STORE_BATCH_SIZE,
+        flush_interval: float = INTERACTION_STORE_FLUSH_INTERVAL_SECONDS,
+        max_buffer: int = INTERACTION_STORE_MAX_BUFFER,
+        durability: str = INTERACTION_STORE_DURABILITY,
+        max_retries: int = INTERACTION_STORE_MAX_RETRIES,
+        append_timeout: float = INTERACTION_STORE_APPEND_TIMEOUT_SECONDS,
+        shutdown_timeout: float = INTERACTION_STORE_SHUTDOWN_TIMEOUT_SECONDS
+    ):
+        if durability not in SYNCHRONOUS:
+            raise ValueError(f"durability must be one of: {', '.join(SYNCHRONOUS)}")
+        if batch_size < 1 or max_buffer < batch_size:
+            raise ValueError("batch_size must be at least 1 and at most max_buffer")
+
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.durability = durability
+        self.max_retries = max_retries
+        self.append_timeout = append_timeout
+        self.shutdown_timeout = shutdown_timeout
+
+        self._condition = threading.Condition()
+        self._buffer = deque()  # (enqueued_at, row)
+        self._in_flight = []  # batch taken by the writer, not committed yet
+        self._thread = None
+        self._stopping = False
+        self._flush_waiters = 0
+        self._flush_listeners: List[Callable[[int, float], None]] = []
+
+        # Metrics
+        self._enqueued = 0
+        self._committed = 0
+        self._dropped = 0
+        self._flushes = 0
+        self._failed_flushes = 0
+        self._producer_waits = 0
+        self._direct_writes = 0
+        self._max_depth = 0
+        self._flush_seconds = 0.0
+        self._max_flush_seconds = 0.0
+        self._max_event_lag_seconds = 0.0
+
+    def add_flush_listener(self, listener: Callable[[int, float], None]) -> None:
+        """
+        Register a callback invoked with (events, seconds) after each group commit.
+        """
+        self._flush_listeners.append(listener)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_file, timeout=30)
+        connection.execute(f"PRAGMA synchronous={SYNCHRONOUS[self.durability]}")
+        return connection
+
+    def start(self) -> None:
+        """
+        Create the schema and start the writer thread (idempotent; `append()` starts it on first use).
+        """
+        with self._condition:
+            if self._thread is not None:
+                return
+            directory = os.path.dirname(self.db_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as connection:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("""
+                    CREATE TABLE IF NOT EXISTS content_interactions (
+                        interaction_id TEXT PRIMARY KEY,
+                        user_id TEXT NOT NULL,
+                        content_id TEXT NOT NULL,
+                        interaction_type TEXT NOT NULL,
+                        duration_seconds INTEGER,
+                        completion_percentage REAL,
+                        timestamp TEXT,
+                        stored_at TEXT NOT NULL
+                    )
+                """)
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_content_interactions_user ON content_interactions (user_id, timestamp)"
+                )
+            self._stopping = False
+            self._thread = threading.Thread(target=self._write_loop, name="interaction-store-writer", daemon=True)
+            self._thread.start()
+        # Flush what is still buffered on a normal interpreter exit, without holding it up
+        atexit.register(self.stop, self.shutdown_timeout)
+
+    def append(self, event: Dict) -> Dict:
+        """
+        Buffer an interaction and return its record (with `interaction_id` and `stored_at`)
+        without waiting for it to be committed.
+
+        If the buffer stays full for `append_timeout` seconds, the event is committed on the
+        calling thread instead; `InteractionStoreUnavailable` is raised if that fails too.
+        """
+        if self._thread is None:
+            self.start()
+
+        record = {
+            'interaction_id': f"int_{uuid.uuid4().hex[:12]}",
+            **{column: event.get(column) for column in _COLUMNS[1:-1]},
+            'stored_at': datetime.utcnow().isoformat() + "Z"
+        }
+        row = tuple(record[column] for column in _COLUMNS)
+
+        deadline = time.monotonic() + self.append_timeout
+        with self._condition:
+            if len(self._buffer) >= self.max_buffer:
+                self._producer_waits += 1
+            # Backpressure: wait for the writer rather than drop events
+            while len(self._buffer) >= self.max_buffer and time.monotonic() < deadline:
+                self._condition.wait(deadline - time.monotonic())
+            full = len(self._buffer) >= self.max_buffer
+            if full:
+                self._direct_writes += 1
+            else:
+                self._buffer.append((time.monotonic(), row))
+                self._enqueued += 1
+                self._max_depth = max(self._max_depth, len(self._buffer))
+                if len(self._buffer) >= self.batch_size:
+                    self._condition.notify_all()
+
+        if full:
+            self._write_direct(row)
+        return record
+
+    def _write_direct(self, row: tuple) -> None:
+        # The writer is stuck or far behind: commit this event on the producer's thread
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(self._insert_statement(), row)
+        except sqlite3.Error as e:
+            raise InteractionStoreUnavailable(f"Interaction store is full and unavailable: {e}") from e
+
+    @staticmethod
+    def _insert_statement() -> str:
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        return f"INSERT OR IGNORE INTO content_interactions ({', '.join(_COLUMNS)}) VALUES ({placeholders})"
+
+    def _take_batch(self) -> Optional[List]:
+        """
+        Wait until a batch is full, the oldest buffered event is `flush_interval` old, a flush
+        is requested or the store stops; then take up to `batch_size` events. Returns None once stopped and drained.
+        """
+        with self._condition:
+            while True:
+                if self._buffer:
+                    due = self._buffer[0][0] + self.flush_interval
+                    if len(self._buffer) >= self.batch_size or self._stopping or self._flush_waiters \
+                            or time.monotonic() >= due:
+                        break
+                    self._condition.wait(max(0.0, due - time.monotonic()))
+                elif self._stopping:
+                    return None
+                else:
+                    self._condition.wait()
+
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            self._in_flight = batch
+            # Producers blocked on a full buffer can go on
+            self._condition.notify_all()
+            return batch
+
+    def _commit(self, connection: sqlite3.Connection, batch: List) -> float:
+        """
+        Commit a batch in one transaction, retrying with a backoff; returns the duration of
+        the successful attempt. Raises the last error once `max_retries` retries failed.
+        """
+        statement = self._insert_statement()
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                # One transaction (one commit) for the whole batch
+                with connection:
+                    connection.executemany(statement, [row for _, row in batch])
+                return time.perf_counter() - started
+            except sqlite3.Error as e:
+                with self._condition:
+                    self._failed_flushes += 1
+                if attempt == self.max_retries:
+                    raise
+                print(f"[WARN] Interaction store flush of {len(batch)} events failed, retrying: {e}")
+                time.sleep(min(self.flush_interval * 2 ** attempt, 5.0))
+
+    def _write_loop(self) -> None:
+        connection = self._connect()
+        try:
+            while True:
+                batch = self._take_batch()
+                if batch is None:
+                    return
+
+                try:
+                    seconds = self._commit(connection, batch)
+                except sqlite3.Error as e:
+                    print(f"[ERROR] Interaction store dropped {len(batch)} events after {self.max_retries} retries: {e}")
+                    with self._condition:
+                        self._in_flight = []
+                        self._dropped += len(batch)
+                        self._condition.notify_all()
+                    continue
+
+                lag = time.monotonic() - batch[0][0]
+                with self._condition:
+                    self._in_flight = []
+                    self._committed += len(batch)
+                    self._flushes += 1
+                    self._flush_seconds += seconds
+                    self._max_flush_seconds = max(self._max_flush_seconds, seconds)
+                    self._max_event_lag_seconds = max(self._max_event_lag_seconds, lag)
+                    self._condition.notify_all()
+                for listener in self._flush_listeners:
+                    listener(len(batch), seconds)
+        finally:
+            connection.close()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every event buffered so far is committed (or dropped after its retries);
+        returns False on timeout.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            target = self._enqueued
+            # Batches are committed in order: the writer stops waiting for the flush interval
+            self._flush_waiters += 1
+            self._condition.notify_all()
+            try:
+                while self._committed + self._dropped < target:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self._flush_waiters -= 1
+        return True
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Commit the buffered events, then stop the writer thread.
+        """
+        with self._condition:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._condition.notify_all()
+            thread = self._thread
+        thread.join(timeout)
+        with self._condition:
+            self._thread = None
+
+    def recent(self, user_id: str, since: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """
+        Return a learner's most recent interactions, newest first, including the ones still
+        buffered (so an event is readable as soon as `append()` returned).
+
+        Args:
+            user_id: Learner whose events are returned
+            since: Only events with a timestamp at or after this ISO 8601 value
+            limit: Maximum number of events
+        """
+        if self._thread is None:
+            self.start()
+
+        with self._condition:
+            pending = [
+                dict(zip(_COLUMNS, row))
+                for _, row in list(self._in_flight) + list(self._buffer)
+                if row[1] == user_id and (since is None or (row[6] or '') >= since)
+            ]
+
+        query = f"SELECT {', '.join(_COLUMNS)} FROM content_interactions WHERE user_id = ?"
+        parameters = [user_id]
+        if since is not None:
+            query += " AND timestamp >= ?"
+            parameters.append(since)
+        query += " ORDER BY timestamp DESC, rowid DESC LIMIT ?"
+        parameters.append(limit)
+        with closing(self._connect()) as connection:
+            connection.row_factory = sqlite3.Row
+            committed = [dict(row) for row in connection.execute(query, parameters).fetchall()]
+
+        # A batch may have been committed between the two reads
+        events = {event['interaction_id']: event for event in committed + pending}
+        ordered = sorted(events.values(), key=lambda event: (event['timestamp'] or '', event['stored_at']), reverse=True)
+        return ordered[:limit]
+
+    def stats(self) -> Dict:
+        """
+        Return buffer depth, committed events, group commits and flush latency (ms).
+        """
+        with self._condition:
+            return {
+                'durability': self.durability,
+                'buffer_depth': len(self._buffer) + len(self._in_flight),
+                'max_buffer_depth': self._max_depth,
+                'enqueued': self._enqueued,
+                'committed': self._committed,
+                'dropped': self._dropped,
+                'direct_writes': self._direct_writes,
+                'flushes': self._flushes,
+                'failed_flushes': self._failed_flushes,
+                'avg_batch_size': round(self._committed / self._flushes, 1) if self._flushes else 0.0,
+                'avg_flush_ms': round(1000 * self._flush_seconds / self._flushes, 2) if self._flushes else 0.0,
+                'max_flush_ms': round(1000 * self._max_flush_seconds, 2),
+                'max_event_lag_ms': round(1000 * self._max_event_lag_seconds, 2),
+                'producer_waits': self._producer_waits
+            }
@@ -6,9 +6,36 @@ and building comprehensive learner profiles for personalized learning recommenda
 """
 
 from agno.tools import tool
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import json
 from datetime import datetime, timedelta
+from Tools.profile_snapshots import ProfileSnapshots
+from Tools.interaction_store import InteractionStore, InteractionStoreUnavailable
+
+
+# Callbacks notified with the user_id each time a new interaction is tracked
+# (e.g. the API response cache drops that learner's cached profiles)
+_interaction_listeners: List[Callable[[str], None]] = []
+
+
+def add_interaction_listener(listener: Callable[[str], None]) -> None:
+    """
+    Register a callback invoked with the user_id whenever `track_content_interaction` records an event.
+
+    Args:
+        listener: Callable taking the learner's user_id
+    """
+    _interaction_listeners.append(listener)
+
+
+# Append-only interaction log: events are buffered and committed to SQLite in batches by a
+# background writer (see INTERACTION_STORE_*)
+interaction_store = InteractionStore()
+
+
+def _notify_interaction_listeners(user_id: str) -> None:
+    for listener in _interaction_listeners:
+        listener(user_id)
 
 
 # =============================================================================
@@ -29,6 +56,7 @@ def track_content_interaction(
 
     This tool stores raw interaction data in the learner behavior database for later analysis.
     It captures all types of content interactions including views, completions, bookmarks, and ratings.
+    The event is appended to the interaction store's buffer and committed in the background.
 
     Args:
         user_id: Unique identifier for the learner
@@ -50,31 +78,30 @@ def track_content_interaction(
         ...     completion_percentage=0.8,
         ...     timestamp="2025-10-06T14:30:00Z"
         ... )
-        {'status': 'success', 'interaction_id': 'int_12345', 'stored_at': '2025-10-06T14:30:01Z'}
+        {'status': 'success', 'interaction_id': 'int_3f9c1a0b7d2e', 'stored_at': '2025-10-06T14:30:01Z'}
     """
-    # TODO: Implement database storage logic
-    # This would connect to PostgreSQL and insert the interaction record
-
-    # Placeholder implementation
-    interaction_id = f"int_{hash(user_id + content_id + timestamp) % 100000}"
-
-    interaction_record = {
-        "interaction_id": interaction_id,
-        "user_id": user_id,
-        "content_id": content_id,
-        "interaction_type": interaction_type,
-        "duration_seconds": duration_seconds,
-        "completion_percentage": completion_percentage,
-        "timestamp": timestamp,
-        "stored_at": datetime.utcnow().isoformat() + "Z"
-    }
+    # Returns once the event is buffered; the group commit happens on the store's writer
+    try:
+        interaction_record = interaction_store.append({
+            "user_id": user_id,
+            "content_id": content_id,
+            "interaction_type": interaction_type,
+            "duration_seconds": duration_seconds,
+            "completion_percentage": completion_percentage,
+            "timestamp": timestamp
+        })
+    except InteractionStoreUnavailable as e:
+        return {
+            "status": "error",
+            "message": f"Could not track {interaction_type} interaction for user {user_id}: {e}"
+        }
 
-    # Database insertion would happen here
-    # db.insert("user_interactions", interaction_record)
+    # Anything derived from this learner's history is now stale
+    _notify_interaction_listeners(user_id)
 
     return {
         "status": "success",
-        "interaction_id": interaction_id,
+        "interaction_id": interaction_record["interaction_id"],
         "stored_at": interaction_record["stored_at"],
         "message": f"Tracked {interaction_type} interaction for user {user_id} on content {content_id}"
     }
@@ -94,6 +121,8 @@ def get_learner_behavior_history(
 
     Returns all content interactions (views, completions, searches, ratings) for the
     specified number of days. Used to identify behavioral patterns and preferences.
+    Interactions recorded by `track_content_interaction` are included as soon as they are
+    tracked, before the catalogue history.
 
     Args:
         user_id: Unique identifier for the learner
@@ -166,7 +195,9 @@ def get_learner_behavior_history(
     # Database query would happen here
     # history = db.query("SELECT * FROM user_interactions WHERE user_id = ? AND timestamp > ?", user_id, cutoff_date)
 
-    return sample_history
+    # Events tracked through the interaction store (buffered ones included), newest first
+    recorded = interaction_store.recent(user_id, since=cutoff_date.isoformat() + "Z")
+    return recorded + sample_history
 
 
 # =============================================================================
@@ -422,12 +453,13 @@ def get_learner_profile_from_db(user_id: str) -> Dict:
         user_id: Unique identifier for the learner
 
     Returns:
-        Complete learner profile as JSON object
+        Complete learner profile as JSON object, stamped with its `profile_version`
 
     Example:
         >>> get_learner_profile_from_db(user_id="User123")
         {
             'user_id': 'User123',
+            'profile_version': 3,
             'profile_updated_at': '2025-10-06T14:35:22Z',
             'learning_style': {...},
             'content_preferences': {...},
@@ -437,6 +469,14 @@ def get_learner_profile_from_db(user_id: str) -> Dict:
             'metadata': {...}
         }
     """
+    # Served from the snapshot shared with the Path Recommender's get_learner_profile
+    return profile_snapshots.get(user_id)
+
+
+def assemble_learner_profile(user_id: str) -> Dict:
+    """
+    Assemble a learner's full profile from the database (see `profile_snapshots`).
+    """
     # TODO: Implement database query
     # This would query the learner_profiles table
 
@@ -512,3 +552,9 @@ def get_learner_profile_from_db(user_id: str) -> Dict:
     }
 
     return sample_profile
+
+
+# One versioned snapshot per learner, shared by get_learner_profile_from_db and the Path
+# Recommender's get_learner_profile, and invalidated by every tracked interaction
+profile_snapshots = ProfileSnapshots(assemble_learner_profile)
+add_interaction_listener(profile_snapshots.invalidate)
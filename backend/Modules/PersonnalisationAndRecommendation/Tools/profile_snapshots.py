@@ -0,0 +1,230 @@
+"""
+Shared, versioned learner profile snapshots
+
+`get_learner_profile_from_db` (Learner Profiler) and `get_learner_profile` (Path Recommender)
+used to assemble the same learner data independently, so a profiler call followed by a
+recommender call paid the profile assembly twice. Both tools now read one snapshot per
+learner from `ProfileSnapshots`.
+
+Each learner has a version, raised whenever `track_content_interaction` records a new event;
+a snapshot is only served while no event was recorded since it was assembled. Versions come
+from one increasing counter and are kept for the learners with an interaction in the last
+PROFILE_SNAPSHOT_VERSION_HORIZON_SECONDS, up to PROFILE_SNAPSHOT_MAX_USERS; learners
+forgotten since are back at version 0. The snapshots of learners seen recently are rebuilt
+in the background right after an interaction, so their next recommendation does not pay the
+assembly on the request path. Every profile returned carries its `profile_version`, and
+`served()` collects the versions served within an agent run.
+"""
+
+import os
+import copy
+import time
+import threading
+import contextvars
+from datetime import datetime
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+# Safety net for profile changes made outside this process
+PROFILE_SNAPSHOT_TTL_SECONDS = float(os.getenv('PROFILE_SNAPSHOT_TTL_SECONDS', '300'))
+PROFILE_SNAPSHOT_MAX_USERS = int(os.getenv('PROFILE_SNAPSHOT_MAX_USERS', '10000'))
+# A learner's version is never forgotten sooner than this after their last interaction, so a
+# snapshot assembled meanwhile cannot miss it (keep it above the longest build)
+PROFILE_SNAPSHOT_VERSION_HORIZON_SECONDS = float(os.getenv('PROFILE_SNAPSHOT_VERSION_HORIZON_SECONDS', '600'))
+# Rebuild a learner's snapshot in the background after an interaction
+PROFILE_SNAPSHOT_EAGER_REFRESH = os.getenv('PROFILE_SNAPSHOT_EAGER_REFRESH', 'true').lower() in ('1', 'true', 'yes')
+
+# Builds of the same learner are serialized on one of these locks
+_BUILD_LOCK_STRIPES = 64
+
+# user_id -> profile version served in the current context (None outside `served()`)
+_served = contextvars.ContextVar('profile_snapshots_served', default=None)
+
+
+class ProfileSnapshots:
+    """
+    Per-learner profile snapshots shared by the profile tools, invalidated by interactions.
+
+    Example:
+        >>> profile_snapshots = ProfileSnapshots(assemble_learner_profile)
+        >>> profile_snapshots.get("User123")["profile_version"]
+        0
+        >>> profile_snapshots.invalidate("User123")  # new interaction tracked
+        >>> with profile_snapshots.served() as versions:
+        ...     profile_snapshots.get("User123")["profile_version"] > 0
+        True
+        >>> versions["User123"] > 0
+        True
+    """
+
+    def __init__(
+        self,
+        assemble: Callable[[str], Dict],
+        ttl: float = PROFILE_SNAPSHOT_TTL_SECONDS,
+        max_users: int = PROFILE_SNAPSHOT_MAX_USERS,
+        eager_refresh: bool = PROFILE_SNAPSHOT_EAGER_REFRESH,
+        version_horizon: float = PROFILE_SNAPSHOT_VERSION_HORIZON_SECONDS
+    ):
+        self.assemble = assemble
+        self.ttl = ttl
+        self.max_users = max_users
+        self.version_horizon = version_horizon
+
+        self._lock = threading.Lock()
+        self._build_locks = [threading.Lock() for _ in range(_BUILD_LOCK_STRIPES)]
+        # user_id -> (counter when the build started, expires_at, profile), most recently used last
+        self._entries = OrderedDict()
+        # user_id -> (version, invalidated_at), oldest interaction first. Versions come from
+        # `_counter`; `_floor` is the highest version forgotten so far
+        self._versions = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='profile-refresh') if eager_refresh else None
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._builds = 0
+        self._refreshes = 0
+        self._build_seconds = 0.0
+
+    def version(self, user_id: str) -> int:
+        """
+        Return the learner's current profile version.
+        """
+        with self._lock:
+            return self._version(user_id)
+
+    def _version(self, user_id: str) -> int:
+        # Called with the lock held
+        tracked = self._versions.get(user_id)
+        return tracked[0] if tracked is not None else 0
+
+    def _changed_since(self, user_id: str, counter: int) -> bool:
+        # Called with the lock held. A forgotten learner may have had an interaction after
+        # `counter` only if a version above it was forgotten (a build older than the horizon)
+        tracked = self._versions.get(user_id)
+        return (tracked[0] if tracked is not None else self._floor) > counter
+
+    def _forget_old_versions(self) -> None:
+        # Called with the lock held. Over max_users, versions older than the horizon are
+        # dropped; more recent ones are kept until they age out
+        cutoff = time.monotonic() - self.version_horizon
+        while len(self._versions) > self.max_users:
+            user_id, (version, invalidated_at) = next(iter(self._versions.items()))
+            if invalidated_at > cutoff:
+                return
+            del self._versions[user_id]
+            self._floor = max(self._floor, version)
+
+    def _fresh(self, user_id: str) -> Optional[Dict]:
+        # Called with the lock held
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        counter, expires_at, profile = entry
+        if self._changed_since(user_id, counter) or expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return profile
+
+    def _build(self, user_id: str) -> Dict:
+        """
+        Assemble a learner's snapshot, unless a concurrent build already did it.
+        """
+        with self._build_locks[hash(user_id) % _BUILD_LOCK_STRIPES]:
+            with self._lock:
+                profile = self._fresh(user_id)
+                counter = self._counter
+                version = self._version(user_id)
+            if profile is not None:
+                return profile
+
+            started = time.perf_counter()
+            profile = self.assemble(user_id)
+            profile['profile_version'] = version
+            profile['snapshot_at'] = datetime.utcnow().isoformat() + "Z"
+
+            with self._lock:
+                self._builds += 1
+                self._build_seconds += time.perf_counter() - started
+                # An interaction arrived during the build: serve it once, do not keep it
+                if not self._changed_since(user_id, counter):
+                    self._entries[user_id] = (counter, time.monotonic() + self.ttl, profile)
+                    self._entries.move_to_end(user_id)
+                    while len(self._entries) > self.max_users:
+                        self._entries.popitem(last=False)
+            return profile
+
+    def get(self, user_id: str) -> Dict:
+        """
+        Return a copy of the learner's current profile snapshot (assembled on a miss).
+        """
+        with self._lock:
+            profile = self._fresh(user_id)
+            if profile is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+        if profile is None:
+            profile = self._build(user_id)
+        served = _served.get()
+        if served is not None:
+            served[user_id] = profile['profile_version']
+        # Callers may edit their copy
+        return copy.deepcopy(profile)
+
+    @contextmanager
+    def served(self):
+        """
+        Collect the profile versions served in the enclosed block (e.g. one agent run), as a
+        dict of user_id -> version; runs scheduled from the block inherit the scope.
+        """
+        versions = {}
+        token = _served.set(versions)
+        try:
+            yield versions
+        finally:
+            _served.reset(token)
+
+    def invalidate(self, user_id: str) -> None:
+        """
+        Raise the learner's profile version (e.g. after a new interaction) and, for learners
+        with a snapshot, rebuild it in the background.
+        """
+        with self._lock:
+            self._counter += 1
+            self._versions[user_id] = (self._counter, time.monotonic())
+            self._versions.move_to_end(user_id)
+            self._forget_old_versions()
+            had_snapshot = self._entries.pop(user_id, None) is not None
+            if had_snapshot and self._executor is not None:
+                self._refreshes += 1
+        if had_snapshot and self._executor is not None:
+            self._executor.submit(self._refresh, user_id)
+
+    def _refresh(self, user_id: str) -> None:
+        try:
+            self._build(user_id)
+        except Exception as e:
+            # The next read assembles it on the request path instead
+            print(f"[WARN] Profile snapshot refresh failed for {user_id}: {e}")
+
+    def stats(self) -> Dict:
+        """
+        Return snapshot count, hit rate, builds, background refreshes and average build time (ms).
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'snapshots': len(self._entries),
+                'tracked_users': len(self._versions),
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'builds': self._builds,
+                'background_refreshes': self._refreshes,
+                'avg_build_ms': round(1000 * self._build_seconds / self._builds, 2) if self._builds else 0.0
+            }
@@ -9,6 +9,7 @@ from agno.tools import tool
 from typing import Dict, List, Optional
 import json
 from datetime import datetime, timedelta
+from Tools.learner_tools import profile_snapshots
 
 
 # =============================================================================
@@ -27,51 +28,37 @@ def get_learner_profile(user_id: str) -> Dict:
         user_id: Unique identifier for the learner
 
     Returns:
-        Complete learner profile including preferences, skill gaps, learning style
+        Complete learner profile including preferences, skill gaps, learning style,
+        stamped with its `profile_version`
 
     Example:
         >>> get_learner_profile(user_id="User123")
         {
             'user_id': 'User123',
+            'profile_version': 3,
             'content_preferences': {'preferred_format': 'video', ...},
             'skill_gaps': [{'skill': 'Data Analytics', 'priority': 'high'}, ...],
             'learning_style': {'dominant_style': 'visual', ...},
             'behavioral_patterns': {'peak_learning_hours': ['18:00-20:00'], ...}
         }
     """
-    # TODO: Query learner profile from database
-    # This retrieves the profile built by Agent 2.1 (Learner Profiler)
+    # The Learner Profiler's snapshot: assembled once per profile version for both agents
+    profile = profile_snapshots.get(user_id)
+    skill_profile = profile.get("skill_profile") or {}
 
-    # Placeholder - in production, this would call get_learner_profile_from_db
-    sample_profile = {
+    return {
         "user_id": user_id,
-        "content_preferences": {
-            "preferred_format": "video",
-            "optimal_duration_minutes": 15,
-            "preferred_difficulty": "intermediate",
-            "preferred_language": "English"
-        },
+        "profile_version": profile["profile_version"],
+        "content_preferences": profile.get("content_preferences"),
         "skill_gaps": [
-            {"skill": "Data Analytics", "priority": "high"},
-            {"skill": "SEO Strategy", "priority": "medium"}
+            {"skill": gap["skill"], "priority": gap.get("priority")}
+            for gap in skill_profile.get("skill_gaps", [])
         ],
-        "learning_style": {
-            "dominant_style": "visual",
-            "scores": {"visual": 85, "auditory": 45}
-        },
-        "behavioral_patterns": {
-            "peak_learning_hours": ["18:00-20:00"],
-            "sessions_per_week": 4.2,
-            "learning_pace": "moderate"
-        },
-        "engagement_metrics": {
-            "engagement_score": 72,
-            "completion_rate_percent": 68
-        }
+        "learning_style": profile.get("learning_style"),
+        "behavioral_patterns": profile.get("behavioral_patterns"),
+        "engagement_metrics": profile.get("engagement_metrics")
     }
 
-    return sample_profile
-
 
 # =============================================================================
 # TOOL 2: Search Content Catalog
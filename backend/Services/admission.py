@@ -0,0 +1,218 @@
+"""
+Admission control with priority lanes
+
+Bounds the number of agent runs in progress and queues the excess in front of the agents,
+so a load spike gets fast 429/503 answers instead of every request timing out together.
+
+Waiting runs are admitted by lane priority:
+- interactive: Learning Assistant questions (a learner is waiting on the screen)
+- standard: profiler / recommender dashboard requests
+- batch: /api/batch items and background jobs
+"""
+
+import os
+import math
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+# Lanes, highest priority first
+LANES = ('interactive', 'standard', 'batch')
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', '48'))
+ADMISSION_QUEUE_DEPTHS = {
+    'interactive': int(os.getenv('ADMISSION_QUEUE_DEPTH_INTERACTIVE', '64')),
+    'standard': int(os.getenv('ADMISSION_QUEUE_DEPTH_STANDARD', '32')),
+    'batch': int(os.getenv('ADMISSION_QUEUE_DEPTH_BATCH', '32'))
+}
+ADMISSION_QUEUE_TIMEOUTS_SECONDS = {
+    'interactive': float(os.getenv('ADMISSION_QUEUE_TIMEOUT_INTERACTIVE_SECONDS', '10')),
+    'standard': float(os.getenv('ADMISSION_QUEUE_TIMEOUT_STANDARD_SECONDS', '15')),
+    'batch': float(os.getenv('ADMISSION_QUEUE_TIMEOUT_BATCH_SECONDS', '120'))
+}
+
+_current_lane = ContextVar('admission_lane', default='standard')
+
+
+@contextmanager
+def in_lane(lane: str):
+    """
+    Run the enclosed block's agent calls in a given lane (e.g. batch workers).
+    """
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a run is not admitted.
+
+    `status_code` is 429 when the lane's queue is full and 503 when the run waited in the
+    queue for longer than the lane's timeout; `retry_after` is a hint in seconds.
+    """
+
+    def __init__(self, message: str, lane: str, reason: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.lane = lane
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ('granted',)
+
+    def __init__(self):
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Concurrency limit with one bounded FIFO queue per priority lane.
+
+    Example:
+        >>> admission = AdmissionController(max_concurrent=32)
+        >>> with admission.admit('interactive') as wait_seconds:
+        ...     response = agent.run(prompt)
+        >>> admission.stats()["lanes"]["interactive"]["admitted"]
+        1
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        queue_depths: Optional[Dict[str, int]] = None,
+        queue_timeouts: Optional[Dict[str, float]] = None
+    ):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+
+        self.max_concurrent = max_concurrent
+        self.queue_depths = dict(ADMISSION_QUEUE_DEPTHS if queue_depths is None else queue_depths)
+        self.queue_timeouts = dict(ADMISSION_QUEUE_TIMEOUTS_SECONDS if queue_timeouts is None else queue_timeouts)
+
+        self._condition = threading.Condition()
+        self._in_use = 0
+        self._queues = {lane: deque() for lane in LANES}
+        self._avg_hold_seconds = 5.0  # Moving average of run durations, for Retry-After
+
+        # Metrics
+        self._lane_stats = {
+            lane: {"admitted": 0, "rejected_full": 0, "rejected_timeout": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for lane in LANES
+        }
+
+    def _retry_after(self) -> int:
+        queued = sum(len(queue) for queue in self._queues.values())
+        return max(1, math.ceil(self._avg_hold_seconds * (queued + 1) / self.max_concurrent))
+
+    def _dispatch(self) -> None:
+        # Hand free slots to waiting tickets, highest priority lane first
+        while self._in_use < self.max_concurrent:
+            for lane in LANES:
+                if self._queues[lane]:
+                    self._queues[lane].popleft().granted = True
+                    self._in_use += 1
+                    break
+            else:
+                break
+        self._condition.notify_all()
+
+    def _acquire(self, lane: str) -> float:
+        if lane not in self._queues:
+            raise ValueError(f"Unknown admission lane: {lane}")
+
+        started = time.perf_counter()
+        stats = self._lane_stats[lane]
+
+        with self._condition:
+            # Queued tickets only exist while every slot is taken, so a free slot can be used directly
+            if self._in_use < self.max_concurrent:
+                self._in_use += 1
+                stats["admitted"] += 1
+                return 0.0
+
+            if len(self._queues[lane]) >= self.queue_depths[lane]:
+                stats["rejected_full"] += 1
+                raise AdmissionRejected(
+                    f"Too many {lane} requests queued ({self.queue_depths[lane]}), retry later",
+                    lane, 'queue_full', 429, self._retry_after()
+                )
+
+            ticket = _Ticket()
+            self._queues[lane].append(ticket)
+            deadline = started + self.queue_timeouts[lane]
+
+            while not ticket.granted:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._queues[lane].remove(ticket)
+                    stats["rejected_timeout"] += 1
+                    raise AdmissionRejected(
+                        f"Server overloaded: {lane} request not admitted after {self.queue_timeouts[lane]}s",
+                        lane, 'queue_timeout', 503, self._retry_after()
+                    )
+                self._condition.wait(remaining)
+
+            wait_seconds = time.perf_counter() - started
+            stats["admitted"] += 1
+            stats["total_wait"] += wait_seconds
+            stats["max_wait"] = max(stats["max_wait"], wait_seconds)
+            return wait_seconds
+
+    def _release(self, held_seconds: float) -> None:
+        with self._condition:
+            self._avg_hold_seconds = 0.9 * self._avg_hold_seconds + 0.1 * held_seconds
+            self._in_use -= 1
+            self._dispatch()
+
+    @contextmanager
+    def admit(self, lane: Optional[str] = None):
+        """
+        Wait for a slot in the given lane (defaults to the current lane, see `in_lane()`).
+
+        Yields the seconds spent queued; raises AdmissionRejected if the lane's queue is
+        full or the wait exceeds the lane's timeout.
+        """
+        lane = lane or current_lane()
+        wait_seconds = self._acquire(lane)
+        admitted_at = time.perf_counter()
+        try:
+            yield wait_seconds
+        finally:
+            self._release(time.perf_counter() - admitted_at)
+
+    def stats(self) -> Dict:
+        """
+        Return slot usage and per-lane queue depth, admissions, rejections and wait times (ms).
+        """
+        with self._condition:
+            lanes = {}
+            for lane in LANES:
+                stats = self._lane_stats[lane]
+                lanes[lane] = {
+                    "queued": len(self._queues[lane]),
+                    "max_queue_depth": self.queue_depths[lane],
+                    "admitted": stats["admitted"],
+                    "rejected_full": stats["rejected_full"],
+                    "rejected_timeout": stats["rejected_timeout"],
+                    "avg_wait_ms": round(1000 * stats["total_wait"] / stats["admitted"], 2) if stats["admitted"] else 0.0,
+                    "max_wait_ms": round(1000 * stats["max_wait"], 2)
+                }
+
+            return {
+                "max_concurrent": self.max_concurrent,
+                "in_use": self._in_use,
+                "lanes": lanes
+            }
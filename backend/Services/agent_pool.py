@@ -0,0 +1,282 @@
+"""
+Agent instance pool for the Flask API
+
+Agno agents keep per-run state on the instance (run_id, run_response, session, memory),
+so sharing one module-level agent between request threads leaks state across learners.
+This module keeps a pool of pre-built agent instances per agent type: a request checks
+an instance out, runs it exclusively, then checks it back in.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+
+AGENT_POOL_SIZE = int(os.getenv('AGENT_POOL_SIZE', '16'))
+AGENT_POOL_WARM = int(os.getenv('AGENT_POOL_WARM', '1'))
+AGENT_POOL_CHECKOUT_TIMEOUT_SECONDS = float(os.getenv('AGENT_POOL_CHECKOUT_TIMEOUT_SECONDS', '30'))
+
+
+class AgentPoolTimeout(TimeoutError):
+    """Raised when no agent instance became available before the checkout timeout."""
+
+
+def reset_agent(agent) -> None:
+    """
+    Clear per-run and per-session state so the next learner starts from a clean instance.
+
+    Only in-memory state is dropped; anything persisted in the agent's storage is kept.
+    """
+    agent.reset_run_state()
+    agent.reset_session()
+    agent.session_id = None
+
+    memory = getattr(agent, 'memory', None)
+    if memory is not None and isinstance(getattr(memory, 'runs', None), dict):
+        memory.runs = {}
+
+
+def prime_agent(agent) -> None:
+    """
+    Process the agent's tool schemas ahead of its first run.
+
+    Agno builds a Pydantic validator for every tool the first time an instance runs, which
+    costs hundreds of milliseconds of CPU per instance; doing it at warm-up keeps that cost
+    off the first learner's request.
+    """
+    agent.determine_tools_for_model(model=agent.model, session_id="warm-up")
+
+
+class AgentPool:
+    """
+    Bounded pool of agent instances built by a factory (e.g. `create_learner_profiler_agent`).
+
+    Instances are created on demand up to `max_size`; when all of them are checked out,
+    callers wait (up to `checkout_timeout`) for one to be checked back in.
+
+    Example:
+        >>> pool = AgentPool("learner_profiler", create_learner_profiler_agent, max_size=8)
+        >>> pool.warm_up(2)
+        >>> with pool.lease() as agent:
+        ...     response = agent.run("Analyser le profil pour user_id: User123")
+        >>> pool.stats()["checkouts"]
+        1
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable,
+        max_size: int = AGENT_POOL_SIZE,
+        checkout_timeout: float = AGENT_POOL_CHECKOUT_TIMEOUT_SECONDS,
+        reset: Optional[Callable] = reset_agent,
+        prepare: Optional[Callable] = prime_agent
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.name = name
+        self.factory = factory
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.reset = reset
+        self.prepare = prepare
+
+        self._idle = deque()
+        self._size = 0  # Instances created (or being created) by this pool
+        self._condition = threading.Condition()
+        # id(instance) -> future of a run the caller stopped waiting for but that may still be
+        # executing; the instance keeps its slot until that run ends (see `release_after()`)
+        self._abandoned = {}
+        self._draining = 0
+
+        # Metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def _create(self):
+        try:
+            agent = self.factory()
+            if self.prepare is not None:
+                self.prepare(agent)
+            return agent
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def warm_up(self, count: int = AGENT_POOL_WARM) -> int:
+        """
+        Pre-build agent instances so the first requests do not pay construction cost.
+
+        Args:
+            count: Number of idle instances to have ready (capped at max_size)
+
+        Returns:
+            Number of instances created
+        """
+        created = 0
+        while True:
+            with self._condition:
+                if len(self._idle) >= count or self._size >= self.max_size:
+                    break
+                self._size += 1
+
+            agent = self._create()
+            with self._condition:
+                self._idle.append(agent)
+                self._condition.notify()
+            created += 1
+
+        return created
+
+    def checkout(self, timeout: Optional[float] = None):
+        """
+        Take an agent instance out of the pool for exclusive use.
+
+        Args:
+            timeout: Maximum seconds to wait for a free instance (defaults to checkout_timeout)
+
+        Returns:
+            An agent instance, to be returned with `checkin()`
+        """
+        timeout = timeout if timeout is not None else self.checkout_timeout
+        started = time.perf_counter()
+        deadline = started + timeout
+        waited = False
+
+        with self._condition:
+            while not self._idle and self._size >= self.max_size:
+                waited = True
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise AgentPoolTimeout(
+                        f"No {self.name} agent available after {timeout}s (pool size {self.max_size})"
+                    )
+                self._condition.wait(remaining)
+
+            wait_seconds = time.perf_counter() - started
+            self._checkouts += 1
+            self._total_wait_seconds += wait_seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, wait_seconds)
+            if waited:
+                self._waits += 1
+
+            if self._idle:
+                return self._idle.pop()
+
+            self._size += 1
+
+        return self._create()
+
+    def checkin(self, agent) -> None:
+        """
+        Return an agent instance to the pool.
+
+        Args:
+            agent: Instance previously obtained from `checkout()`
+        """
+        if self.reset is not None:
+            try:
+                self.reset(agent)
+            except Exception:
+                # Never put a half-reset instance back; let the pool build a fresh one
+                self.discard(agent)
+                raise
+
+        with self._condition:
+            self._idle.append(agent)
+            self._condition.notify()
+
+    def discard(self, agent) -> None:
+        """
+        Drop a checked-out instance instead of returning it (e.g. its run was interrupted).
+
+        Args:
+            agent: Instance previously obtained from `checkout()`
+        """
+        with self._condition:
+            self._size -= 1
+            self._discarded += 1
+            self._condition.notify()
+
+    def release_after(self, agent, future: Future) -> None:
+        """
+        Mark a leased instance's run as abandoned but possibly still executing.
+
+        A started thread cannot be cancelled, so when the lease ends with an error the
+        instance's slot stays taken until `future` is done; the pool never has more than
+        `max_size` runs in flight.
+
+        Args:
+            agent: Instance checked out through `lease()`
+            future: Future of the run executing on that instance
+        """
+        with self._condition:
+            self._abandoned[id(agent)] = future
+
+    def _drained(self, agent) -> None:
+        with self._condition:
+            self._draining -= 1
+        self.discard(agent)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """
+        Context manager wrapping `checkout()` / `checkin()`.
+
+        If the block raises, the instance may still be mid-run (timeouts, cancelled streams),
+        so it is discarded rather than handed to another request, once its run has ended.
+        """
+        agent = self.checkout(timeout)
+        try:
+            yield agent
+        except BaseException:
+            with self._condition:
+                future = self._abandoned.pop(id(agent), None)
+                if future is not None:
+                    self._draining += 1
+            if future is None:
+                self.discard(agent)
+            else:
+                future.add_done_callback(lambda _: self._drained(agent))
+            raise
+        else:
+            with self._condition:
+                self._abandoned.pop(id(agent), None)
+            self.checkin(agent)
+
+    def stats(self) -> Dict:
+        """
+        Return pool size and checkout wait-time metrics.
+
+        Returns:
+            Dict with size, idle/in-use counts, instances still finishing an abandoned run,
+            checkouts, waits, timeouts, discards and wait times (ms)
+        """
+        with self._condition:
+            idle = len(self._idle)
+            return {
+                "name": self.name,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "draining": self._draining,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "avg_wait_ms": round(1000 * self._total_wait_seconds / self._checkouts, 2) if self._checkouts else 0.0,
+                "max_wait_ms": round(1000 * self._max_wait_seconds, 2)
+            }
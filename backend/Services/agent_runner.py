@@ -0,0 +1,283 @@
+"""
+Agent execution runner for the Flask API
+
+This module decouples HTTP request handling from agent execution. Instead of calling the
+blocking `Agent.run()` inside each request thread, agent runs are scheduled on a shared
+asyncio event loop through `Agent.arun()`, so hundreds of in-flight LLM calls can overlap
+on one process. A semaphore caps how many runs are in flight at the same time.
+
+Two serving modes are available (AGENT_SERVING_MODE):
+- async:   runs go through `Agent.arun()` on a dedicated event loop thread (default)
+- threads: runs go through `Agent.run()` on a bounded thread pool
+"""
+
+import os
+import asyncio
+import contextvars
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+AGENT_SERVING_MODE = os.getenv('AGENT_SERVING_MODE', 'async')
+AGENT_MAX_CONCURRENCY = int(os.getenv('AGENT_MAX_CONCURRENCY', '64'))
+AGENT_RUN_TIMEOUT_SECONDS = float(os.getenv('AGENT_RUN_TIMEOUT_SECONDS', '300'))
+
+# Marks the end of a streamed run in the event queue
+_STREAM_END = object()
+
+
+class AgentRunner:
+    """
+    Run agents concurrently with a configurable concurrency cap.
+
+    Example:
+        >>> runner = AgentRunner(mode="async", max_concurrency=64)
+        >>> response = runner.run(agent, "Analyser le profil pour user_id: User123")
+        >>> response.content
+        '...'
+    """
+
+    def __init__(
+        self,
+        mode: str = AGENT_SERVING_MODE,
+        max_concurrency: int = AGENT_MAX_CONCURRENCY,
+        timeout: Optional[float] = AGENT_RUN_TIMEOUT_SECONDS
+    ):
+        if mode not in ('async', 'threads'):
+            raise ValueError(f"Unknown serving mode: {mode} (expected 'async' or 'threads')")
+
+        self.mode = mode
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._hedge_lost = 0
+
+        if mode == 'async':
+            self._loop = asyncio.new_event_loop()
+            self._semaphore = None
+            self._thread = threading.Thread(
+                target=self._run_loop,
+                name="agent-runner-loop",
+                daemon=True
+            )
+            self._thread.start()
+            # The semaphore must be created on the loop that will use it
+            asyncio.run_coroutine_threadsafe(self._create_semaphore(), self._loop).result()
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_concurrency,
+                thread_name_prefix="agent-runner"
+            )
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _create_semaphore(self):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _arun(self, agent, prompt: str, **kwargs) -> Any:
+        async with self._semaphore:
+            return await agent.arun(prompt, **kwargs)
+
+    async def _arun_stream(self, agent, prompt: str, events: queue.Queue, **kwargs):
+        async with self._semaphore:
+            try:
+                response_stream = await agent.arun(
+                    prompt,
+                    stream=True,
+                    stream_intermediate_steps=True,
+                    **kwargs
+                )
+                async for event in response_stream:
+                    events.put(event)
+            except Exception as e:
+                events.put(e)
+            finally:
+                events.put(_STREAM_END)
+
+    def _run_stream(self, agent, prompt: str, events: queue.Queue, **kwargs):
+        try:
+            for event in agent.run(prompt, stream=True, stream_intermediate_steps=True, **kwargs):
+                events.put(event)
+        except Exception as e:
+            events.put(e)
+        finally:
+            events.put(_STREAM_END)
+
+    def _track(self, delta: int, outcome: str = 'completed'):
+        with self._lock:
+            self._in_flight += delta
+            if delta < 0:
+                if outcome == 'failed':
+                    self._failed += 1
+                elif outcome == 'hedge_lost':
+                    self._hedge_lost += 1
+                else:
+                    self._completed += 1
+
+    def _settle(self, future: Optional[Future], outcome: str) -> None:
+        # A run abandoned while executing (a started thread cannot be cancelled) stays in
+        # flight until it really ends
+        if future is None or future.done():
+            self._track(-1, outcome)
+        else:
+            future.add_done_callback(lambda _: self._track(-1, outcome))
+
+    def run(
+        self,
+        agent,
+        prompt: str,
+        timeout: Optional[float] = None,
+        wait: Optional[Callable[[Future, float], Any]] = None,
+        on_submit: Optional[Callable[[Future], None]] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Run an agent and block the calling thread until its response is ready.
+
+        The calling (request) thread only waits on a future; the agent itself runs on the
+        shared event loop or worker pool, so slow LLM calls do not stall other learners.
+
+        Args:
+            agent: Agno agent to run
+            prompt: User message sent to the agent
+            timeout: Maximum seconds to wait (defaults to AGENT_RUN_TIMEOUT_SECONDS)
+            wait: Optional `wait(future, timeout)` returning the run's response in place of
+                `future.result(timeout)` (e.g. to hedge the run, see Services/resilience.py);
+                if it raises, the run is cancelled and counted by the error's `run_outcome`
+                (e.g. 'hedge_lost'), else as failed
+            on_submit: Optional callback receiving the run's future once scheduled; a run
+                that already started keeps executing after a timeout or cancellation, so
+                callers can tell when it really ends (e.g. `AgentPool.release_after`)
+            **kwargs: Extra keyword arguments forwarded to `arun()` / `run()`
+
+        Returns:
+            The agent's RunResponse
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        # Agno keeps `stream=True` on the agent after a streamed run, so be explicit
+        kwargs.setdefault('stream', False)
+
+        self._track(+1)
+        outcome = 'failed'
+        future = None
+        try:
+            if self.mode == 'async':
+                future = asyncio.run_coroutine_threadsafe(
+                    self._arun(agent, prompt, **kwargs),
+                    self._loop
+                )
+            else:
+                # Copy the caller's context so context variables (e.g. the tool memo) follow the run
+                future = self._executor.submit(contextvars.copy_context().run, agent.run, prompt, **kwargs)
+            if on_submit is not None:
+                on_submit(future)
+
+            try:
+                response = wait(future, timeout) if wait is not None else future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise TimeoutError(f"Agent run exceeded {timeout}s")
+            except BaseException as e:
+                # Abandoned by `wait` (e.g. its hedge answered first)
+                outcome = getattr(e, 'run_outcome', 'failed')
+                future.cancel()
+                raise
+
+            outcome = 'completed'
+            return response
+        finally:
+            self._settle(future, outcome)
+
+    def stream(
+        self,
+        agent,
+        prompt: str,
+        timeout: Optional[float] = None,
+        on_submit: Optional[Callable[[Future], None]] = None,
+        deadline_at: Optional[float] = None,
+        **kwargs
+    ) -> Iterator[Any]:
+        """
+        Run an agent in streaming mode and yield its events as they are produced.
+
+        Events include content deltas, tool call started/completed and reasoning steps.
+        If the consumer stops iterating (e.g. the client disconnected), the run is cancelled.
+
+        Args:
+            agent: Agno agent to run
+            prompt: User message sent to the agent
+            timeout: Maximum seconds to wait between two events
+            on_submit: Optional callback receiving the run's future once scheduled (see `run()`)
+            deadline_at: Optional `time.perf_counter()` value by which the whole stream must
+                have ended, however steadily events arrive
+            **kwargs: Extra keyword arguments forwarded to `arun()` / `run()`
+
+        Yields:
+            Agno run response events
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        events = queue.Queue()
+
+        self._track(+1)
+        outcome = 'failed'
+        if self.mode == 'async':
+            future = asyncio.run_coroutine_threadsafe(
+                self._arun_stream(agent, prompt, events, **kwargs),
+                self._loop
+            )
+        else:
+            future = self._executor.submit(contextvars.copy_context().run, self._run_stream, agent, prompt, events, **kwargs)
+        if on_submit is not None:
+            on_submit(future)
+
+        try:
+            while True:
+                wait_seconds = timeout
+                if deadline_at is not None:
+                    wait_seconds = min(wait_seconds, deadline_at - time.perf_counter())
+                    if wait_seconds <= 0:
+                        raise TimeoutError("Agent stream exceeded its deadline")
+                try:
+                    event = events.get(timeout=wait_seconds)
+                except queue.Empty:
+                    if wait_seconds < timeout:
+                        raise TimeoutError("Agent stream exceeded its deadline")
+                    raise TimeoutError(f"Agent stream stalled for more than {timeout}s")
+
+                if event is _STREAM_END:
+                    break
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+
+            outcome = 'completed'
+        finally:
+            future.cancel()
+            self._settle(future, outcome)
+
+    def stats(self) -> Dict:
+        """
+        Return runner configuration and live counters.
+
+        Returns:
+            Dict with serving mode, concurrency cap and run counters (runs abandoned because
+            their hedge answered first are counted as `hedge_lost`, not failed)
+        """
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "failed": self._failed,
+                "hedge_lost": self._hedge_lost
+            }
@@ -0,0 +1,418 @@
+"""
+Bounded persistent sessions for the Learning Assistant
+
+/api/assistant used to be stateless, so clients resent the conversation with every question.
+Each learner now has a session stored in SQLite: the recent turns verbatim, plus a rolling
+summary of everything older. Once 2 x ASSISTANT_SESSION_WINDOW_TURNS turns are kept, the
+oldest ASSISTANT_SESSION_WINDOW_TURNS are folded into the summary in one summarisation. Only
+those turns (truncated) and the summary are added to the prompt, so its size stays bounded
+however long the conversation runs.
+
+Session reads are served from an in-memory LRU of active learners (SQLite is only read on a
+miss, outside the lock); turns are appended in memory and persisted by a background writer,
+which also folds turns leaving the window into a quick summary of their topics. The model
+summary replacing it is written later by a small pool of summary workers, so a slow or failing
+summarizer never holds up the writes of other learners. Neither write nor summarisation runs
+on the request path. A session with writes not persisted yet is never evicted, and a reset
+leaves an empty session in its place until the delete is persisted, so the LRU never reloads
+data that SQLite is about to drop or has not received yet. At most
+ASSISTANT_SESSION_MAX_PENDING_WRITES turns wait for the writer; past that, new turns are not
+recorded.
+"""
+
+import os
+import time
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from Modules.PersonnalisationAndRecommendation.PersonalisedLearning import db_file
+
+
+# Same SQLite file as the agents' storage by default
+ASSISTANT_SESSION_DB_FILE = os.getenv('ASSISTANT_SESSION_DB_FILE', db_file)
+ASSISTANT_SESSION_WINDOW_TURNS = int(os.getenv('ASSISTANT_SESSION_WINDOW_TURNS', '4'))
+ASSISTANT_SESSION_MAX_ANSWER_CHARS = int(os.getenv('ASSISTANT_SESSION_MAX_ANSWER_CHARS', '600'))
+ASSISTANT_SESSION_MAX_SUMMARY_CHARS = int(os.getenv('ASSISTANT_SESSION_MAX_SUMMARY_CHARS', '1200'))
+ASSISTANT_SESSION_CACHE_USERS = int(os.getenv('ASSISTANT_SESSION_CACHE_USERS', '10000'))
+ASSISTANT_SESSION_MAX_PENDING_WRITES = int(os.getenv('ASSISTANT_SESSION_MAX_PENDING_WRITES', '10000'))
+ASSISTANT_SESSION_SUMMARY_WORKERS = int(os.getenv('ASSISTANT_SESSION_SUMMARY_WORKERS', '2'))
+ASSISTANT_SESSION_MAX_PENDING_SUMMARIES = int(os.getenv('ASSISTANT_SESSION_MAX_PENDING_SUMMARIES', '100'))
+
+# Marks the end of the writer queue
+_STOP = object()
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    text = " ".join(str(text or "").split())
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+def fallback_summary(summary: str, turns: List[Dict], max_chars: int) -> str:
+    """
+    Summary used when no summarizer is configured or it fails: the topics of the folded questions.
+    """
+    topics = "; ".join(_truncate(turn['question'], 120) for turn in turns)
+    text = f"{summary} Questions précédentes: {topics}" if summary else f"Questions précédentes: {topics}"
+    # Keep the most recent part when it overflows
+    return text if len(text) <= max_chars else "…" + text[-(max_chars - 1):]
+
+
+class _Session:
+    __slots__ = ('summary', 'turns', 'pending_writes', 'pending_resets')
+
+    def __init__(self, summary: str = "", turns: Optional[List[Dict]] = None):
+        self.summary = summary
+        self.turns = turns or []
+        # Writes queued for the writer and not persisted yet; the session stays cached meanwhile
+        self.pending_writes = 0
+        # Resets among them: SQLite still holds the data the reset dropped
+        self.pending_resets = 0
+
+
+class AssistantSessions:
+    """
+    Per-learner conversation window and rolling summary, persisted in SQLite.
+
+    `summarize(previous_summary, turns)` returns the new summary text (e.g. a fast-tier agent
+    run). Folded turns are first reduced to the topics of their questions; the summary then
+    replaces that text once a summary worker produced it. Without a summarizer, when it fails
+    or when too many summaries are pending, the topics are kept.
+
+    Example:
+        >>> sessions = AssistantSessions(db_file="tmp/learner_profiler.db", window_turns=4)
+        >>> sessions.start()
+        >>> sessions.context("User123")
+        {'summary': '', 'turns': []}
+        >>> sessions.record_turn("User123", "Qu'est-ce que le machine learning ?", "Le machine learning est...")
+        >>> len(sessions.context("User123")["turns"])
+        1
+    """
+
+    def __init__(
+        self,
+        db_file: str = ASSISTANT_SESSION_DB_FILE,
+        window_turns: int = ASSISTANT_SESSION_WINDOW_TURNS,
+        max_answer_chars: int = ASSISTANT_SESSION_MAX_ANSWER_CHARS,
+        max_summary_chars: int = ASSISTANT_SESSION_MAX_SUMMARY_CHARS,
+        cache_users: int = ASSISTANT_SESSION_CACHE_USERS,
+        summarize: Optional[Callable[[str, List[Dict]], str]] = None,
+        max_pending_writes: int = ASSISTANT_SESSION_MAX_PENDING_WRITES,
+        summary_workers: int = ASSISTANT_SESSION_SUMMARY_WORKERS,
+        max_pending_summaries: int = ASSISTANT_SESSION_MAX_PENDING_SUMMARIES
+    ):
+        if window_turns < 1:
+            raise ValueError("window_turns must be at least 1")
+
+        self.db_file = db_file
+        self.window_turns = window_turns
+        self.max_answer_chars = max_answer_chars
+        self.max_summary_chars = max_summary_chars
+        self.cache_users = cache_users
+        self.summarize = summarize
+        self.max_pending_writes = max_pending_writes
+        self.max_pending_summaries = max_pending_summaries
+
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # user_id -> _Session (most recently used last)
+        # Bounded by `max_pending_writes` in `record_turn()`; resets are always queued
+        self._writes = queue.Queue()
+        self._thread = None
+        self._deletes = 0  # resets persisted so far, to detect a load racing one
+        self._summary_executor = ThreadPoolExecutor(
+            max_workers=summary_workers, thread_name_prefix='assistant-summary'
+        ) if summarize is not None else None
+        self._pending_summaries = 0
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._turns_written = 0
+        self._summaries = 0
+        self._summary_failures = 0
+        self._summaries_skipped = 0
+        self._turns_dropped = 0
+
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_file, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _create_schema(self) -> None:
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS assistant_sessions (
+                    user_id TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL DEFAULT '',
+                    updated_at REAL NOT NULL
+                )
+            """)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS assistant_turns (
+                    turn_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_assistant_turns_user ON assistant_turns (user_id, turn_id)")
+
+    def start(self) -> None:
+        """
+        Start the background writer thread.
+        """
+        self._thread = threading.Thread(target=self._write_loop, name="assistant-sessions-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Persist the pending turns, then stop the writer thread (pending summaries are dropped).
+        """
+        self._writes.put(_STOP)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._summary_executor is not None:
+            self._summary_executor.shutdown(wait=False)
+
+    def _load(self, user_id: str) -> _Session:
+        with self._connect() as connection:
+            # One read transaction, so a fold committed meanwhile is seen entirely or not at all
+            connection.execute("BEGIN")
+            row = connection.execute("SELECT summary FROM assistant_sessions WHERE user_id = ?", (user_id,)).fetchone()
+            turns = connection.execute(
+                "SELECT question, answer FROM assistant_turns WHERE user_id = ? ORDER BY turn_id",
+                (user_id,)
+            ).fetchall()
+        return _Session(
+            row['summary'] if row is not None else "",
+            [{'question': turn['question'], 'answer': turn['answer']} for turn in turns]
+        )
+
+    def _evict(self) -> None:
+        # Called with the lock held; sessions with unpersisted writes are skipped
+        while len(self._sessions) > self.cache_users:
+            user_id = next((key for key, session in self._sessions.items() if not session.pending_writes), None)
+            if user_id is None:
+                return
+            del self._sessions[user_id]
+
+    @contextmanager
+    def _session(self, user_id: str):
+        """
+        Yield the learner's cached session with the lock held, loading it from SQLite on a
+        miss without holding the lock.
+        """
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is not None:
+                self._sessions.move_to_end(user_id)
+                self._hits += 1
+                yield session
+                return
+            self._misses += 1
+
+        while True:
+            with self._lock:
+                deletes = self._deletes
+            loaded = self._load(user_id)
+            with self._lock:
+                # Another request may have loaded it, or reset it, meanwhile
+                session = self._sessions.get(user_id)
+                if session is None:
+                    if self._deletes != deletes:
+                        # A reset was persisted during the load: it may have read the dropped data
+                        continue
+                    session = self._sessions[user_id] = loaded
+                    self._evict()
+                else:
+                    self._sessions.move_to_end(user_id)
+                yield session
+                return
+
+    def context(self, user_id: str) -> Dict:
+        """
+        Return the learner's rolling summary and the turns not folded into it yet (oldest first).
+        """
+        with self._session(user_id) as session:
+            return {'summary': session.summary, 'turns': list(session.turns[-2 * self.window_turns:])}
+
+    def record_turn(self, user_id: str, question: str, answer: str) -> None:
+        """
+        Add a question/answer turn to the learner's session; it is persisted in the background.
+
+        The turn is not recorded when `max_pending_writes` writes already wait for the writer.
+        """
+        turn = {'question': _truncate(question, self.max_answer_chars), 'answer': _truncate(answer, self.max_answer_chars)}
+        with self._session(user_id) as session:
+            if self._writes.qsize() >= self.max_pending_writes:
+                self._turns_dropped += 1
+                return
+            session.turns.append(turn)
+            session.pending_writes += 1
+            # Queued under the lock so writes are persisted in the order they were applied
+            self._writes.put((user_id, turn))
+
+    def reset(self, user_id: str) -> None:
+        """
+        Forget a learner's session (summary and turns).
+
+        The session is replaced by an empty one right away; it stays cached until the
+        delete is persisted, so later requests never read the old turns back from SQLite.
+        """
+        with self._lock:
+            previous = self._sessions.pop(user_id, None)
+            session = self._sessions[user_id] = _Session()
+            session.pending_writes = (previous.pending_writes if previous is not None else 0) + 1
+            session.pending_resets = (previous.pending_resets if previous is not None else 0) + 1
+            self._evict()
+            self._writes.put((user_id, None))
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._writes.get()
+            if item is _STOP:
+                return
+            user_id, turn = item
+            try:
+                if turn is None:
+                    self._delete(user_id)
+                else:
+                    self._append(user_id, turn)
+                    self._fold(user_id)
+            except Exception as e:
+                print(f"[WARN] Assistant session write failed for {user_id}: {e}")
+            finally:
+                with self._lock:
+                    if turn is None:
+                        self._deletes += 1
+                    session = self._sessions.get(user_id)
+                    if session is not None:
+                        session.pending_writes -= 1
+                        if turn is None:
+                            session.pending_resets -= 1
+
+    def _delete(self, user_id: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM assistant_turns WHERE user_id = ?", (user_id,))
+            connection.execute("DELETE FROM assistant_sessions WHERE user_id = ?", (user_id,))
+
+    def _append(self, user_id: str, turn: Dict) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO assistant_turns (user_id, question, answer, created_at) VALUES (?, ?, ?, ?)",
+                (user_id, turn['question'], turn['answer'], time.time())
+            )
+        with self._lock:
+            self._turns_written += 1
+
+    def _fold(self, user_id: str) -> None:
+        """
+        Fold the oldest window of persisted turns into the summary once two windows are kept.
+
+        The topics of the folded turns are appended to the summary right away; the model
+        summary is requested from a summary worker.
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT summary FROM assistant_sessions WHERE user_id = ?", (user_id,)).fetchone()
+            rows = connection.execute(
+                "SELECT turn_id, question, answer FROM assistant_turns WHERE user_id = ? ORDER BY turn_id",
+                (user_id,)
+            ).fetchall()
+
+        if len(rows) < 2 * self.window_turns:
+            return
+        folded = rows[:len(rows) - self.window_turns]
+
+        previous = row['summary'] if row is not None else ""
+        turns = [{'question': turn['question'], 'answer': turn['answer']} for turn in folded]
+        summary = fallback_summary(previous, turns, self.max_summary_chars)
+
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO assistant_sessions (user_id, summary, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET summary = excluded.summary, updated_at = excluded.updated_at",
+                (user_id, summary, time.time())
+            )
+            connection.execute(
+                "DELETE FROM assistant_turns WHERE user_id = ? AND turn_id <= ?",
+                (user_id, folded[-1]['turn_id'])
+            )
+
+        with self._lock:
+            session = self._sessions.get(user_id)
+            # After a pending reset, the cached session no longer holds these turns
+            if session is not None and not session.pending_resets:
+                session.summary = summary
+                # Turns recorded since then stay in memory
+                del session.turns[:len(folded)]
+
+            if self._summary_executor is None:
+                return
+            if self._pending_summaries >= self.max_pending_summaries:
+                self._summaries_skipped += 1
+                return
+            self._pending_summaries += 1
+        self._summary_executor.submit(self._summarize, user_id, previous, turns, summary)
+
+    def _summarize(self, user_id: str, previous: str, turns: List[Dict], placeholder: str) -> None:
+        """
+        Replace the topics written by a fold with the model's summary, unless the learner's
+        summary changed since (another fold or a reset).
+        """
+        try:
+            summary = _truncate(self.summarize(previous, turns), self.max_summary_chars)
+        except Exception as e:
+            print(f"[WARN] Assistant session summary failed for {user_id}: {e}")
+            with self._lock:
+                self._summary_failures += 1
+            return
+        finally:
+            with self._lock:
+                self._pending_summaries -= 1
+        if not summary:
+            return
+
+        with self._connect() as connection:
+            replaced = connection.execute(
+                "UPDATE assistant_sessions SET summary = ?, updated_at = ? WHERE user_id = ? AND summary = ?",
+                (summary, time.time(), user_id, placeholder)
+            ).rowcount
+
+        with self._lock:
+            if not replaced:
+                return
+            self._summaries += 1
+            session = self._sessions.get(user_id)
+            if session is not None and session.summary == placeholder and not session.pending_resets:
+                session.summary = summary
+
+    def stats(self) -> Dict:
+        """
+        Return cached sessions, pending writes and summaries, cache hits/misses, summaries
+        written and the turns or summaries skipped because too many were pending.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'window_turns': self.window_turns,
+                'cached_sessions': len(self._sessions),
+                'pending_writes': self._writes.qsize(),
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'turns_written': self._turns_written,
+                'pending_summaries': self._pending_summaries,
+                'summaries': self._summaries,
+                'summary_failures': self._summary_failures,
+                'summaries_skipped': self._summaries_skipped,
+                'turns_dropped': self._turns_dropped
+            }
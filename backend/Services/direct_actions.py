@@ -0,0 +1,128 @@
+"""
+Direct-tool ("no-LLM") execution of deterministic API actions
+
+Several profiler / recommender actions map one-to-one onto a single tool. In `mode=direct`
+the API calls that tool and returns its structured output as-is, skipping the grok-3 round
+trip entirely. This is meant for dashboard widgets that only need the numbers.
+"""
+
+from typing import Any, Dict
+
+from Tools.learner_tools import (
+    get_learner_behavior_history,
+    calculate_learning_style_score,
+    identify_skill_gaps,
+    get_engagement_metrics,
+    get_learner_profile_from_db
+)
+from Tools.recommendation_tools import (
+    build_learning_path,
+    get_next_best_content,
+    check_prerequisite_completion
+)
+from Tools.assistant_tools import search_edflex_knowledge_base
+
+
+class DirectActionError(ValueError):
+    """Raised when an action cannot be served in direct mode (unsupported or missing parameters)."""
+
+
+# (endpoint, action) -> tool, request fields required, optional request fields
+# Request fields are mapped onto tool arguments by `argument_names`
+DIRECT_ACTIONS = {
+    ('profiler', 'analyze_behavior'): {
+        'tool': get_learner_behavior_history,
+        'required': ['user_id'],
+        'optional': ['days_back']
+    },
+    ('profiler', 'identify_learning_style'): {
+        'tool': calculate_learning_style_score,
+        'required': ['user_id'],
+        'optional': []
+    },
+    ('profiler', 'detect_skill_gaps'): {
+        'tool': identify_skill_gaps,
+        'required': ['user_id', 'job_role'],
+        'optional': []
+    },
+    ('profiler', 'calculate_engagement'): {
+        'tool': get_engagement_metrics,
+        'required': ['user_id'],
+        'optional': ['period_days']
+    },
+    ('profiler', 'get_full_profile'): {
+        'tool': get_learner_profile_from_db,
+        'required': ['user_id'],
+        'optional': []
+    },
+    ('recommender', 'get_next_content'): {
+        'tool': get_next_best_content,
+        'required': ['user_id'],
+        'optional': ['count']
+    },
+    ('recommender', 'build_learning_path'): {
+        'tool': build_learning_path,
+        'required': ['user_id', 'goal'],
+        'optional': ['max_content_items'],
+        'argument_names': {'goal': 'skill_target'}
+    },
+    ('recommender', 'check_prerequisites'): {
+        'tool': check_prerequisite_completion,
+        'required': ['user_id', 'content_id'],
+        'optional': []
+    },
+    # Not exposed as a direct mode: the Learning Assistant's answer when the model is unavailable
+    ('assistant', 'search_knowledge_base'): {
+        'tool': search_edflex_knowledge_base,
+        'required': ['question'],
+        'optional': ['context']
+    },
+}
+
+
+def supports_direct(endpoint: str, action: str) -> bool:
+    """
+    Return True if the action can be served without the LLM.
+    """
+    return (endpoint, action) in DIRECT_ACTIONS
+
+
+def run_direct_action(endpoint: str, action: str, data: Dict) -> Any:
+    """
+    Call the tool behind an action with arguments taken from the request body.
+
+    Args:
+        endpoint: API endpoint name (profiler, recommender)
+        action: Action requested on that endpoint
+        data: Request JSON body
+
+    Returns:
+        The tool's structured output (dict or list)
+
+    Example:
+        >>> run_direct_action('profiler', 'calculate_engagement', {'user_id': 'User123'})
+        {'user_id': 'User123', 'period_days': 7, 'sessions_per_week': 4.2, ...}
+    """
+    spec = DIRECT_ACTIONS.get((endpoint, action))
+    if spec is None:
+        supported = sorted(a for (e, a) in DIRECT_ACTIONS if e == endpoint)
+        raise DirectActionError(
+            f"Action '{action}' is not available in direct mode for {endpoint} (supported: {', '.join(supported)})"
+        )
+
+    missing = [field for field in spec['required'] if not data.get(field)]
+    if missing:
+        raise DirectActionError(f"{', '.join(missing)} required for {action} in direct mode")
+
+    argument_names = spec.get('argument_names', {})
+    kwargs = {}
+    for field in spec['required'] + spec['optional']:
+        if data.get(field) is not None:
+            kwargs[argument_names.get(field, field)] = data[field]
+
+    # @tool wraps the function in an agno Function; call the underlying implementation
+    try:
+        return spec['tool'].entrypoint(**kwargs)
+    except (TypeError, ValueError) as e:
+        # Bad argument types (e.g. a non-numeric period_days) are client errors
+        raise DirectActionError(f"Invalid arguments for {action}: {e}")
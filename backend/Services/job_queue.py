@@ -0,0 +1,380 @@
+"""
+Persistent job queue for long-running agent requests
+
+Requests such as `build_learning_path` with a goal can outlive HTTP timeouts behind the
+load balancer. Instead of holding the connection open, clients submit a job, get a job id
+back immediately and poll for status, progress and the result.
+
+Jobs are stored in SQLite so they survive a restart and can be shared by several worker
+processes. A running job is leased by the worker that claimed it; the worker renews its
+leases from a heartbeat thread, and a job whose lease expired (its worker died) is put back
+in the queue by whichever worker polls next. Submitting a job whose dedupe key is already
+queued or running returns the existing job instead of creating a new one.
+
+Jobs failing with a retryable error (e.g. admission rejected under load) are queued again
+after a backoff instead of being marked as failed.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+
+JOB_QUEUE_DB_FILE = os.getenv('JOB_QUEUE_DB_FILE', 'tmp/jobs.db')
+JOB_QUEUE_WORKERS = int(os.getenv('JOB_QUEUE_WORKERS', '4'))
+JOB_QUEUE_POLL_INTERVAL_SECONDS = float(os.getenv('JOB_QUEUE_POLL_INTERVAL_SECONDS', '1'))
+JOB_QUEUE_RETENTION_SECONDS = float(os.getenv('JOB_QUEUE_RETENTION_SECONDS', str(7 * 24 * 3600)))
+JOB_QUEUE_LEASE_SECONDS = float(os.getenv('JOB_QUEUE_LEASE_SECONDS', '30'))
+JOB_QUEUE_RETRY_BASE_SECONDS = float(os.getenv('JOB_QUEUE_RETRY_BASE_SECONDS', '5'))
+JOB_QUEUE_RETRY_MAX_SECONDS = float(os.getenv('JOB_QUEUE_RETRY_MAX_SECONDS', '300'))
+JOB_QUEUE_MAX_ATTEMPTS = int(os.getenv('JOB_QUEUE_MAX_ATTEMPTS', '8'))
+
+IN_FLIGHT_STATUSES = ('queued', 'running')
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue processed by worker threads.
+
+    Example:
+        >>> jobs = JobQueue(db_file="tmp/jobs.db", workers=2, retryable_errors=(AdmissionRejected,))
+        >>> jobs.register("recommender", lambda payload, progress: {"path": "..."})
+        >>> jobs.start()
+        >>> job_id, created = jobs.submit("recommender", {"user_id": "User123"}, dedupe_key="User123:Python")
+        >>> jobs.get(job_id)["status"]
+        'queued'
+    """
+
+    def __init__(
+        self,
+        db_file: str = JOB_QUEUE_DB_FILE,
+        workers: int = JOB_QUEUE_WORKERS,
+        poll_interval: float = JOB_QUEUE_POLL_INTERVAL_SECONDS,
+        retention_seconds: float = JOB_QUEUE_RETENTION_SECONDS,
+        lease_seconds: float = JOB_QUEUE_LEASE_SECONDS,
+        retry_base_seconds: float = JOB_QUEUE_RETRY_BASE_SECONDS,
+        retry_max_seconds: float = JOB_QUEUE_RETRY_MAX_SECONDS,
+        max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS,
+        retryable_errors: Tuple[Type[BaseException], ...] = ()
+    ):
+        self.db_file = db_file
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.lease_seconds = lease_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_attempts = max_attempts
+        # Errors meaning "not now" rather than "this job is broken": the job is queued again
+        # after a backoff (at least the error's `retry_after`, when it has one)
+        self.retryable_errors = retryable_errors
+
+        # Identifies this process's leases among the workers sharing the database
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._handlers = {}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._reclaimed = 0
+        self._retried = 0
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; write transactions are opened explicitly with BEGIN IMMEDIATE
+        connection = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _create_schema(self) -> None:
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    dedupe_key TEXT,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner TEXT,
+                    lease_expires_at REAL,
+                    run_after REAL NOT NULL DEFAULT 0
+                )
+            """)
+            # Databases created before leases and retries were added
+            columns = {row['name'] for row in connection.execute("PRAGMA table_info(jobs)")}
+            for name, definition in (
+                ('owner', 'TEXT'),
+                ('lease_expires_at', 'REAL'),
+                ('run_after', 'REAL NOT NULL DEFAULT 0')
+            ):
+                if name not in columns:
+                    connection.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs (dedupe_key, status)")
+
+    def register(self, kind: str, handler: Callable[[Dict, Callable[[float], None]], Any]) -> None:
+        """
+        Register the function executing jobs of a given kind.
+
+        Args:
+            kind: Job kind (e.g. "recommender")
+            handler: Called with (payload, report_progress); returns a JSON-serializable result
+        """
+        self._handlers[kind] = handler
+
+    def start(self) -> None:
+        """
+        Recover interrupted jobs, purge old ones and start the worker and heartbeat threads.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+                (time.time() - self.retention_seconds,)
+            )
+        # Only jobs whose worker stopped renewing its lease: jobs running in other live
+        # processes sharing the database are left alone
+        self._reclaim_expired()
+
+        heartbeat = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """
+        Ask worker threads to exit after their current job.
+        """
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def submit(self, kind: str, payload: Dict, dedupe_key: Optional[str] = None) -> Tuple[str, bool]:
+        """
+        Queue a job, unless one with the same dedupe key is already queued or running.
+
+        Args:
+            kind: Job kind, must have a registered handler
+            payload: JSON-serializable job input
+            dedupe_key: Identifies equivalent work (e.g. "user_id:goal")
+
+        Returns:
+            Tuple of (job_id, created) where created is False for a deduplicated submission
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            if dedupe_key is not None:
+                row = connection.execute(
+                    "SELECT job_id FROM jobs WHERE dedupe_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                    (dedupe_key, *IN_FLIGHT_STATUSES)
+                ).fetchone()
+                if row is not None:
+                    connection.execute("COMMIT")
+                    return row['job_id'], False
+
+            job_id = f"job_{uuid.uuid4().hex}"
+            connection.execute(
+                "INSERT INTO jobs (job_id, kind, dedupe_key, payload, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, kind, dedupe_key, json.dumps(payload), time.time())
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id, True
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Return a job's status, progress and result (None if the job does not exist).
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "job_id": row['job_id'],
+            "kind": row['kind'],
+            "status": row['status'],
+            "progress": row['progress'],
+            "result": json.loads(row['result']) if row['result'] is not None else None,
+            "error": row['error'],
+            "attempts": row['attempts'],
+            "created_at": row['created_at'],
+            "started_at": row['started_at'],
+            "finished_at": row['finished_at'],
+            "retry_at": row['run_after'] if row['status'] == 'queued' and row['run_after'] > time.time() else None
+        }
+
+    def _reclaim_expired(self) -> int:
+        # Leases missing entirely belong to jobs claimed before leases existed
+        with self._connect() as connection:
+            cursor = connection.execute(
+                """
+                UPDATE jobs SET status = 'queued', progress = 0, started_at = NULL, owner = NULL,
+                    lease_expires_at = NULL
+                WHERE status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+                """,
+                (time.time(),)
+            )
+            reclaimed = cursor.rowcount
+
+        if reclaimed:
+            with self._lock:
+                self._reclaimed += reclaimed
+        return reclaimed
+
+    def _heartbeat(self) -> None:
+        # Renew this process's leases well before they expire, and put back in the queue the
+        # jobs of workers that stopped renewing theirs
+        while not self._stopping.wait(self.lease_seconds / 3):
+            with self._connect() as connection:
+                connection.execute(
+                    "UPDATE jobs SET lease_expires_at = ? WHERE status = 'running' AND owner = ?",
+                    (time.time() + self.lease_seconds, self.worker_id)
+                )
+            if self._reclaim_expired():
+                with self._wakeup:
+                    self._wakeup.notify_all()
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = connection.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' AND run_after <= ? ORDER BY created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    """
+                    UPDATE jobs SET status = 'running', started_at = ?, attempts = attempts + 1, owner = ?,
+                        lease_expires_at = ?
+                    WHERE job_id = ?
+                    """,
+                    (now, self.worker_id, now + self.lease_seconds, row['job_id'])
+                )
+            connection.execute("COMMIT")
+            return row
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def _update(self, job_id: str, **fields) -> bool:
+        # Only while this worker still holds the job: once its lease expired and the job was
+        # reclaimed, the late result of this run is dropped
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as connection:
+            cursor = connection.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ? AND status = 'running' AND owner = ?",
+                (*fields.values(), job_id, self.worker_id)
+            )
+            return cursor.rowcount > 0
+
+    def _retry_delay(self, attempts: int, error: BaseException) -> float:
+        backoff = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempts - 1))
+        return max(backoff, float(getattr(error, 'retry_after', 0) or 0))
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+
+            job_id = job['job_id']
+
+            def report_progress(fraction: float, job_id=job_id) -> None:
+                self._update(job_id, progress=max(0.0, min(1.0, fraction)))
+
+            try:
+                handler = self._handlers[job['kind']]
+                result = handler(json.loads(job['payload']), report_progress)
+                self._update(
+                    job_id,
+                    status='succeeded',
+                    progress=1.0,
+                    result=json.dumps(result, default=str),
+                    finished_at=time.time(),
+                    owner=None,
+                    lease_expires_at=None
+                )
+            except self.retryable_errors as e:
+                attempts = job['attempts'] + 1
+                if attempts >= self.max_attempts:
+                    self._update(job_id, status='failed', error=str(e), finished_at=time.time(), owner=None, lease_expires_at=None)
+                    continue
+                requeued = self._update(
+                    job_id,
+                    status='queued',
+                    progress=0,
+                    error=str(e),
+                    started_at=None,
+                    run_after=time.time() + self._retry_delay(attempts, e),
+                    owner=None,
+                    lease_expires_at=None
+                )
+                if requeued:
+                    with self._lock:
+                        self._retried += 1
+            except Exception as e:
+                self._update(job_id, status='failed', error=str(e), finished_at=time.time(), owner=None, lease_expires_at=None)
+
+    def stats(self) -> Dict:
+        """
+        Return job counts per status, plus queued jobs waiting for a retry and the number of
+        jobs this process reclaimed from expired leases or queued again for a retry.
+        """
+        with self._connect() as connection:
+            rows = connection.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+            waiting_retry = connection.execute(
+                "SELECT COUNT(*) AS count FROM jobs WHERE status = 'queued' AND run_after > ?", (time.time(),)
+            ).fetchone()['count']
+
+        counts = {status: 0 for status in ('queued', 'running', 'succeeded', 'failed')}
+        counts.update({row['status']: row['count'] for row in rows})
+        with self._lock:
+            reclaimed, retried = self._reclaimed, self._retried
+        return {
+            "workers": self.workers,
+            "worker_id": self.worker_id,
+            **counts,
+            "waiting_retry": waiting_retry,
+            "reclaimed": reclaimed,
+            "retried": retried
+        }
@@ -0,0 +1,479 @@
+"""
+Latency and token metrics in Prometheus text format
+
+Records wall time per HTTP request, per agent run, per LLM call and per tool call
+(ReasoningTools `think` / `analyze` steps show up as tool calls), plus token counts.
+Everything is exposed on /metrics; `summarize_run()` builds the compact per-response
+timing block returned when a request sets the debug flag, and `prompt_cache_stats()`
+reports the provider's prompt cache hit rate on /health.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Bucket upper bounds, in seconds
+REQUEST_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+TOOL_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """
+    Monotonic counter with labels.
+
+    Example:
+        >>> tokens = Counter("edflex_llm_tokens_total", "LLM tokens", ["agent", "type"])
+        >>> tokens.inc(512, agent="learner_profiler", type="input")
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: List[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}  # label values -> count
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        """
+        Return a copy of the counts, keyed by label values (in `label_names` order).
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """
+    Value that can go up and down, with labels.
+
+    Example:
+        >>> depth = Gauge("edflex_admission_queue_depth", "Queued agent runs", ["lane"])
+        >>> depth.set(3, lane="standard")
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: List[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}  # label values -> value
+
+    def set(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative histogram with labels (Prometheus semantics: `le` buckets, `_sum`, `_count`).
+
+    Example:
+        >>> llm = Histogram("edflex_llm_call_duration_seconds", "LLM call wall time", ["agent"], LLM_BUCKETS)
+        >>> llm.observe(1.8, agent="path_recommender")
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: List[str], buckets: Tuple[float, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    labels = _format_labels(self.label_names, key, ("le", _format_value(bound)))
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', '+Inf'))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {series[-1]}")
+        return lines
+
+
+def summarize_run(run_response) -> Dict:
+    """
+    Extract LLM call and tool call timings and token counts from an agno RunResponse.
+
+    Args:
+        run_response: Response returned by Agent.run() / arun() (or agent.run_response)
+
+    Returns:
+        Dict with llm_calls, llm_ms, input/output/cached tokens and a list of tool calls
+    """
+    summary = {
+        "llm_calls": 0,
+        "llm_ms": 0.0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cached_tokens": 0,
+        "tools": []
+    }
+
+    for message in getattr(run_response, 'messages', None) or []:
+        metrics = getattr(message, 'metrics', None)
+        if metrics is None or getattr(message, 'from_history', False):
+            continue
+
+        if message.role == 'assistant':
+            summary["llm_calls"] += 1
+            summary["llm_ms"] += 1000 * (metrics.time or 0.0)
+            summary["input_tokens"] += metrics.input_tokens or 0
+            summary["output_tokens"] += metrics.output_tokens or 0
+            summary["cached_tokens"] += metrics.cached_tokens or 0
+        elif message.role == 'tool':
+            summary["tools"].append({
+                "name": message.tool_name or "unknown",
+                "ms": round(1000 * (metrics.time or 0.0), 2),
+                "error": bool(message.tool_call_error)
+            })
+
+    summary["llm_ms"] = round(summary["llm_ms"], 2)
+    return summary
+
+
+class ApiMetrics:
+    """
+    Metrics recorded by the Flask API, rendered in Prometheus text format on /metrics.
+
+    Example:
+        >>> api_metrics = ApiMetrics()
+        >>> timing = api_metrics.observe_agent_run("path_recommender", response, seconds=4.2)
+        >>> timing["llm_calls"], [tool["name"] for tool in timing["tools"]]
+        (3, ['think', 'search_content_catalog', 'build_learning_path'])
+        >>> print(api_metrics.render())
+    """
+
+    def __init__(self):
+        self.requests = Histogram(
+            "edflex_http_request_duration_seconds",
+            "HTTP request wall time (time to first byte for streaming responses)",
+            ["method", "endpoint", "status"],
+            REQUEST_BUCKETS
+        )
+        self.agent_runs = Histogram(
+            "edflex_agent_run_duration_seconds",
+            "Agent run wall time, including pool checkout",
+            ["agent"],
+            REQUEST_BUCKETS
+        )
+        self.llm_calls = Histogram(
+            "edflex_llm_call_duration_seconds",
+            "Wall time of a single model call",
+            ["agent"],
+            LLM_BUCKETS
+        )
+        self.tool_calls = Histogram(
+            "edflex_tool_call_duration_seconds",
+            "Wall time of a single tool call",
+            ["agent", "tool"],
+            TOOL_BUCKETS
+        )
+        self.tool_errors = Counter(
+            "edflex_tool_call_errors_total",
+            "Tool calls that returned an error",
+            ["agent", "tool"]
+        )
+        self.tokens = Counter(
+            "edflex_llm_tokens_total",
+            "Tokens processed by the model",
+            ["agent", "type"]
+        )
+        self.tool_output_tokens = Counter(
+            "edflex_tool_output_tokens_total",
+            "Tokens of tool outputs sent back to the model",
+            ["agent", "tool"]
+        )
+        self.llm_cost = Counter(
+            "edflex_llm_cost_usd_total",
+            "Model cost of agent runs, in USD at the configured token prices",
+            ["endpoint", "action", "agent"]
+        )
+        self.tool_memo_hits = Counter(
+            "edflex_tool_memo_hits_total",
+            "Tool calls answered from the run's memo instead of executing the tool",
+            ["agent", "tool"]
+        )
+        self.reasoning_steps = Counter(
+            "edflex_reasoning_steps_total",
+            "ReasoningTools think/analyze calls, executed or refused by the run's reasoning budget",
+            ["agent", "outcome"]
+        )
+        self.semantic_cache_lookups = Counter(
+            "edflex_semantic_cache_lookups_total",
+            "Learning Assistant questions looked up in the semantic answer cache",
+            ["intent", "outcome"]
+        )
+        self.structured_responses = Counter(
+            "edflex_structured_responses_total",
+            "Agent answers checked against their response model (parsed, repaired or text fallback)",
+            ["model", "outcome"]
+        )
+        self.model_tier_runs = Histogram(
+            "edflex_model_tier_run_duration_seconds",
+            "Agent run wall time by model tier",
+            ["endpoint", "tier"],
+            REQUEST_BUCKETS
+        )
+        self.model_routes = Counter(
+            "edflex_model_route_decisions_total",
+            "Agent runs per model tier and routing reason",
+            ["endpoint", "tier", "reason"]
+        )
+        self.hedged_runs = Counter(
+            "edflex_hedged_runs_total",
+            "Agent runs hedged past their pool's p95, by the attempt that answered",
+            ["agent", "winner"]
+        )
+        self.deadline_exceeded = Counter(
+            "edflex_deadline_exceeded_total",
+            "Agent runs that did not finish within their endpoint's deadline budget",
+            ["endpoint"]
+        )
+        self.degraded_responses = Counter(
+            "edflex_degraded_responses_total",
+            "Requests answered from a fallback (stale cache, direct tool) or refused while a circuit breaker was open",
+            ["endpoint", "fallback"]
+        )
+        self.circuit_state = Gauge(
+            "edflex_circuit_breaker_state",
+            "Circuit breaker state per model tier (0 closed, 1 half-open, 2 open)",
+            ["tier"]
+        )
+        self.admission_waits = Histogram(
+            "edflex_admission_wait_seconds",
+            "Time an agent run waited in the admission queue",
+            ["lane"],
+            REQUEST_BUCKETS
+        )
+        self.admission_rejections = Counter(
+            "edflex_admission_rejected_total",
+            "Agent runs rejected by admission control",
+            ["lane", "reason"]
+        )
+        self.admission_queue_depth = Gauge(
+            "edflex_admission_queue_depth",
+            "Agent runs currently waiting for admission",
+            ["lane"]
+        )
+        self.admission_in_use = Gauge(
+            "edflex_admission_in_use",
+            "Agent runs currently admitted",
+            []
+        )
+        self.interaction_flushes = Histogram(
+            "edflex_interaction_flush_duration_seconds",
+            "Wall time of an interaction store group commit",
+            [],
+            TOOL_BUCKETS
+        )
+        self.interactions_stored = Counter(
+            "edflex_interactions_stored_total",
+            "Content interactions committed to the interaction store",
+            []
+        )
+        self.interaction_buffer_depth = Gauge(
+            "edflex_interaction_buffer_depth",
+            "Content interactions buffered and not committed yet",
+            []
+        )
+
+    def observe_request(self, method: str, endpoint: str, status: int, seconds: float) -> None:
+        self.requests.observe(seconds, method=method, endpoint=endpoint, status=status)
+
+    def observe_agent_run(self, agent: str, run_response, seconds: float, tool_memo: Optional[Dict] = None) -> Dict:
+        """
+        Record an agent run and its LLM/tool calls.
+
+        Args:
+            agent: Agent (pool) name
+            run_response: Response returned by the run
+            seconds: Wall time of the run
+            tool_memo: The run's memoized tool calls (see `RunMemo.summary()`), if any
+
+        Returns:
+            The run's timing summary (see `summarize_run()`), with agent_ms and tool_memo added
+        """
+        summary = summarize_run(run_response)
+        self.agent_runs.observe(seconds, agent=agent)
+
+        for message in getattr(run_response, 'messages', None) or []:
+            metrics = getattr(message, 'metrics', None)
+            if metrics is None or getattr(message, 'from_history', False):
+                continue
+            if message.role == 'assistant' and metrics.time is not None:
+                self.llm_calls.observe(metrics.time, agent=agent)
+
+        for tool in summary["tools"]:
+            self.tool_calls.observe(tool["ms"] / 1000, agent=agent, tool=tool["name"])
+            if tool["error"]:
+                self.tool_errors.inc(agent=agent, tool=tool["name"])
+
+        for token_type in ("input", "output", "cached"):
+            count = summary[f"{token_type}_tokens"]
+            if count:
+                self.tokens.inc(count, agent=agent, type=token_type)
+
+        timing = {"agent_ms": round(1000 * seconds, 2), **summary}
+        if tool_memo is not None:
+            for tool, hits in tool_memo["tools"].items():
+                self.tool_memo_hits.inc(hits, agent=agent, tool=tool)
+            timing["tool_memo"] = tool_memo
+        return timing
+
+    def observe_usage(self, usage: Dict, endpoint: str, action: Optional[str], agent: str) -> Dict:
+        """
+        Record a run's tool output tokens and cost.
+
+        Args:
+            usage: The run's token usage (see `run_usage()` in Services/token_accounting.py)
+            endpoint: Endpoint the run served
+            action: Action the run served, if any
+            agent: Agent (pool) name
+
+        Returns:
+            The usage, for the timing block
+        """
+        for tool, tokens in usage["tool_output"].items():
+            self.tool_output_tokens.inc(tokens, agent=agent, tool=tool)
+        self.llm_cost.inc(usage["cost_usd"], endpoint=endpoint, action=action or "", agent=agent)
+        return usage
+
+    def observe_reasoning(self, agent: str, reasoning: Dict) -> Dict:
+        """
+        Record the reasoning steps a run used and the ones its budget refused.
+
+        Args:
+            agent: Agent (pool) name
+            reasoning: The run's reasoning summary (see `RunReasoning.summary()`)
+
+        Returns:
+            The reasoning summary, for the timing block
+        """
+        if reasoning["steps"]:
+            self.reasoning_steps.inc(reasoning["steps"], agent=agent, outcome="executed")
+        if reasoning["refused"]:
+            self.reasoning_steps.inc(reasoning["refused"], agent=agent, outcome="refused")
+        return reasoning
+
+    def observe_route(self, route: Dict, seconds: float) -> None:
+        """
+        Record the wall time of a routed agent run under its model tier.
+
+        Args:
+            route: Routing decision with endpoint, tier and reason
+            seconds: Wall time of the run
+        """
+        self.model_tier_runs.observe(seconds, endpoint=route["endpoint"], tier=route["tier"])
+        self.model_routes.inc(endpoint=route["endpoint"], tier=route["tier"], reason=route["reason"])
+
+    def prompt_cache_stats(self) -> Dict:
+        """
+        Share of input tokens served from the provider's prompt cache, per agent.
+
+        Only providers that report cached tokens (xAI, OpenAI) contribute; a hit rate of 0
+        means the provider reported none.
+        """
+        totals = {}
+        for (agent, token_type), count in self.tokens.values().items():
+            if token_type in ("input", "cached"):
+                totals.setdefault(agent, {"input_tokens": 0, "cached_tokens": 0})[f"{token_type}_tokens"] += int(count)
+
+        for agent_totals in totals.values():
+            input_tokens = agent_totals["input_tokens"]
+            agent_totals["hit_rate"] = round(agent_totals["cached_tokens"] / input_tokens, 4) if input_tokens else 0.0
+        return totals
+
+    def observe_admission_stats(self, stats: Dict) -> None:
+        """
+        Update the admission gauges from `AdmissionController.stats()`.
+        """
+        self.admission_in_use.set(stats["in_use"])
+        for lane, lane_stats in stats["lanes"].items():
+            self.admission_queue_depth.set(lane_stats["queued"], lane=lane)
+
+    def observe_resilience_stats(self, stats: Dict) -> None:
+        """
+        Update the circuit breaker gauges from `Resilience.stats()`.
+        """
+        levels = {"closed": 0, "half_open": 1, "open": 2}
+        for tier, breaker in stats["breakers"].items():
+            self.circuit_state.set(levels[breaker["state"]], tier=tier)
+
+    def observe_interaction_flush(self, events: int, seconds: float) -> None:
+        """
+        Record one group commit of the interaction store (registered as its flush listener).
+        """
+        self.interaction_flushes.observe(seconds)
+        self.interactions_stored.inc(events)
+
+    def observe_interaction_store_stats(self, stats: Dict) -> None:
+        """
+        Update the interaction buffer gauge from `InteractionStore.stats()`.
+        """
+        self.interaction_buffer_depth.set(stats["buffer_depth"])
+
+    def render(self) -> str:
+        lines = []
+        for metric in (
+            self.requests, self.agent_runs, self.llm_calls, self.tool_calls, self.tool_errors, self.tokens,
+            self.tool_output_tokens, self.llm_cost,
+            self.tool_memo_hits, self.reasoning_steps, self.semantic_cache_lookups, self.structured_responses,
+            self.model_tier_runs, self.model_routes,
+            self.hedged_runs, self.deadline_exceeded, self.degraded_responses, self.circuit_state,
+            self.admission_waits, self.admission_rejections, self.admission_queue_depth, self.admission_in_use,
+            self.interaction_flushes, self.interactions_stored, self.interaction_buffer_depth
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
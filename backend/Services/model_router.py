@@ -0,0 +1,173 @@
+"""
+Model tier routing
+
+Every agent used to run on grok-3, yet many requests do not need it: FAQ and
+troubleshooting questions, progress lookups, or profiler actions that only summarise a
+tool's output. `ModelRouter` picks a model tier per request with local rules (no model
+call): `fast` for simple intents, `standard` (grok-3) for learning paths and multi-step
+reasoning. The tier's model ids are configured in PersonalisedLearning.py (MODEL_IDS).
+
+Each decision is returned with its reason so the API can record run latency by tier
+(see `edflex_model_tier_run_duration_seconds` on /metrics).
+"""
+
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+
+TIERS = ('fast', 'standard')
+
+# "rules" routes with the tables below; "off" sends everything to the standard tier
+MODEL_ROUTING = os.getenv('MODEL_ROUTING', 'rules')
+
+# Questions longer than this are treated as multi-step
+ROUTER_FAST_QUESTION_MAX_WORDS = int(os.getenv('ROUTER_FAST_QUESTION_MAX_WORDS', '25'))
+
+# Tier per (endpoint, action). Actions that only summarise one tool's output run on the
+# fast tier; ranking, prioritisation and path building keep grok-3.
+ACTION_TIERS = {
+    ('profiler', 'analyze_behavior'): 'fast',
+    ('profiler', 'identify_learning_style'): 'fast',
+    ('profiler', 'detect_skill_gaps'): 'standard',
+    ('profiler', 'calculate_engagement'): 'fast',
+    ('profiler', 'get_full_profile'): 'fast',
+    ('recommender', 'recommend_content'): 'standard',
+    ('recommender', 'build_learning_path'): 'standard',
+    ('recommender', 'get_next_content'): 'fast',
+    ('recommender', 'check_prerequisites'): 'fast',
+    # Narrative of an already computed direct-mode result (`narrate: true`)
+    ('profiler', 'narrate'): 'fast',
+    ('recommender', 'narrate'): 'fast',
+}
+
+# Assistant questions needing several steps or a plan (checked first)
+MULTI_STEP_PATTERNS = [
+    r"\b(parcours|learning path|plan|roadmap|programme)\b",
+    r"\b(compar\w*|diff[ée]rence\w*|versus|vs)\b",
+    r"\b(pourquoi|why)\b",
+    r"\b([ée]tape par [ée]tape|step by step)\b",
+]
+
+# Simple assistant intents, with the reason logged for each
+FAST_QUESTION_PATTERNS = {
+    'troubleshooting': [
+        r"\b(bug|erreur|error|crash\w*|bloqu[ée]\w*|connexion|login|mot de passe|password)\b",
+        r"\b(ne (se )?(lance|charge|marche|fonctionne|s'affiche)|n'arrive pas|impossible de)\b",
+        r"\b(won't|doesn't|does not|can't|cannot) (play|load|work|open|log)",
+    ],
+    'progress': [
+        r"\b(ma progression|mes progr[eè]s|mon avancement|my progress|how am i doing)\b",
+        r"\b(combien de (cours|contenus|heures)|how many (courses|hours))\b",
+    ],
+    'definition': [
+        r"^(qu'est[- ]ce que?|qu'est[- ]ce qu'|c'est quoi|que veut dire|what is|what's|what are|define)\b",
+        r"\b(d[ée]finition|definition)\b",
+    ],
+}
+
+
+class ModelTierError(ValueError):
+    """Raised when a request asks for an unknown model tier."""
+
+
+def normalize_question(question: str) -> str:
+    """
+    Lowercase a question, unify apostrophes and collapse whitespace.
+    """
+    return " ".join(question.lower().replace('’', "'").split())
+
+
+class ModelRouter:
+    """
+    Rule-based choice of the model tier serving a request.
+
+    Example:
+        >>> router = ModelRouter()
+        >>> router.route('assistant', question="Je n'arrive pas à lancer une vidéo")
+        ('fast', 'troubleshooting')
+        >>> router.route('recommender', action='build_learning_path')
+        ('standard', 'action')
+    """
+
+    def __init__(
+        self,
+        mode: str = MODEL_ROUTING,
+        action_tiers: Optional[Dict[Tuple[str, str], str]] = None,
+        fast_question_max_words: int = ROUTER_FAST_QUESTION_MAX_WORDS
+    ):
+        if mode not in ('rules', 'off'):
+            raise ValueError(f"Unknown routing mode: {mode} (expected 'rules' or 'off')")
+
+        self.mode = mode
+        self.action_tiers = dict(ACTION_TIERS if action_tiers is None else action_tiers)
+        self.fast_question_max_words = fast_question_max_words
+
+        self._multi_step = [re.compile(pattern) for pattern in MULTI_STEP_PATTERNS]
+        self._fast = {
+            reason: [re.compile(pattern) for pattern in patterns]
+            for reason, patterns in FAST_QUESTION_PATTERNS.items()
+        }
+
+        self._lock = threading.Lock()
+        self._decisions = {}  # (endpoint, tier, reason) -> count
+
+    def classify_question(self, question: str) -> Tuple[str, str]:
+        """
+        Return (tier, reason) for a Learning Assistant question.
+        """
+        text = normalize_question(question)
+        if any(pattern.search(text) for pattern in self._multi_step):
+            return 'standard', 'multi_step'
+        if len(text.split()) > self.fast_question_max_words:
+            return 'standard', 'long_question'
+        for reason, patterns in self._fast.items():
+            if any(pattern.search(text) for pattern in patterns):
+                return 'fast', reason
+        return 'standard', 'default'
+
+    def route(
+        self,
+        endpoint: str,
+        action: Optional[str] = None,
+        question: Optional[str] = None,
+        override: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Pick the tier for a request and count the decision.
+
+        Args:
+            endpoint: API endpoint name (profiler, recommender, assistant)
+            action: Action requested (profiler / recommender)
+            question: Learner's question (assistant)
+            override: Tier forced by the request (`model_tier`), if any
+
+        Returns:
+            Tuple of (tier, reason)
+        """
+        if override:
+            if override not in TIERS:
+                raise ModelTierError(f"model_tier must be one of: {', '.join(TIERS)}")
+            decision = (override, 'override')
+        elif self.mode == 'off':
+            decision = ('standard', 'routing_off')
+        elif question is not None:
+            decision = self.classify_question(question)
+        else:
+            decision = (self.action_tiers.get((endpoint, action), 'standard'), 'action')
+
+        with self._lock:
+            key = (endpoint, *decision)
+            self._decisions[key] = self._decisions.get(key, 0) + 1
+        return decision
+
+    def stats(self) -> Dict:
+        """
+        Return the routing mode and decision counts per endpoint and tier.
+        """
+        with self._lock:
+            decisions = {}
+            for (endpoint, tier, reason), count in sorted(self._decisions.items()):
+                decisions.setdefault(endpoint, {}).setdefault(tier, {})[reason] = count
+            return {'mode': self.mode, 'decisions': decisions}
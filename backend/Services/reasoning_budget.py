@@ -0,0 +1,193 @@
+"""
+Reasoning budget per action
+
+Every agent carries `ReasoningTools(add_instructions=True)`, whose instructions ask the model
+to reason before answering: each `think` / `analyze` step is an extra model round trip, even
+for a lookup such as `calculate_engagement`. Each request now runs with a reasoning budget:
+
+- none:      the request is served by an agent built without ReasoningTools
+- N:         at most N reasoning steps; further `think` / `analyze` calls are refused
+- unlimited: reasoning as before (kept for `build_learning_path`)
+
+Defaults are set per endpoint action (REASONING_BUDGETS) and can be overridden by the request
+(`reasoning_budget`). `ReasoningBudgets` provides the agno tool hooks enforcing the cap and
+counts the steps each run actually used.
+"""
+
+import os
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Union
+
+
+# Tool names registered by agno's ReasoningTools
+REASONING_TOOL_NAMES = frozenset({'think', 'analyze'})
+
+# Budget of the actions without an entry: "none", "unlimited" or a number of steps
+REASONING_DEFAULT_BUDGET = os.getenv('REASONING_DEFAULT_BUDGET', 'unlimited')
+
+# Default budget per (endpoint, action). Lookups that summarise one tool's output need no
+# reasoning; prioritisation gets a few steps; learning paths keep unlimited reasoning.
+REASONING_BUDGETS = {
+    ('profiler', 'analyze_behavior'): 2,
+    ('profiler', 'identify_learning_style'): 'none',
+    ('profiler', 'detect_skill_gaps'): 3,
+    ('profiler', 'calculate_engagement'): 'none',
+    ('profiler', 'get_full_profile'): 'none',
+    ('profiler', 'narrate'): 'none',
+    ('recommender', 'recommend_content'): 3,
+    ('recommender', 'build_learning_path'): 'unlimited',
+    ('recommender', 'get_next_content'): 'none',
+    ('recommender', 'check_prerequisites'): 'none',
+    ('recommender', 'narrate'): 'none',
+    ('assistant', None): 2,
+}
+
+# Reasoning scope of the agent run executing in the current context (None outside a run scope)
+_current_run = contextvars.ContextVar('reasoning_budget_run', default=None)
+
+
+class ReasoningBudgetError(ValueError):
+    """Raised when a request asks for an invalid reasoning budget."""
+
+
+def parse_budget(value: Union[str, int, None]) -> Optional[int]:
+    """
+    Convert a budget ("none", "unlimited", or a number of steps) to 0, None or N.
+    """
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered == 'none':
+            return 0
+        if lowered == 'unlimited':
+            return None
+        if not lowered.isdigit():
+            raise ReasoningBudgetError("reasoning_budget must be 'none', 'unlimited' or a number of steps")
+        value = int(lowered)
+
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ReasoningBudgetError("reasoning_budget must be 'none', 'unlimited' or a number of steps")
+    return value
+
+
+def format_budget(budget: Optional[int]) -> Union[str, int]:
+    if budget is None:
+        return 'unlimited'
+    return 'none' if budget == 0 else budget
+
+
+class RunReasoning:
+    """
+    Reasoning steps used and refused by one agent run.
+    """
+
+    def __init__(self, budget: Optional[int]):
+        self.budget = budget
+        self._lock = threading.Lock()
+        self.steps = 0
+        self.refused = 0
+
+    def take_step(self) -> bool:
+        """
+        Count a reasoning call; return False if it exceeds the budget.
+        """
+        with self._lock:
+            if self.budget is not None and self.steps >= self.budget:
+                self.refused += 1
+                return False
+            self.steps += 1
+            return True
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {'budget': format_budget(self.budget), 'steps': self.steps, 'refused': self.refused}
+
+
+class ReasoningBudgets:
+    """
+    Per-action reasoning budgets and the tool hooks enforcing them within a run.
+
+    Example:
+        >>> reasoning_budgets = ReasoningBudgets()
+        >>> budget = reasoning_budgets.budget_for('profiler', 'detect_skill_gaps')
+        >>> agent.tool_hooks = [reasoning_budgets.hook]
+        >>> with reasoning_budgets.run_scope(budget) as reasoning:
+        ...     agent.run("Détecter les lacunes de compétences de l'apprenant.\\n\\nuser_id: User123")
+        >>> reasoning.summary()
+        {'budget': 3, 'steps': 3, 'refused': 1}
+    """
+
+    def __init__(self, budgets: Optional[Dict] = None, default: Union[str, int] = REASONING_DEFAULT_BUDGET):
+        budgets = REASONING_BUDGETS if budgets is None else budgets
+        self.budgets = {key: parse_budget(value) for key, value in budgets.items()}
+        self.default = parse_budget(default)
+
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._steps = 0
+        self._refused = 0
+
+    def budget_for(self, endpoint: str, action: Optional[str], requested: Union[str, int, None] = None) -> Optional[int]:
+        """
+        Return the budget of a request: the one it asks for, else the action's default.
+
+        Returns:
+            0 (no reasoning), None (unlimited) or the maximum number of steps
+        """
+        if requested is not None:
+            return parse_budget(requested)
+        return self.budgets.get((endpoint, action), self.default)
+
+    @contextmanager
+    def run_scope(self, budget: Optional[int]):
+        """
+        Enforce `budget` on the agent runs started inside this block.
+
+        Yields:
+            The RunReasoning of the scope (see `RunReasoning.summary()`)
+        """
+        reasoning = RunReasoning(budget)
+        token = _current_run.set(reasoning)
+        try:
+            yield reasoning
+        finally:
+            _current_run.reset(token)
+            summary = reasoning.summary()
+            with self._lock:
+                self._runs += 1
+                self._steps += summary['steps']
+                self._refused += summary['refused']
+
+    def _refuse(self, function_name: str) -> Optional[str]:
+        """
+        Return the message sent back instead of running a reasoning call over budget (None to run it)
+        """
+        reasoning = _current_run.get()
+        if reasoning is None or function_name not in REASONING_TOOL_NAMES or reasoning.take_step():
+            return None
+        return (
+            f"Reasoning budget of {reasoning.budget} steps reached. Do not call think or analyze again; "
+            "answer now with the information you already have."
+        )
+
+    def hook(self, function_name: str, function_call: Callable, arguments: Dict) -> Any:
+        refusal = self._refuse(function_name)
+        if refusal is not None:
+            return refusal
+        return function_call(**arguments)
+
+    async def ahook(self, function_name: str, function_call: Callable, arguments: Dict) -> Any:
+        refusal = self._refuse(function_name)
+        if refusal is not None:
+            return refusal
+        return await function_call(**arguments)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'runs': self._runs,
+                'steps': self._steps,
+                'refused': self._refused,
+                'avg_steps': round(self._steps / self._runs, 2) if self._runs else 0.0
+            }
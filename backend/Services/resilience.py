@@ -0,0 +1,491 @@
+"""
+Deadline budgets, hedged runs and circuit breakers around the model provider
+
+When grok-3 slows down, agent runs used to wait for the runner's 300 s timeout and every
+endpoint hung with them. Each agent run now gets the deadline budget of its endpoint
+(DEADLINE_*_SECONDS, overridable per request with `deadline_seconds`):
+
+- The budget starts when the request arrives, so time spent in admission and pool queues
+  counts. The run is given what remains as its timeout and fails with `DeadlineExceeded`
+  (a TimeoutError, so the API still answers 504) instead of hanging.
+- Once a pool has enough latency samples, a run still going at the pool's p95 is hedged: a
+  second instance runs the same prompt and the first answer wins. The primary run stays on
+  the request's thread; only hedges run on a small executor, and a hedge is skipped rather
+  than queued when HEDGE_MAX_WORKERS are busy. Hedges are capped at HEDGE_MAX_RATIO of the
+  runs so a provider-wide slowdown does not double the load.
+- Failures and deadline overruns feed one circuit breaker per model tier. When the error
+  rate over CIRCUIT_WINDOW_SECONDS reaches CIRCUIT_ERROR_RATE, the breaker opens and runs
+  fail fast with `CircuitOpenError` (503) for CIRCUIT_OPEN_SECONDS; one probe run is then let
+  through (half-open) and closes the breaker again if it succeeds.
+
+The API falls back to stale cached or direct-tool results while a breaker is open.
+"""
+
+import os
+import math
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+DEADLINE_DEFAULT_SECONDS = float(os.getenv('DEADLINE_DEFAULT_SECONDS', '60'))
+# Deadline budget per endpoint, in seconds; learning paths get the longest one
+DEADLINE_BUDGETS_SECONDS = {
+    'profiler': float(os.getenv('DEADLINE_PROFILER_SECONDS', '45')),
+    'recommender': float(os.getenv('DEADLINE_RECOMMENDER_SECONDS', '90')),
+    'assistant': float(os.getenv('DEADLINE_ASSISTANT_SECONDS', '30')),
+}
+
+HEDGING = os.getenv('HEDGING', 'true').lower() in ('1', 'true', 'yes')
+# Successful runs of a pool needed before its p95 is trusted as the hedging delay
+HEDGE_MIN_SAMPLES = int(os.getenv('HEDGE_MIN_SAMPLES', '20'))
+HEDGE_LATENCY_WINDOW = int(os.getenv('HEDGE_LATENCY_WINDOW', '200'))
+HEDGE_MAX_RATIO = float(os.getenv('HEDGE_MAX_RATIO', '0.1'))
+# Hedged attempts running at once (never queued: a hedge is skipped when all are busy)
+HEDGE_MAX_WORKERS = int(os.getenv('HEDGE_MAX_WORKERS', '16'))
+
+CIRCUIT_WINDOW_SECONDS = float(os.getenv('CIRCUIT_WINDOW_SECONDS', '60'))
+CIRCUIT_MIN_CALLS = int(os.getenv('CIRCUIT_MIN_CALLS', '10'))
+CIRCUIT_ERROR_RATE = float(os.getenv('CIRCUIT_ERROR_RATE', '0.5'))
+CIRCUIT_OPEN_SECONDS = float(os.getenv('CIRCUIT_OPEN_SECONDS', '30'))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class DeadlineError(ValueError):
+    """Raised when a request asks for an invalid deadline."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an agent run did not finish within its deadline budget."""
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of running an agent while the model tier's circuit breaker is open.
+
+    `retry_after` is the number of seconds before the breaker lets a probe run through.
+    """
+
+    status_code = 503
+
+    def __init__(self, message: str, tier: str, retry_after: int):
+        super().__init__(message)
+        self.tier = tier
+        self.retry_after = retry_after
+
+
+class _HedgeWon(Exception):
+    """Raised through the primary attempt when its hedge answered first; carries the hedge's result."""
+
+    # How AgentRunner counts the abandoned primary run
+    run_outcome = 'hedge_lost'
+
+    def __init__(self, result: Any):
+        super().__init__("Hedged attempt answered first")
+        self.result = result
+
+
+def parse_deadline(value: Any) -> float:
+    """
+    Convert a requested deadline (seconds, number or numeric string) to a positive float.
+    """
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        raise DeadlineError("deadline_seconds must be a positive number of seconds")
+    if isinstance(value, bool) or not math.isfinite(seconds) or seconds <= 0:
+        raise DeadlineError("deadline_seconds must be a positive number of seconds")
+    return seconds
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker over a sliding time window.
+
+    Example:
+        >>> breaker = CircuitBreaker("standard", min_calls=10, error_rate=0.5)
+        >>> probe = breaker.before_call()  # raises CircuitOpenError while open
+        >>> breaker.record(success=False, probe=probe)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: float = CIRCUIT_WINDOW_SECONDS,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        error_rate: float = CIRCUIT_ERROR_RATE,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS
+    ):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._outcomes = deque()  # (monotonic time, success)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+
+        # Metrics
+        self._trips = 0
+        self._rejected = 0
+
+    def _prune(self, now: float) -> None:
+        # Called with the lock held
+        while self._outcomes and self._outcomes[0][0] <= now - self.window:
+            self._outcomes.popleft()
+
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self) -> bool:
+        """
+        Let a run through, or raise CircuitOpenError while the breaker is open (or already probing).
+
+        Returns:
+            True if the run is the half-open probe; pass it back to `record()` / `release()`
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+            if remaining <= 0 and not self._probing:
+                self._state = HALF_OPEN
+                self._probing = True
+                return True
+            self._rejected += 1
+            retry_after = max(1, math.ceil(remaining))
+        raise CircuitOpenError(
+            f"Model tier '{self.name}' is failing; circuit open, retry in {retry_after}s",
+            tier=self.name,
+            retry_after=retry_after
+        )
+
+    def record(self, success: bool, probe: bool = False) -> None:
+        """
+        Record the outcome of a run let through by `before_call()`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if probe:
+                self._probing = False
+                if success:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._state = OPEN
+                    self._opened_at = now
+                return
+            if self._state != CLOSED:
+                # Run started before the breaker opened
+                return
+
+            self._outcomes.append((now, success))
+            self._prune(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+                self._state = OPEN
+                self._opened_at = now
+                self._trips += 1
+
+    def release(self, probe: bool) -> None:
+        """
+        Give back a run let through without recording an outcome (it failed for a local reason).
+        """
+        if probe:
+            with self._lock:
+                self._probing = False
+
+    def stats(self) -> Dict:
+        state = self.state()
+        with self._lock:
+            self._prune(time.monotonic())
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                'state': state,
+                'calls': calls,
+                'error_rate': round(failures / calls, 3) if calls else 0.0,
+                'trips': self._trips,
+                'rejected': self._rejected
+            }
+
+
+class Resilience:
+    """
+    Runs agent attempts under a deadline, with p95 hedging and a circuit breaker per model tier.
+
+    `attempt(timeout, wait=None)` performs one complete run (pool checkout included) and must
+    give up after `timeout` seconds. The primary attempt runs on the calling thread; when it
+    may be hedged, it gets a `wait(future, timeout)` to hand to the agent runner, which waits
+    for the run's future, starts the hedge (`attempt(timeout)` on the hedging executor) past
+    the p95, and may abandon the primary run if the hedge answers first. Exceptions in
+    `ignored_errors` (e.g. local pool exhaustion) are re-raised without counting against the
+    breaker.
+
+    Example:
+        >>> resilience = Resilience()
+        >>> deadline = resilience.deadline_for('profiler')
+        >>> result, winner = resilience.call('learner_profiler', 'standard', deadline, attempt,
+        ...                                  started=request_started)
+    """
+
+    def __init__(
+        self,
+        deadlines: Optional[Dict[str, float]] = None,
+        default_deadline: float = DEADLINE_DEFAULT_SECONDS,
+        hedging: bool = HEDGING,
+        hedge_min_samples: int = HEDGE_MIN_SAMPLES,
+        hedge_max_ratio: float = HEDGE_MAX_RATIO,
+        latency_window: int = HEDGE_LATENCY_WINDOW,
+        hedge_max_workers: int = HEDGE_MAX_WORKERS,
+        ignored_errors: Tuple = (),
+        breaker_factory: Callable[[str], CircuitBreaker] = CircuitBreaker
+    ):
+        self.deadlines = dict(DEADLINE_BUDGETS_SECONDS if deadlines is None else deadlines)
+        self.default_deadline = default_deadline
+        self.hedging = hedging
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_max_ratio = hedge_max_ratio
+        self.latency_window = latency_window
+        self.hedge_max_workers = hedge_max_workers
+        self.ignored_errors = tuple(ignored_errors)
+        self.breaker_factory = breaker_factory
+
+        self._lock = threading.Lock()
+        self._breakers = {}  # model tier -> CircuitBreaker
+        self._latencies = {}  # pool name -> deque of recent successful run seconds
+        self._executor = ThreadPoolExecutor(max_workers=hedge_max_workers, thread_name_prefix='hedge') if hedging else None
+
+        # Metrics
+        self._calls = 0
+        self._hedges = 0
+        self._hedges_in_flight = 0
+        self._hedges_skipped = 0
+        self._hedge_wins = 0
+        self._deadline_exceeded = 0
+
+    def deadline_for(self, endpoint: str, requested: Any = None) -> float:
+        """
+        Return the deadline budget of a request: the one it asks for, else the endpoint's.
+        """
+        if requested is not None:
+            return parse_deadline(requested)
+        return self.deadlines.get(endpoint, self.default_deadline)
+
+    def breaker(self, tier: str) -> CircuitBreaker:
+        with self._lock:
+            if tier not in self._breakers:
+                self._breakers[tier] = self.breaker_factory(tier)
+            return self._breakers[tier]
+
+    def check(self, tier: str) -> None:
+        """
+        Raise CircuitOpenError if the tier's breaker is open, without taking the half-open probe
+        (lets callers fail fast before queueing for admission).
+        """
+        breaker = self.breaker(tier)
+        if breaker.state() == OPEN:
+            breaker.before_call()
+
+    def p95(self, key: str) -> Optional[float]:
+        """
+        Return the p95 latency of a pool's recent successful runs, or None without enough samples.
+        """
+        with self._lock:
+            samples = self._latencies.get(key)
+            if not samples or len(samples) < self.hedge_min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def _observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None:
+                samples = self._latencies[key] = deque(maxlen=self.latency_window)
+            samples.append(seconds)
+
+    def _start_hedge(self, attempt: Callable[..., Any], timeout: float):
+        """
+        Submit a hedged attempt, or return None when over the hedge ratio or all hedge workers are busy.
+        """
+        with self._lock:
+            if self._hedges + 1 > self.hedge_max_ratio * self._calls:
+                return None
+            if self._hedges_in_flight >= self.hedge_max_workers:
+                self._hedges_skipped += 1
+                return None
+            self._hedges += 1
+            self._hedges_in_flight += 1
+        # The hedge gets its own copy of the caller's context (lane, tool memo scope)
+        future = self._executor.submit(contextvars.copy_context().run, attempt, timeout)
+        future.add_done_callback(self._hedge_done)
+        return future
+
+    def _hedge_done(self, future) -> None:
+        with self._lock:
+            self._hedges_in_flight -= 1
+
+    def call(
+        self,
+        key: str,
+        tier: str,
+        deadline: float,
+        attempt: Callable[..., Any],
+        started: Optional[float] = None
+    ) -> Tuple[Any, Optional[str]]:
+        """
+        Run `attempt` for pool `key` on model tier `tier` within `deadline` seconds of `started`
+        (a `time.perf_counter()` value such as the request's arrival; defaults to now).
+
+        Returns:
+            Tuple of (attempt result, hedge winner): the winner is None when the run was not
+            hedged, else "primary" or "hedge"
+
+        Raises:
+            CircuitOpenError: the tier's breaker is open
+            DeadlineExceeded: no attempt finished within the deadline (or it was spent in queues)
+        """
+        now = time.perf_counter()
+        deadline_at = (started if started is not None else now) + deadline
+        if deadline_at <= now:
+            # Spent waiting for admission or another request: no verdict on the provider
+            with self._lock:
+                self._deadline_exceeded += 1
+            raise DeadlineExceeded(f"Deadline of {deadline:g}s spent before the agent run started")
+
+        breaker = self.breaker(tier)
+        probe = breaker.before_call()
+        with self._lock:
+            self._calls += 1
+
+        hedge_after = self.p95(key) if self._executor is not None else None
+        hedger = _Hedger(self, attempt, now + hedge_after, deadline_at) \
+            if hedge_after is not None and now + hedge_after < deadline_at else None
+        try:
+            try:
+                result = attempt(deadline_at - now, hedger)
+                winner = 'primary' if hedger is not None and hedger.hedged else None
+            except _HedgeWon as won:
+                result, winner = won.result, 'hedge'
+                with self._lock:
+                    self._hedge_wins += 1
+        except self.ignored_errors:
+            breaker.release(probe)
+            raise
+        except TimeoutError as e:
+            breaker.record(success=False, probe=probe)
+            with self._lock:
+                self._deadline_exceeded += 1
+            raise DeadlineExceeded(f"Agent run exceeded its {deadline:g}s deadline") from e
+        except Exception:
+            breaker.record(success=False, probe=probe)
+            raise
+
+        breaker.record(success=True, probe=probe)
+        self._observe(key, time.perf_counter() - now)
+        return result, winner
+
+    @contextmanager
+    def guard(self, tier: str):
+        """
+        Apply the tier's circuit breaker to a run executed inside this block (e.g. a stream),
+        without deadline or hedging.
+        """
+        breaker = self.breaker(tier)
+        probe = breaker.before_call()
+        try:
+            yield
+        except self.ignored_errors:
+            breaker.release(probe)
+            raise
+        except Exception:
+            breaker.record(success=False, probe=probe)
+            raise
+        except BaseException:
+            # Client went away mid-stream: no verdict on the provider
+            breaker.release(probe)
+            raise
+        breaker.record(success=True, probe=probe)
+
+    def stats(self) -> Dict:
+        """
+        Return deadline budgets, per-pool p95, hedging counters and the breakers' states.
+        """
+        with self._lock:
+            keys = list(self._latencies)
+            breakers = dict(self._breakers)
+            counters = {
+                'calls': self._calls,
+                'hedges': self._hedges,
+                'hedges_in_flight': self._hedges_in_flight,
+                'hedges_skipped': self._hedges_skipped,
+                'hedge_wins': self._hedge_wins,
+                'deadline_exceeded': self._deadline_exceeded
+            }
+        p95 = {key: self.p95(key) for key in keys}
+        return {
+            'deadlines_seconds': {**self.deadlines, 'default': self.default_deadline},
+            'hedging': self.hedging,
+            'p95_ms': {key: round(1000 * value, 1) for key, value in p95.items() if value is not None},
+            **counters,
+            'breakers': {tier: breaker.stats() for tier, breaker in breakers.items()}
+        }
+
+
+class _Hedger:
+    """
+    `wait(future, timeout)` of a primary attempt that may be hedged: waits for the primary
+    run until `hedge_at`, then starts a hedge and returns the first successful answer (the
+    primary's response, or raises `_HedgeWon` with the hedge's result).
+    """
+
+    def __init__(self, resilience: Resilience, attempt: Callable[..., Any], hedge_at: float, deadline_at: float):
+        self.resilience = resilience
+        self.attempt = attempt
+        self.hedge_at = hedge_at
+        self.deadline_at = deadline_at
+        self.hedged = False
+
+    def __call__(self, future, timeout: float) -> Any:
+        done, _ = wait([future], timeout=max(0.0, self.hedge_at - time.perf_counter()))
+        if done:
+            return future.result()
+
+        remaining = self.deadline_at - time.perf_counter()
+        hedge = self.resilience._start_hedge(self.attempt, remaining) if remaining > 0 else None
+        if hedge is None:
+            return future.result(timeout=max(0.0, remaining))
+        self.hedged = True
+
+        pending = {future, hedge}
+        error = None
+        while pending:
+            done, pending = wait(
+                pending, timeout=max(0.0, self.deadline_at - time.perf_counter()), return_when=FIRST_COMPLETED
+            )
+            if not done:
+                raise FutureTimeoutError()
+            for finished in done:
+                if finished.exception() is None:
+                    if finished is hedge:
+                        # The runner abandons the primary run, charged and counted as `hedge_lost` when it
+                        # ends; a losing hedge finishes in the background
+                        raise _HedgeWon(finished.result())
+                    return finished.result()
+                error = error or finished.exception()
+        raise error
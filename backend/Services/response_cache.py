@@ -0,0 +1,241 @@
+"""
+Response cache for the Flask API
+
+Caches finished agent responses for profiler / recommender actions so repeated dashboard
+loads are served without re-running the LLM + tool chain.
+
+- Entries are keyed by (endpoint, action, user_id, goal, ...): the API adds the response
+  format, model tier, reasoning budget and prompt mode of the run
+- Each action has its own TTL (see ACTION_TTL_SECONDS)
+- The cache is bounded and evicts the least recently used entry when full
+- All entries of a learner are invalidated when a new interaction is tracked for them
+- A result is only cached if no interaction was tracked for its learner since the request
+  started; invalidations are remembered for RESPONSE_CACHE_GENERATION_HORIZON_SECONDS (and up
+  to max_entries learners), so forgetting one never affects another learner's requests
+- Expired entries are kept for RESPONSE_CACHE_STALE_SECONDS more, to be served (marked stale)
+  while the model provider is unavailable
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '10000'))
+RESPONSE_CACHE_DEFAULT_TTL_SECONDS = float(os.getenv('RESPONSE_CACHE_DEFAULT_TTL_SECONDS', '300'))
+RESPONSE_CACHE_STALE_SECONDS = float(os.getenv('RESPONSE_CACHE_STALE_SECONDS', '3600'))
+# A learner's invalidation is never forgotten sooner than this (keep it above the longest agent run)
+RESPONSE_CACHE_GENERATION_HORIZON_SECONDS = float(os.getenv('RESPONSE_CACHE_GENERATION_HORIZON_SECONDS', '600'))
+
+# TTL per (endpoint, action), in seconds. Fast-moving metrics expire sooner than
+# slow-moving ones such as learning style or a generated learning path.
+ACTION_TTL_SECONDS = {
+    ('profiler', 'analyze_behavior'): 300,
+    ('profiler', 'identify_learning_style'): 900,
+    ('profiler', 'detect_skill_gaps'): 900,
+    ('profiler', 'calculate_engagement'): 120,
+    ('profiler', 'get_full_profile'): 300,
+    ('recommender', 'recommend_content'): 300,
+    ('recommender', 'build_learning_path'): 1800,
+    ('recommender', 'get_next_content'): 120,
+    ('recommender', 'check_prerequisites'): 600,
+}
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and per-learner invalidation.
+
+    Example:
+        >>> cache = ResponseCache(max_entries=1000)
+        >>> key = ('profiler', 'get_full_profile', 'User123', '')
+        >>> generation = cache.generation('User123')
+        >>> cache.set(key, "profile...", ttl=cache.ttl_for('profiler', 'get_full_profile'), generation=generation)
+        True
+        >>> cache.get(key)
+        'profile...'
+        >>> cache.invalidate_user('User123')
+        1
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        default_ttl: float = RESPONSE_CACHE_DEFAULT_TTL_SECONDS,
+        action_ttls: Optional[Dict[Tuple[str, str], float]] = None,
+        stale_seconds: float = RESPONSE_CACHE_STALE_SECONDS,
+        generation_horizon: float = RESPONSE_CACHE_GENERATION_HORIZON_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.stale_seconds = stale_seconds
+        self.generation_horizon = generation_horizon
+        self.action_ttls = dict(ACTION_TTL_SECONDS if action_ttls is None else action_ttls)
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._keys_by_user = {}  # user_id -> set of keys
+        # user_id -> (generation, invalidated_at), least recently invalidated first.
+        # Generations come from one increasing counter; `_floor` is the highest one forgotten
+        self._generations = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._stale_hits = 0
+
+    def ttl_for(self, endpoint: str, action: str) -> float:
+        """
+        Return the TTL configured for an endpoint action.
+
+        Args:
+            endpoint: API endpoint name (profiler, recommender)
+            action: Action requested on that endpoint
+
+        Returns:
+            TTL in seconds
+        """
+        return self.action_ttls.get((endpoint, action), self.default_ttl)
+
+    def generation(self, user_id: str) -> int:
+        """
+        Return the invalidation counter as of now, for the learner's request.
+
+        Read it before running an agent and pass it to `set()`: if an interaction was
+        tracked for the learner in the meantime, the (now stale) result is not cached.
+        Invalidations of other learners do not affect it.
+        """
+        with self._lock:
+            return self._counter
+
+    def _changed_since(self, user_id: str, generation: int) -> bool:
+        # Called with the lock held. A forgotten learner may have been invalidated after
+        # `generation` only if a later generation was forgotten (a request older than the horizon)
+        tracked = self._generations.get(user_id)
+        return (tracked[0] if tracked is not None else self._floor) > generation
+
+    def _forget_old_generations(self) -> None:
+        # Called with the lock held. Over max_entries, invalidations older than the horizon
+        # are dropped; more recent ones are kept until they age out
+        cutoff = time.monotonic() - self.generation_horizon
+        while len(self._generations) > self.max_entries:
+            user_id, (generation, invalidated_at) = next(iter(self._generations.items()))
+            if invalidated_at > cutoff:
+                return
+            del self._generations[user_id]
+            self._floor = max(self._floor, generation)
+
+    def get(self, key: Tuple, allow_stale: bool = False) -> Optional[Any]:
+        """
+        Return a cached value, or None if missing or expired.
+
+        Args:
+            key: (endpoint, action, user_id, goal, ...)
+            allow_stale: Also return a value expired less than `stale_seconds` ago
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, value = entry
+            now = time.monotonic()
+            if expires_at <= now:
+                if expires_at + self.stale_seconds <= now:
+                    self._remove(key)
+                elif allow_stale:
+                    self._stale_hits += 1
+                    return value
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Tuple, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None) -> bool:
+        """
+        Store a value for `ttl` seconds.
+
+        Args:
+            key: (endpoint, action, user_id, goal, ...)
+            value: Value to cache
+            ttl: Time to live in seconds (defaults to default_ttl)
+            generation: Counter read before computing the value (see `generation()`)
+
+        Returns:
+            True if the value was stored, False if it was skipped because it is stale
+        """
+        user_id = key[2]
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return False
+
+        with self._lock:
+            if generation is not None and self._changed_since(user_id, generation):
+                return False
+
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+        return True
+
+    def invalidate_user(self, user_id: str) -> int:
+        """
+        Drop every cached response of a learner (e.g. after a new interaction).
+
+        Args:
+            user_id: Learner whose entries should be dropped
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self._counter += 1
+            self._generations[user_id] = (self._counter, time.monotonic())
+            self._generations.move_to_end(user_id)
+            self._forget_old_generations()
+            self._invalidations += 1
+            return len(keys)
+
+    def _remove(self, key: Tuple) -> None:
+        self._entries.pop(key, None)
+        user_keys = self._keys_by_user.get(key[2])
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[key[2]]
+
+    def stats(self) -> Dict:
+        """
+        Return cache size and hit/miss counters.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "tracked_users": len(self._generations),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "stale_hits": self._stale_hits
+            }
@@ -0,0 +1,268 @@
+"""
+Semantic answer cache for the Learning Assistant
+
+Learners keep asking the same questions ("Qu'est-ce que le machine learning ?", "la vidéo ne
+se lance pas"), and each one used to trigger a full Learning Assistant run with ExaTools.
+`SemanticCache` embeds the normalised question with a local embedding model and returns the
+answer of a previous question whose similarity is above the threshold.
+
+Only intents whose answer does not depend on the learner are shared (definitions and
+troubleshooting by default, see SEMANTIC_CACHE_INTENTS); progress questions and everything
+else still run the agent. Entries are bounded (LRU), expire after a TTL and count their hits.
+
+The default embedder hashes word unigrams/bigrams and character trigrams into a sparse
+vector: no extra dependency, and robust to typos and word order. Set
+SEMANTIC_CACHE_EMBEDDER to a sentence-transformers model name (e.g. "all-MiniLM-L6-v2") to
+use that model instead, if the package is installed.
+"""
+
+import os
+import math
+import time
+import zlib
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from Services.model_router import normalize_question
+
+
+SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE', 'true').lower() in ('1', 'true', 'yes')
+SEMANTIC_CACHE_EMBEDDER = os.getenv('SEMANTIC_CACHE_EMBEDDER', 'hashing')
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.85'))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv('SEMANTIC_CACHE_TTL_SECONDS', '86400'))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '2000'))
+# Question intents (see Services/model_router.py) whose answers can be shared between learners
+SEMANTIC_CACHE_INTENTS = frozenset(
+    intent.strip() for intent in os.getenv('SEMANTIC_CACHE_INTENTS', 'definition,troubleshooting').split(',') if intent.strip()
+)
+
+# Sparse unit vector: feature index -> weight
+Vector = Dict[int, float]
+
+# Question templates and function words, left out of the hashed features so that the
+# subject of the question decides the similarity
+STOPWORDS = frozenset('''
+    qu c quoi ce que qui quel quelle quels quelles comment pourquoi est sont
+    le la les l un une des du de d au aux et ou en à a ne n pas se s
+    ma mon mes ta ton tes sa son ses je j tu il elle on nous vous ils elles me m te t y
+    what is are the a an of to do does how can i my me it this that
+'''.split())
+
+
+def _normalise(weights: Dict[int, float]) -> Vector:
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return {index: weight / norm for index, weight in weights.items()} if norm else {}
+
+
+def cosine(a: Vector, b: Vector) -> float:
+    """
+    Cosine similarity of two unit vectors.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(index, 0.0) for index, weight in a.items())
+
+
+class HashingEmbedder:
+    """
+    Feature-hashing embedding of word unigrams/bigrams and character trigrams.
+    """
+
+    def __init__(self, dimensions: int = 1 << 18):
+        self.dimensions = dimensions
+
+    def _features(self, text: str) -> List[str]:
+        words = [word.strip("?!.,;:'\"()") for word in text.replace('-', ' ').replace("'", "' ").split()]
+        words = [word for word in words if word and word not in STOPWORDS]
+        features = [f"w:{word}" for word in words]
+        features += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+        for word in words:
+            padded = f" {word} "
+            features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text: str) -> Vector:
+        weights = {}
+        for feature in self._features(text):
+            # Words weigh more than their character trigrams
+            weight = 1.0 if feature[0] == 'c' else 3.0
+            index = zlib.crc32(feature.encode('utf-8')) % self.dimensions
+            weights[index] = weights.get(index, 0.0) + weight
+        return _normalise(weights)
+
+
+class SentenceTransformerEmbedder:
+    """
+    Dense embedding from a local sentence-transformers model.
+    """
+
+    def __init__(self, model_name: str):
+        # Deferred: optional dependency, pulls in torch
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def embed(self, text: str) -> Vector:
+        values = self.model.encode(text, normalize_embeddings=True)
+        return {index: float(value) for index, value in enumerate(values)}
+
+
+def create_embedder(name: str = SEMANTIC_CACHE_EMBEDDER):
+    """
+    Return the embedder configured by SEMANTIC_CACHE_EMBEDDER ("hashing" or a sentence-transformers model).
+    """
+    if name == 'hashing':
+        return HashingEmbedder()
+    try:
+        return SentenceTransformerEmbedder(name)
+    except ImportError:
+        print(f"[WARN] sentence-transformers is not installed; semantic cache uses the hashing embedder instead of {name}")
+        return HashingEmbedder()
+
+
+class _Entry:
+    __slots__ = ('entry_id', 'question', 'intent', 'scope', 'vector', 'answer', 'created_at', 'expires_at', 'hits', 'last_hit_at')
+
+    def __init__(self, entry_id, question, intent, scope, vector, answer, ttl):
+        self.entry_id = entry_id
+        self.question = question
+        self.intent = intent
+        self.scope = scope
+        self.vector = vector
+        self.answer = answer
+        self.created_at = time.time()
+        self.expires_at = time.monotonic() + ttl
+        self.hits = 0
+        self.last_hit_at = None
+
+
+class SemanticCache:
+    """
+    Bounded, expiring cache of assistant answers looked up by question similarity.
+
+    `scope` separates answers that cannot replace each other (e.g. structured and text answers).
+
+    Example:
+        >>> semantic_cache = SemanticCache(threshold=0.85)
+        >>> semantic_cache.store("Qu'est-ce que le machine learning ?", answer, scope='structured', intent='definition')
+        >>> semantic_cache.lookup("c'est quoi le machine learning", scope='structured')
+        (1, answer, 1.0)
+    """
+
+    def __init__(
+        self,
+        embedder=None,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        intents: frozenset = SEMANTIC_CACHE_INTENTS
+    ):
+        self.embedder = embedder or create_embedder()
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.intents = intents
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # entry_id -> _Entry, most recently used last
+        self._ids = itertools.count(1)
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _expire(self) -> None:
+        # Called with the lock held
+        now = time.monotonic()
+        for entry_id in [entry_id for entry_id, entry in self._entries.items() if entry.expires_at <= now]:
+            del self._entries[entry_id]
+
+    def lookup(self, question: str, scope: str = '') -> Optional[Tuple[int, Any, float]]:
+        """
+        Return (entry id, answer, similarity) of the most similar cached question above the
+        threshold, or None.
+        """
+        vector = self.embedder.embed(normalize_question(question))
+        with self._lock:
+            self._expire()
+            best, best_similarity = None, self.threshold
+            for entry in self._entries.values():
+                if entry.scope != scope:
+                    continue
+                similarity = cosine(vector, entry.vector)
+                if similarity >= best_similarity:
+                    best, best_similarity = entry, similarity
+
+            if best is None:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            best.hits += 1
+            best.last_hit_at = time.time()
+            self._entries.move_to_end(best.entry_id)
+            return best.entry_id, best.answer, round(best_similarity, 3)
+
+    def store(self, question: str, answer: Any, scope: str = '', intent: Optional[str] = None) -> int:
+        """
+        Cache the answer to a question; returns its entry id. An entry for the same question,
+        scope and intent (e.g. stored by a concurrent run) is replaced, keeping its hit count.
+        """
+        normalised = normalize_question(question)
+        vector = self.embedder.embed(normalised)
+        with self._lock:
+            entry = _Entry(next(self._ids), normalised, intent, scope, vector, answer, self.ttl)
+            for previous in list(self._entries.values()):
+                if (previous.question, previous.scope, previous.intent) == (normalised, scope, intent):
+                    del self._entries[previous.entry_id]
+                    entry.hits = previous.hits
+                    entry.last_hit_at = previous.last_hit_at
+            self._entries[entry.entry_id] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            return entry.entry_id
+
+    def purge(self, entry_id: Optional[int] = None) -> int:
+        """
+        Drop one entry, or every entry when no id is given; returns the number removed.
+        """
+        with self._lock:
+            if entry_id is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            return 1 if self._entries.pop(entry_id, None) is not None else 0
+
+    def entries(self, limit: int = 50) -> List[Dict]:
+        """
+        Return the cached questions with their hit counts, most hit first.
+        """
+        with self._lock:
+            self._expire()
+            ranked = sorted(self._entries.values(), key=lambda entry: entry.hits, reverse=True)[:limit]
+            return [{
+                'id': entry.entry_id,
+                'question': entry.question,
+                'intent': entry.intent,
+                'scope': entry.scope,
+                'hits': entry.hits,
+                'created_at': entry.created_at,
+                'last_hit_at': entry.last_hit_at
+            } for entry in ranked]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'embedder': type(self.embedder).__name__,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+                'evictions': self._evictions
+            }
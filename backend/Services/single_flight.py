@@ -0,0 +1,91 @@
+"""
+Request coalescing ("single-flight") for identical concurrent agent calls
+
+When several identical requests arrive while the first one is still running (double
+clicks, dashboard tiles loading at once), only the first executes; the others wait for
+it and share its result (or its error) instead of paying for another grok-3 run.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent executions that share a key.
+
+    Example:
+        >>> single_flight = SingleFlight()
+        >>> result, coalesced = single_flight.do(('profiler', 'get_full_profile', 'User123', ''), run_agent)
+        >>> single_flight.stats()["coalesced"]
+        0
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call in flight
+
+        # Metrics
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run `fn`, unless a call with the same key is in flight, in which case wait for it.
+
+        Args:
+            key: Identifies identical work (e.g. the response cache key)
+            fn: Zero-argument callable doing the work
+
+        Returns:
+            Tuple of (result, coalesced) where coalesced is True if the result was shared
+            from another caller's execution. An error raised by that execution is re-raised
+            in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def stats(self) -> Dict:
+        """
+        Return execution and coalescing counters.
+        """
+        with self._lock:
+            total = self._executions + self._coalesced
+            return {
+                "in_flight": len(self._calls),
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "coalesced_rate": round(self._coalesced / total, 3) if total else 0.0
+            }
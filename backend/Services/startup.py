@@ -0,0 +1,98 @@
+"""
+Startup timing report
+
+Records how long each boot component takes (imports, pool creation, background pre-warm)
+so cold-start and worker-restart latency can be tracked over time. The report is exposed
+on /health and printed when the API is ready.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class StartupReport:
+    """
+    Collects named boot phases, timed from the creation of the report.
+
+    Phases may run on background threads (e.g. pool pre-warm); each one is recorded with
+    its start offset and duration.
+
+    Example:
+        >>> startup_report = StartupReport()
+        >>> with startup_report.phase('import_agents'):
+        ...     from Modules.PersonnalisationAndRecommendation.PersonalisedLearning import create_learner_profiler_agent
+        >>> startup_report.mark_ready()
+        >>> startup_report.report()["phases"]["import_agents"]["duration_ms"]
+        812.4
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._phases = {}  # name -> (start offset, duration, error)
+        self._ready_at = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time the enclosed block as a named phase (failures are recorded, then re-raised).
+        """
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, started=started, error=error)
+
+    def record(self, name: str, seconds: float, started: Optional[float] = None, error: Optional[str] = None) -> None:
+        """
+        Record a phase measured elsewhere.
+
+        Args:
+            name: Phase name (e.g. "prewarm_learner_profiler")
+            seconds: Phase duration
+            started: perf_counter() value when the phase began (defaults to now - seconds)
+            error: Error message if the phase failed
+        """
+        started = started if started is not None else time.perf_counter() - seconds
+        with self._lock:
+            self._phases[name] = (started - self._started, seconds, error)
+
+    def mark_ready(self) -> None:
+        """
+        Mark the moment the API is ready to accept requests.
+        """
+        with self._lock:
+            self._ready_at = time.perf_counter()
+
+    @property
+    def ready_ms(self) -> Optional[float]:
+        with self._lock:
+            if self._ready_at is None:
+                return None
+            return round(1000 * (self._ready_at - self._started), 1)
+
+    def report(self) -> Dict:
+        """
+        Return the time to ready and every phase's start offset and duration (ms).
+        """
+        ready_ms = self.ready_ms
+        with self._lock:
+            phases = {}
+            for name, (offset, seconds, error) in sorted(self._phases.items(), key=lambda item: item[1][0]):
+                phases[name] = {
+                    "started_at_ms": round(1000 * offset, 1),
+                    "duration_ms": round(1000 * seconds, 1)
+                }
+                if error is not None:
+                    phases[name]["error"] = error
+
+            return {
+                "ready_ms": ready_ms,
+                "phases": phases
+            }
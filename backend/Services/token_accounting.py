@@ -0,0 +1,188 @@
+"""
+Token and cost accounting per agent run
+
+Every agent run is charged its input, output and cached tokens (as reported by the model)
+plus the tokens of its tool outputs, which are sent back to the model as input on the next
+call: a large tool result such as `build_learning_path`'s sample JSON shows up there. Costs
+use the list price of the run's model tier (TOKEN_PRICE_*, in USD per million tokens).
+
+`TokenLedger` aggregates the usage by endpoint, action, agent (pool), user and tool; the API
+exposes it on /api/usage and returns each request's usage in its debug `timing` block.
+Tool output tokens are counted with tiktoken when it is installed, otherwise estimated at 4
+characters per token.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+# USD per million tokens per model tier (grok-3 / grok-3-mini list prices by default)
+TOKEN_PRICES_PER_MTOK = {
+    'standard': {
+        'input': float(os.getenv('TOKEN_PRICE_STANDARD_INPUT', '3.0')),
+        'cached': float(os.getenv('TOKEN_PRICE_STANDARD_CACHED', '0.75')),
+        'output': float(os.getenv('TOKEN_PRICE_STANDARD_OUTPUT', '15.0'))
+    },
+    'fast': {
+        'input': float(os.getenv('TOKEN_PRICE_FAST_INPUT', '0.3')),
+        'cached': float(os.getenv('TOKEN_PRICE_FAST_CACHED', '0.075')),
+        'output': float(os.getenv('TOKEN_PRICE_FAST_OUTPUT', '0.5'))
+    }
+}
+# Learners whose totals are kept (least recently charged dropped first)
+TOKEN_LEDGER_MAX_USERS = int(os.getenv('TOKEN_LEDGER_MAX_USERS', '10000'))
+
+GROUPS = ('endpoint', 'action', 'agent', 'user', 'tool')
+_FIELDS = ('runs', 'input_tokens', 'output_tokens', 'cached_tokens', 'tool_output_tokens', 'cost_usd')
+
+
+def _token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding('cl100k_base')
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        return lambda text: max(1, len(text) // 4) if text else 0
+
+
+count_tokens = _token_counter()
+
+
+def run_cost(input_tokens: int, cached_tokens: int, output_tokens: int, tier: str) -> float:
+    """
+    Return the USD cost of a run's tokens on a model tier (cached tokens are part of the input).
+    """
+    prices = TOKEN_PRICES_PER_MTOK.get(tier, TOKEN_PRICES_PER_MTOK['standard'])
+    uncached = max(0, input_tokens - cached_tokens)
+    return (uncached * prices['input'] + cached_tokens * prices['cached'] + output_tokens * prices['output']) / 1_000_000
+
+
+def run_usage(run_response, tier: str = 'standard') -> Dict:
+    """
+    Extract the token usage and cost of an agno RunResponse.
+
+    Returns:
+        Dict with input/output/cached tokens, tool output tokens (total and per tool),
+        the model tier and the cost in USD
+    """
+    usage = {'input_tokens': 0, 'output_tokens': 0, 'cached_tokens': 0, 'tool_output_tokens': 0, 'tool_output': {}}
+
+    for message in getattr(run_response, 'messages', None) or []:
+        if getattr(message, 'from_history', False):
+            continue
+        metrics = getattr(message, 'metrics', None)
+        if message.role == 'assistant' and metrics is not None:
+            usage['input_tokens'] += metrics.input_tokens or 0
+            usage['output_tokens'] += metrics.output_tokens or 0
+            usage['cached_tokens'] += metrics.cached_tokens or 0
+        elif message.role == 'tool':
+            tokens = count_tokens(str(message.content or ''))
+            name = message.tool_name or 'unknown'
+            usage['tool_output_tokens'] += tokens
+            usage['tool_output'][name] = usage['tool_output'].get(name, 0) + tokens
+
+    usage['tier'] = tier
+    usage['cost_usd'] = round(run_cost(usage['input_tokens'], usage['cached_tokens'], usage['output_tokens'], tier), 6)
+    return usage
+
+
+def _empty() -> Dict:
+    return dict.fromkeys(_FIELDS, 0)
+
+
+def _add(totals: Dict, usage: Dict) -> None:
+    totals['runs'] += 1
+    for field in _FIELDS[1:]:
+        totals[field] += usage[field]
+
+
+def _rounded(totals: Dict) -> Dict:
+    return {**totals, 'cost_usd': round(totals['cost_usd'], 6)}
+
+
+class TokenLedger:
+    """
+    Running token and cost totals of agent runs, grouped by endpoint, action, agent, user and tool.
+
+    Example:
+        >>> token_ledger = TokenLedger()
+        >>> usage = run_usage(response, tier='standard')
+        >>> token_ledger.record(usage, endpoint='recommender', action='build_learning_path',
+        ...                     agent='path_recommender', user_id='User123')
+        >>> token_ledger.totals('tool', limit=1)['rows'][0]['key']
+        'build_learning_path'
+    """
+
+    def __init__(self, max_users: int = TOKEN_LEDGER_MAX_USERS):
+        self.max_users = max_users
+
+        self._lock = threading.Lock()
+        self._total = _empty()
+        self._groups = {group: {} for group in GROUPS}
+        self._groups['user'] = OrderedDict()  # most recently charged last
+        self._evicted_users = 0
+
+    def record(self, usage: Dict, endpoint: str, action: Optional[str], agent: str, user_id: Optional[str] = None) -> None:
+        """
+        Charge a run's usage (see `run_usage()`) to its endpoint, action, agent, user and tools.
+        """
+        keys = {
+            'endpoint': endpoint,
+            'action': f"{endpoint}:{action}" if action else endpoint,
+            'agent': agent
+        }
+        with self._lock:
+            _add(self._total, usage)
+            for group, key in keys.items():
+                _add(self._groups[group].setdefault(key, _empty()), usage)
+
+            if user_id:
+                users = self._groups['user']
+                _add(users.setdefault(user_id, _empty()), usage)
+                users.move_to_end(user_id)
+                while len(users) > self.max_users:
+                    users.popitem(last=False)
+                    self._evicted_users += 1
+
+            # A tool is only charged its own output tokens
+            for tool, tokens in usage['tool_output'].items():
+                tool_totals = self._groups['tool'].setdefault(tool, _empty())
+                tool_totals['runs'] += 1
+                tool_totals['tool_output_tokens'] += tokens
+
+    def totals(self, group_by: Optional[str] = None, limit: int = 20) -> Dict:
+        """
+        Return the overall totals and, when `group_by` is given, the `limit` largest rows of
+        that group (by cost; by tool output tokens for tools).
+        """
+        if group_by is not None and group_by not in GROUPS:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUPS)}")
+
+        with self._lock:
+            report = {'total': _rounded(self._total)}
+            if group_by is None:
+                return report
+            rows = [{'key': key, **_rounded(totals)} for key, totals in self._groups[group_by].items()]
+
+        order = 'tool_output_tokens' if group_by == 'tool' else 'cost_usd'
+        rows.sort(key=lambda row: row[order], reverse=True)
+        report.update({'group_by': group_by, 'groups': len(rows), 'rows': rows[:limit]})
+        return report
+
+    def user(self, user_id: str) -> Optional[Dict]:
+        """
+        Return a learner's totals, or None if nothing was charged to them (or they were evicted).
+        """
+        with self._lock:
+            totals = self._groups['user'].get(user_id)
+            return _rounded(totals) if totals is not None else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **_rounded(self._total),
+                'users': len(self._groups['user']),
+                'evicted_users': self._evicted_users
+            }
@@ -0,0 +1,139 @@
+"""
+Concurrent dispatch of tool calls
+
+When the model emits several tool calls in one turn (e.g. `get_learner_context` +
+`get_user_progress` + `search_edflex_knowledge_base`), agno's async run gathers them, but
+our @tool functions are synchronous: executed on the runner's event loop, each one blocks
+the loop and the turn pays the sum of their latencies. `ToolDispatcher` provides agno tool
+hooks that execute every call on a bounded worker pool with a per-tool timeout, so the
+calls of one turn overlap and the turn pays the slowest one. Results are gathered in the
+order the model requested them before the next model call.
+
+In the threads serving mode agno executes the calls of a turn one after the other; the
+hook then only applies the per-tool timeout.
+"""
+
+import os
+import time
+import asyncio
+import inspect
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+
+TOOL_DISPATCH_MAX_WORKERS = int(os.getenv('TOOL_DISPATCH_MAX_WORKERS', '32'))
+TOOL_CALL_TIMEOUT_SECONDS = float(os.getenv('TOOL_CALL_TIMEOUT_SECONDS', '30'))
+
+
+class ToolTimeout(TimeoutError):
+    """Raised when a tool call exceeds its timeout (agno reports it to the model as a tool error)."""
+
+
+# Event loop of each worker thread, for hook chains that hand back a coroutine
+_worker_state = threading.local()
+
+
+def _resolve(result: Any) -> Any:
+    if not inspect.isawaitable(result):
+        return result
+    loop = getattr(_worker_state, 'loop', None)
+    if loop is None:
+        loop = _worker_state.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(result)
+
+
+class ToolDispatcher:
+    """
+    Tool hooks running tool calls on a shared worker pool with a per-tool timeout.
+
+    Use `ahook` for agents run with `Agent.arun()` and `hook` for `Agent.run()`. Install it
+    after `ToolMemo`'s hook so memoized calls are answered without a thread hop.
+
+    Example:
+        >>> tool_dispatcher = ToolDispatcher(max_workers=32, timeout=30, tool_timeouts={"search_exa": 10})
+        >>> agent.tool_hooks = [tool_memo.ahook, tool_dispatcher.ahook]
+        >>> tool_dispatcher.stats()["max_concurrent"]
+        3
+    """
+
+    def __init__(
+        self,
+        max_workers: int = TOOL_DISPATCH_MAX_WORKERS,
+        timeout: float = TOOL_CALL_TIMEOUT_SECONDS,
+        tool_timeouts: Optional[Dict[str, float]] = None
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.tool_timeouts = dict(tool_timeouts or {})
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool-dispatch")
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._in_flight = 0
+        self._max_concurrent = 0
+        self._calls = 0
+        self._timeouts = 0
+        self._total_seconds = 0.0
+
+    def timeout_for(self, function_name: str) -> float:
+        return self.tool_timeouts.get(function_name, self.timeout)
+
+    def _execute(self, function_call: Callable, arguments: Dict) -> Any:
+        with self._lock:
+            self._in_flight += 1
+            self._max_concurrent = max(self._max_concurrent, self._in_flight)
+        started = time.perf_counter()
+        try:
+            return _resolve(function_call(**arguments))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._calls += 1
+                self._total_seconds += time.perf_counter() - started
+
+    def _timed_out(self, function_name: str, timeout: float) -> ToolTimeout:
+        # The worker thread cannot be interrupted; it finishes in the background
+        with self._lock:
+            self._timeouts += 1
+        return ToolTimeout(f"Tool {function_name} exceeded {timeout}s")
+
+    def hook(self, function_name: str, function_call: Callable, arguments: Dict) -> Any:
+        timeout = self.timeout_for(function_name)
+        # Copy the caller's context so the run's tool memo follows the call
+        future = self._executor.submit(contextvars.copy_context().run, self._execute, function_call, arguments)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise self._timed_out(function_name, timeout)
+
+    async def ahook(self, function_name: str, function_call: Callable, arguments: Dict) -> Any:
+        timeout = self.timeout_for(function_name)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._executor, contextvars.copy_context().run, self._execute, function_call, arguments
+        )
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise self._timed_out(function_name, timeout)
+
+    def stats(self) -> Dict:
+        """
+        Return pool size, live/peak concurrent tool calls, timeouts and average call time (ms).
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'timeout_seconds': self.timeout,
+                'in_flight': self._in_flight,
+                'max_concurrent': self._max_concurrent,
+                'calls': self._calls,
+                'timeouts': self._timeouts,
+                'avg_call_ms': round(1000 * self._total_seconds / self._calls, 2) if self._calls else 0.0
+            }
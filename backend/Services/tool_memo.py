@@ -0,0 +1,159 @@
+"""
+Run-scoped memoization of tool results
+
+Within one agent run the model often calls the same read-only tool with the same
+arguments several times (e.g. `get_learner_profile` before and after searching the
+catalog). `ToolMemo` provides agno tool hooks that return the result of an identical
+earlier call of the same run instead of executing the tool again. Results never outlive
+the run that produced them.
+
+Tools with side effects are never memoized, and calling one clears the run's memo so a
+read following a write in the same run sees the write.
+"""
+
+import json
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+# Memo of the agent run executing in the current context (None outside a run scope).
+# Agent runs scheduled with run_coroutine_threadsafe or a copied context inherit it.
+_current_run = contextvars.ContextVar('tool_memo_run', default=None)
+
+
+def _call_key(function_name: str, arguments: Optional[Dict]) -> str:
+    return function_name + ":" + json.dumps(arguments or {}, sort_keys=True, default=str)
+
+
+class RunMemo:
+    """
+    Tool results and hit counts of one agent run.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results = {}  # call key -> result
+        self.hits = {}  # tool name -> memoized calls
+        self.misses = 0
+
+    def lookup(self, key: str):
+        with self._lock:
+            if key in self._results:
+                return True, self._results[key]
+            return False, None
+
+    def store(self, key: str, result: Any) -> None:
+        with self._lock:
+            self._results[key] = result
+
+    def record(self, function_name: str, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits[function_name] = self.hits.get(function_name, 0) + 1
+            else:
+                self.misses += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {'hits': sum(self.hits.values()), 'misses': self.misses, 'tools': dict(self.hits)}
+
+
+class ToolMemo:
+    """
+    Tool hooks memoizing read-only tool calls within an agent run.
+
+    Calls are only memoized inside `run_scope()`; outside of it the hooks just run the tool.
+    Use `hook` for agents run with `Agent.run()` and `ahook` for `Agent.arun()` (agno skips
+    async hooks on sync runs, and sync hooks cannot await the async tool chain).
+
+    Example:
+        >>> tool_memo = ToolMemo(memoizable={"get_learner_profile"}, side_effects={"log_recommendation"})
+        >>> agent.tool_hooks = [tool_memo.hook]
+        >>> with tool_memo.run_scope() as memo:
+        ...     agent.run("Recommander du contenu personnalisé à l'apprenant.\\n\\nuser_id: User123")
+        >>> memo.summary()
+        {'hits': 1, 'misses': 2, 'tools': {'get_learner_profile': 1}}
+    """
+
+    def __init__(self, memoizable: Iterable[str], side_effects: Iterable[str] = ()):
+        self.memoizable = frozenset(memoizable)
+        self.side_effects = frozenset(side_effects)
+
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._hits = 0
+        self._misses = 0
+
+    @contextmanager
+    def run_scope(self):
+        """
+        Memoize tool calls made by the agent runs started inside this block.
+
+        Yields:
+            The RunMemo of the scope (see `RunMemo.summary()` for its hit counts)
+        """
+        memo = RunMemo()
+        token = _current_run.set(memo)
+        try:
+            yield memo
+        finally:
+            _current_run.reset(token)
+            summary = memo.summary()
+            with self._lock:
+                self._runs += 1
+                self._hits += summary['hits']
+                self._misses += summary['misses']
+
+    def _begin(self, function_name: str, arguments: Optional[Dict]):
+        """
+        Return (memo, key, cached, result) for a call; key is None if the call is not memoized
+        """
+        memo = _current_run.get()
+        if memo is None or function_name not in self.memoizable:
+            return memo, None, False, None
+
+        key = _call_key(function_name, arguments)
+        cached, result = memo.lookup(key)
+        memo.record(function_name, hit=cached)
+        return memo, key, cached, result
+
+    def _end(self, memo: Optional[RunMemo], key: Optional[str], function_name: str, result: Any) -> None:
+        if memo is None:
+            return
+        if key is not None:
+            memo.store(key, result)
+        elif function_name in self.side_effects:
+            memo.clear()
+
+    def hook(self, function_name: str, function_call: Callable, arguments: Dict) -> Any:
+        memo, key, cached, result = self._begin(function_name, arguments)
+        if cached:
+            return result
+        result = function_call(**arguments)
+        self._end(memo, key, function_name, result)
+        return result
+
+    async def ahook(self, function_name: str, function_call: Callable, arguments: Dict) -> Any:
+        memo, key, cached, result = self._begin(function_name, arguments)
+        if cached:
+            return result
+        result = await function_call(**arguments)
+        self._end(memo, key, function_name, result)
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            calls = self._hits + self._misses
+            return {
+                'runs': self._runs,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / calls, 4) if calls else 0.0,
+                'memoizable_tools': len(self.memoizable)
+            }
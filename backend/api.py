@@ -1,8 +1,20 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
 import os
 import sys
-from dotenv import load_dotenv
+import json
+import time
+import threading
+from functools import partial
+from contextlib import contextmanager
+from Services.startup import StartupReport
+
+# Boot latency per component, reported on /health
+startup_report = StartupReport()
+
+with startup_report.phase('import_web'):
+    from flask import Flask, Response, g, has_request_context, request, jsonify, stream_with_context
+    from flask_cors import CORS
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from dotenv import load_dotenv
 
 # Load environment variables from parent directory
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
@@ -10,21 +22,181 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 # Add Modules/PersonnalisationAndRecommendation to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'Modules', 'PersonnalisationAndRecommendation'))
 
-from Modules.PersonnalisationAndRecommendation.PersonalisedLearning import (
-    create_learner_profiler_agent,
-    create_path_recommender_agent,
-    create_learning_assistant_agent
-)
+with startup_report.phase('import_agents'):
+    from agno.run.response import RunEvent
+    from Modules.PersonnalisationAndRecommendation.PersonalisedLearning import (
+        create_learner_profiler_agent,
+        create_path_recommender_agent,
+        create_learning_assistant_agent,
+        create_action_agent,
+        create_session_summarizer_agent,
+        MEMOIZABLE_TOOLS,
+        SIDE_EFFECT_TOOLS
+    )
+    from ActionPrompts import supports_compact
+    from ResponseModels import ResponseFormatError, parse_structured, response_model_for
+
+with startup_report.phase('import_services'):
+    from Services.agent_runner import AgentRunner
+    from Services.agent_pool import AgentPool, AgentPoolTimeout, prime_agent
+    from Services.response_cache import ResponseCache
+    from Services.direct_actions import DirectActionError, run_direct_action, supports_direct
+    from Services.job_queue import JobQueue
+    from Services.metrics import ApiMetrics
+    from Services.token_accounting import TokenLedger, run_usage
+    from Services.single_flight import SingleFlight
+    from Services.admission import AdmissionController, AdmissionRejected, current_lane, in_lane
+    from Services.tool_memo import ToolMemo
+    from Services.tool_dispatch import ToolDispatcher
+    from Services.model_router import ModelRouter, ModelTierError
+    from Services.reasoning_budget import ReasoningBudgets, ReasoningBudgetError
+    from Services.assistant_sessions import AssistantSessions
+    from Services.semantic_cache import SemanticCache, SEMANTIC_CACHE_ENABLED
+    from Services.resilience import Resilience, CircuitOpenError, DeadlineError, DeadlineExceeded
+    from Tools.learner_tools import add_interaction_listener, profile_snapshots, interaction_store
+
+# Build agent instances in the background at boot instead of blocking startup
+# (pools otherwise create instances lazily on first checkout)
+AGENT_PREWARM = os.getenv('AGENT_PREWARM', 'true').lower() in ('1', 'true', 'yes')
+
+# "full" sends each agent's complete instructions; "compact" runs profiler/recommender
+# actions on agents scoped to that action (see ActionPrompts.py). Overridable per request.
+AGENT_PROMPT_MODE = os.getenv('AGENT_PROMPT_MODE', 'full')
+
+# "structured" answers with the JSON fields of the action's response model (see
+# ResponseModels.py), falling back to text when validation fails; "text" keeps the markdown
+# answer. Overridable per request (`response_format`); streams always send text.
+RESPONSE_FORMAT = os.getenv('RESPONSE_FORMAT', 'structured')
+
+# Keep a per-learner conversation window for the Learning Assistant (see ASSISTANT_SESSION_*).
+# A request can still ask for a stateless answer with `session: false`.
+ASSISTANT_SESSIONS = os.getenv('ASSISTANT_SESSIONS', 'true').lower() in ('1', 'true', 'yes')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
-# Initialize agents
-print("Initializing agents...")
-learner_profiler = create_learner_profiler_agent()
-path_recommender = create_path_recommender_agent()
-learning_assistant = create_learning_assistant_agent()
-print("[OK] All agents initialized successfully!")
+# Agent runs are scheduled on a shared runner so slow LLM calls overlap instead of
+# blocking each other (see AGENT_SERVING_MODE / AGENT_MAX_CONCURRENCY)
+agent_runner = AgentRunner()
+
+# Repeated identical read-only tool calls within one agent run reuse the first result
+tool_memo = ToolMemo(MEMOIZABLE_TOOLS, SIDE_EFFECT_TOOLS)
+
+# Tool calls run on a worker pool with a per-tool timeout, so the calls of one model turn
+# overlap (see TOOL_DISPATCH_MAX_WORKERS / TOOL_CALL_TIMEOUT_SECONDS)
+tool_dispatcher = ToolDispatcher()
+
+# Reasoning steps allowed per action (see REASONING_BUDGETS), overridable per request
+reasoning_budgets = ReasoningBudgets()
+
+# Agent runs get their endpoint's deadline budget, are hedged past their pool's p95 and fail
+# fast while their model tier's circuit breaker is open (see DEADLINE_* / HEDGE_* / CIRCUIT_*).
+# Pool exhaustion and admission rejections are local and do not count against the provider.
+resilience = Resilience(ignored_errors=(AgentPoolTimeout, AdmissionRejected))
+
+
+def prepare_agent(agent):
+    """
+    Install the reasoning budget, tool memo and dispatch hooks on a new pooled agent, then
+    process its tool schemas
+    """
+    if agent_runner.mode == 'async':
+        agent.tool_hooks = [reasoning_budgets.ahook, tool_memo.ahook, tool_dispatcher.ahook]
+    else:
+        agent.tool_hooks = [reasoning_budgets.hook, tool_memo.hook, tool_dispatcher.hook]
+    prime_agent(agent)
+
+
+AGENT_FACTORIES = {
+    'learner_profiler': create_learner_profiler_agent,
+    'path_recommender': create_path_recommender_agent,
+    'learning_assistant': create_learning_assistant_agent
+}
+
+# Agent pools: each request checks out its own instance, built on first use. These serve
+# the standard model tier; pools for other tiers and compact prompts are added on demand.
+agent_pools = {
+    name: AgentPool(name, factory, prepare=prepare_agent) for name, factory in AGENT_FACTORIES.items()
+}
+agent_pools_lock = threading.Lock()
+
+# Simple requests run on a faster model tier than grok-3 (see MODEL_ROUTING / MODEL_*_ID)
+model_router = ModelRouter()
+
+
+def prewarm_pool(name, pool):
+    """
+    Build a pool's warm instances (run on a background thread at boot)
+    """
+    try:
+        with startup_report.phase(f'prewarm_{name}'):
+            pool.warm_up()
+        print(f"[OK] {name} agents pre-warmed")
+    except Exception as e:
+        # The pool still builds instances on demand
+        print(f"[WARN] Pre-warm of {name} agents failed: {e}")
+
+
+if AGENT_PREWARM:
+    for name, pool in agent_pools.items():
+        threading.Thread(target=prewarm_pool, args=(name, pool), name=f'prewarm-{name}', daemon=True).start()
+
+# Bounded admission queue in front of the agents: assistant questions are admitted before
+# dashboard requests, which are admitted before batch/job work (see ADMISSION_*)
+admission = AdmissionController()
+
+# Per-request, per-LLM-call and per-tool-call latency and token metrics (see /metrics)
+api_metrics = ApiMetrics()
+
+# Tokens and cost of every agent run, by endpoint, action, agent, user and tool (see /api/usage)
+token_ledger = TokenLedger()
+
+# Finished profiler/recommender responses, dropped for a learner as soon as a new
+# interaction is tracked for them
+response_cache = ResponseCache()
+add_interaction_listener(response_cache.invalidate_user)
+
+# Answers to generic assistant questions (definitions, troubleshooting), shared between
+# learners and looked up by question similarity (see SEMANTIC_CACHE_*)
+semantic_cache = SemanticCache()
+
+# Identical profiler/recommender requests arriving while one is running share its result
+single_flight = SingleFlight()
+
+# Batch requests fan out over their own bounded pool so a large team cannot starve
+# interactive traffic
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', '8'))
+BATCH_MAX_USERS = int(os.getenv('BATCH_MAX_USERS', '500'))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix='batch')
+
+# Long-running recommender requests (e.g. build_learning_path with a goal) can be submitted
+# as jobs and polled, instead of holding the HTTP connection open (see JOB_QUEUE_*). A job
+# not admitted under load is queued again after a backoff rather than failed
+job_queue = JobQueue(retryable_errors=(AdmissionRejected,))
+
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+def request_started():
+    """
+    Return when the current HTTP request arrived (time.perf_counter()), or now outside a
+    request (jobs, batch items)
+    """
+    if has_request_context():
+        return getattr(g, 'request_started', None) or time.perf_counter()
+    return time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    started = getattr(g, 'request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        api_metrics.observe_request(request.method, endpoint, response.status_code, time.perf_counter() - started)
+    return response
 
 
 def clean_agent_response(text):
@@ -39,55 +211,748 @@ def clean_agent_response(text):
     return text
 
 
-@app.route('/api/profiler', methods=['POST'])
-def profiler():
+@contextmanager
+def admitted(lane=None):
     """
-    Endpoint for Learner Profiler agent
+    Wait for admission of an agent run and record the queue wait (or the rejection)
     """
+    lane = lane or current_lane()
     try:
-        data = request.json
-        user_id = data.get('user_id')
-        action = data.get('action', 'analyze_behavior')
+        with admission.admit(lane) as wait_seconds:
+            api_metrics.admission_waits.observe(wait_seconds, lane=lane)
+            yield wait_seconds
+    except AdmissionRejected as e:
+        api_metrics.admission_rejections.inc(lane=e.lane, reason=e.reason)
+        raise
 
-        if not user_id:
-            return jsonify({'error': 'user_id is required'}), 400
 
-        # Build prompt based on action
-        if action == 'analyze_behavior':
-            prompt = f"Analyser le comportement d'apprentissage pour user_id: {user_id}"
-        elif action == 'identify_learning_style':
-            prompt = f"Identifier le style d'apprentissage pour user_id: {user_id}"
-        elif action == 'detect_skill_gaps':
-            prompt = f"Détecter les lacunes de compétences pour user_id: {user_id}"
-        elif action == 'calculate_engagement':
-            prompt = f"Calculer les métriques d'engagement pour user_id: {user_id}"
-        elif action == 'get_full_profile':
-            prompt = f"Récupérer le profil complet pour user_id: {user_id}"
-        else:
-            prompt = f"Analyser le profil pour user_id: {user_id}"
+def admission_rejected_response(e):
+    """
+    Fast 429/503 answer for a request that was not admitted
+    """
+    return jsonify({'error': str(e), 'retry_after': e.retry_after}), e.status_code, {'Retry-After': str(e.retry_after)}
 
-        # Run agent
-        response = learner_profiler.run(prompt)
 
-        # Extract and clean content
-        result = response.content if hasattr(response, 'content') else str(response)
+def circuit_open_response(e, endpoint):
+    """
+    Fast 503 answer for a request that needed a model tier whose circuit breaker is open
+    """
+    api_metrics.degraded_responses.inc(endpoint=endpoint, fallback='none')
+    return jsonify({'error': str(e), 'retry_after': e.retry_after}), e.status_code, {'Retry-After': str(e.retry_after)}
 
-        # Debug logging
-        print(f"\n[DEBUG] Raw response length: {len(result)}")
-        print(f"[DEBUG] First 500 chars: {result[:500]}")
 
-        result_cleaned = clean_agent_response(result)
+def response_format(data):
+    """
+    Return the response format of a request ("structured" or "text")
+    """
+    value = data.get('response_format') or RESPONSE_FORMAT
+    if value not in ('structured', 'text'):
+        raise ResponseFormatError("response_format must be 'structured' or 'text'")
+    return value
 
-        print(f"[DEBUG] Cleaned response length: {len(result_cleaned)}")
-        print(f"[DEBUG] First 500 chars cleaned: {result_cleaned[:500]}\n")
 
-        return jsonify({
+def effective_prompt_mode(pool_name, action, data):
+    """
+    Return the prompt mode an action actually runs with: `compact` only when it is asked for
+    (request or AGENT_PROMPT_MODE) and the action has a compact prompt
+    """
+    prompt_mode = data.get('prompt_mode') or AGENT_PROMPT_MODE
+    return 'compact' if prompt_mode == 'compact' and supports_compact(pool_name, action) else 'full'
+
+
+def resolve_pool(pool_name, action, data, tier='standard', reasoning=True, structured=False):
+    """
+    Return the name of the pool serving an action on a model tier.
+
+    In compact prompt mode, actions with a compact prompt get their own pool of
+    action-scoped agents; models other than the standard tier, agents without
+    ReasoningTools and agents answering with a response model get their own pools too
+    (e.g. `learner_profiler:calculate_engagement@fast-noreason-LearnerProfile`).
+    Pools are created on first use.
+    """
+    model = response_model_for(pool_name, action) if structured else None
+    if effective_prompt_mode(pool_name, action, data) == 'compact':
+        variant = f'{pool_name}:{action}'
+        factory = partial(create_action_agent, pool_name, action, tier=tier, reasoning=reasoning, response_model=model)
+    else:
+        variant = pool_name
+        factory = partial(AGENT_FACTORIES[pool_name], tier=tier, reasoning=reasoning, response_model=model)
+
+    suffixes = ([tier] if tier != 'standard' else []) + ([] if reasoning else ['noreason'])
+    if model is not None:
+        suffixes.append(model.__name__)
+    if suffixes:
+        variant = f"{variant}@{'-'.join(suffixes)}"
+
+    with agent_pools_lock:
+        if variant not in agent_pools:
+            agent_pools[variant] = AgentPool(variant, factory, prepare=prepare_agent)
+    return variant
+
+
+def route_pool(endpoint, pool_name, action, data, question=None, structured=False):
+    """
+    Pick the model tier, reasoning budget and deadline of a request (or the `model_tier` /
+    `reasoning_budget` / `deadline_seconds` it asks for) and the pool serving it.
+
+    Returns the pool name and the routing decision (endpoint, action, user, tier, reason,
+    reasoning budget, prompt mode, deadline and the time its budget started).
+    """
+    budget = reasoning_budgets.budget_for(endpoint, action, data.get('reasoning_budget'))
+    tier, reason = model_router.route(endpoint, action, question=question, override=data.get('model_tier'))
+    route = {
+        'endpoint': endpoint,
+        'action': action,
+        'user_id': data.get('user_id'),
+        'tier': tier,
+        'reason': reason,
+        'reasoning_budget': budget,
+        'prompt_mode': effective_prompt_mode(pool_name, action, data),
+        'deadline_seconds': resilience.deadline_for(endpoint, data.get('deadline_seconds')),
+        # The deadline budget runs from the request's arrival, admission and pool waits included
+        'started': request_started()
+    }
+    return resolve_pool(pool_name, action, data, tier, reasoning=budget != 0, structured=structured), route
+
+
+def record_usage(response, pool_name, route, tier):
+    """
+    Charge an agent run's tokens and cost to the token ledger and return its usage.
+
+    Runs without a route (e.g. session summaries) are charged to the `background` endpoint.
+    """
+    usage = run_usage(response, tier)
+    endpoint = route['endpoint'] if route is not None else 'background'
+    action = usage_action(endpoint, route['action']) if route is not None else pool_name
+    user_id = route['user_id'] if route is not None else None
+    token_ledger.record(usage, endpoint=endpoint, action=action, agent=pool_name, user_id=user_id)
+    return api_metrics.observe_usage(usage, endpoint, action, pool_name)
+
+
+def record_abandoned_usage(future, pool_name, route, tier):
+    """
+    Charge a run abandoned mid-flight (timed out, or its hedge answered first) once it ends:
+    its tokens are spent even though no request uses the answer
+    """
+    if not future.cancelled() and future.exception() is None:
+        record_usage(future.result(), pool_name, route, tier)
+
+
+def run_pooled_agent(pool_name, prompt, lane=None, route=None, tier='standard'):
+    """
+    Run a prompt on an agent checked out from a pool and record its metrics.
+
+    The run first goes through admission control, in `lane` or the current lane, then runs
+    within the route's deadline (hedged past the pool's p95) under the circuit breaker of its
+    model tier (the route's, else `tier`).
+    Returns the agent response and its timing summary (LLM calls, tool calls, tokens and
+    cost, memoized tool calls, the profile versions its tools were served, and the model tier
+    when the run was routed).
+    """
+    started = time.perf_counter()
+    budget = route['reasoning_budget'] if route is not None else None
+    deadline = route['deadline_seconds'] if route is not None else resilience.default_deadline
+    tier = route['tier'] if route is not None else tier
+
+    def attempt(timeout, wait=None):
+        # Runs on the request's thread; only a hedge runs on the resilience executor
+        deadline_at = time.perf_counter() + timeout
+        pool = agent_pools[pool_name]
+        submitted = []
+        try:
+            with pool.lease(min(timeout, pool.checkout_timeout)) as agent, tool_memo.run_scope() as memo, \
+                    reasoning_budgets.run_scope(budget) as reasoning, profile_snapshots.served() as served:
+
+                def on_submit(future):
+                    # An abandoned run keeps its pool slot until it really ends
+                    submitted.append(future)
+                    pool.release_after(agent, future)
+
+                response = agent_runner.run(
+                    agent,
+                    prompt,
+                    timeout=max(0.0, deadline_at - time.perf_counter()),
+                    wait=wait,
+                    on_submit=on_submit
+                )
+        except BaseException:
+            for future in submitted:
+                future.add_done_callback(lambda finished: record_abandoned_usage(finished, pool_name, route, tier))
+            raise
+        # Charged per attempt: a hedge that lost to the primary still finishes on its own
+        # thread and is charged here, a primary abandoned for its hedge when it ends (above)
+        usage = record_usage(response, pool_name, route, tier)
+        return response, memo.summary(), reasoning.summary(), usage, dict(served)
+
+    # Do not queue for admission while the model tier is known to be failing
+    resilience.check(tier)
+    with admitted(lane) as wait_seconds:
+        try:
+            (response, memo, reasoning, usage, profile_versions), hedge = resilience.call(
+                pool_name, tier, deadline, attempt, started=route['started'] if route is not None else None
+            )
+        except DeadlineExceeded:
+            api_metrics.deadline_exceeded.inc(endpoint=route['endpoint'] if route is not None else pool_name)
+            raise
+    seconds = time.perf_counter() - started
+    timing = api_metrics.observe_agent_run(pool_name, response, seconds, memo)
+    timing['admission_wait_ms'] = round(1000 * wait_seconds, 2)
+    timing['reasoning'] = api_metrics.observe_reasoning(pool_name, reasoning)
+    timing['usage'] = usage
+    timing['profile_versions'] = profile_versions
+    if hedge is not None:
+        api_metrics.hedged_runs.inc(agent=pool_name, winner=hedge)
+        timing['hedge'] = hedge
+    if route is not None:
+        api_metrics.observe_route(route, seconds)
+        timing['model_tier'] = route['tier']
+        timing['route_reason'] = route['reason']
+    return response, timing
+
+
+def agent_result(response, pool_name, action, fmt):
+    """
+    Return the result of an agent run and its format: the validated fields of the action's
+    response model when structured, else the cleaned text answer
+    """
+    content = response.content if hasattr(response, 'content') else response
+    model = response_model_for(pool_name, action) if fmt == 'structured' else None
+    if model is not None:
+        fields, outcome = parse_structured(content, model)
+        api_metrics.structured_responses.inc(model=model.__name__, outcome=outcome)
+        if fields is not None:
+            return fields, 'structured'
+    return clean_agent_response(content), 'text'
+
+
+def expected_format(pool_name, action, fmt):
+    """
+    Return the format a successful run of the action answers in: structured only when it was
+    requested and the action has a response model, text otherwise
+    """
+    if fmt == 'structured' and response_model_for(pool_name, action) is not None:
+        return 'structured'
+    return 'text'
+
+
+def with_timing(payload, data, started, timing=None):
+    """
+    Attach the compact timing summary to a response payload when `debug` is set
+    """
+    if data.get('debug'):
+        payload['timing'] = {'total_ms': round(1000 * (time.perf_counter() - started), 2), **(timing or {})}
+    return payload
+
+
+# Task phrase per action. Prompts start with this fixed text and end with the
+# per-request block, so everything before the learner's data is byte-identical across
+# calls and can be served from the provider's prompt cache.
+PROFILER_TASKS = {
+    'analyze_behavior': "Analyser le comportement d'apprentissage de l'apprenant.",
+    'identify_learning_style': "Identifier le style d'apprentissage de l'apprenant.",
+    'detect_skill_gaps': "Détecter les lacunes de compétences de l'apprenant.",
+    'calculate_engagement': "Calculer les métriques d'engagement de l'apprenant.",
+    'get_full_profile': "Récupérer le profil complet de l'apprenant."
+}
+
+RECOMMENDER_TASKS = {
+    'recommend_content': "Recommander du contenu personnalisé à l'apprenant.",
+    'build_learning_path': "Construire un parcours d'apprentissage pour l'apprenant.",
+    'get_next_content': "Recommander le prochain meilleur contenu à l'apprenant.",
+    'check_prerequisites': "Vérifier les prérequis de l'apprenant."
+}
+
+
+def usage_action(endpoint, action):
+    """
+    Return the action a run is charged and labelled under: actions the endpoint does not know
+    (the request body accepts any string) share `other`, so clients cannot grow the token
+    ledger's groups or the /metrics series
+    """
+    tasks = {'profiler': PROFILER_TASKS, 'recommender': RECOMMENDER_TASKS}.get(endpoint)
+    if tasks is None or action is None or action in tasks:
+        return action
+    return 'other'
+
+
+def request_block(**fields):
+    """
+    Format the per-request data appended at the end of a prompt (empty fields are skipped)
+    """
+    return "\n".join(f"{name}: {value}" for name, value in fields.items() if value not in (None, ''))
+
+
+def build_profiler_prompt(user_id, action):
+    """
+    Build the Learner Profiler prompt for an action
+    """
+    task = PROFILER_TASKS.get(action, "Analyser le profil de l'apprenant.")
+    return f"{task}\n\n{request_block(user_id=user_id)}"
+
+
+def build_recommender_prompt(user_id, action, goal=''):
+    """
+    Build the Path Recommender prompt for an action
+    """
+    task = RECOMMENDER_TASKS.get(action, "Recommander du contenu à l'apprenant.")
+    if action != 'build_learning_path':
+        goal = ''
+    return f"{task}\n\n{request_block(user_id=user_id, objectif=goal)}"
+
+
+def build_assistant_prompt(user_id, question, session=None):
+    """
+    Build the Learning Assistant prompt for a question, with the learner's session summary
+    and recent turns when given
+    """
+    session = session or {}
+    history = "".join(
+        f"\n- Apprenant: {turn['question']}\n  Assistant: {turn['answer']}" for turn in session.get('turns', [])
+    )
+    block = request_block(user_id=user_id, résumé=session.get('summary'), historique=history, question=question)
+    return f"Répondre à la question de l'apprenant.\n\n{block}"
+
+
+def build_session_summary_prompt(summary, turns):
+    """
+    Build the prompt folding old assistant turns into a learner's session summary
+    """
+    exchanges = "".join(f"\n- Apprenant: {turn['question']}\n  Assistant: {turn['answer']}" for turn in turns)
+    return (
+        "Mettre à jour le résumé de la conversation avec les nouveaux échanges.\n\n"
+        f"{request_block(résumé=summary, échanges=exchanges)}"
+    )
+
+
+def build_narrative_prompt(user_id, action, result):
+    """
+    Build the prompt asking an agent to narrate a direct-mode tool result
+    """
+    data = json.dumps(result, ensure_ascii=False, default=str)
+    return (
+        "Rédiger une synthèse claire des données ci-dessous. "
+        "Les données sont déjà calculées, ne pas rappeler d'outils.\n\n"
+        f"{request_block(user_id=user_id, action=action, données=data)}"
+    )
+
+
+def direct_payload(endpoint, pool_name, user_id, action, data):
+    """
+    Serve an action by calling its tool directly (mode=direct), without the LLM.
+
+    The optional narrative (`narrate: true`) is a second step run by the agent on the
+    already computed result.
+    """
+    started = time.perf_counter()
+    result = run_direct_action(endpoint, action, data)
+    timing = None
+
+    payload = {
+        'success': True,
+        'user_id': user_id,
+        'action': action,
+        'mode': 'direct',
+        'result': result
+    }
+
+    if data.get('narrate'):
+        prompt = build_narrative_prompt(user_id, action, result)
+        narrative_pool, route = route_pool(endpoint, pool_name, 'narrate', data)
+        response, timing = run_pooled_agent(narrative_pool, prompt, route=route)
+        narrative = response.content if hasattr(response, 'content') else str(response)
+        payload['narrative'] = clean_agent_response(narrative)
+
+    return with_timing(payload, data, started, timing)
+
+
+def degraded_payload(endpoint, user_id, action, data, cache_key, result_format, started, error):
+    """
+    Answer a profiler/recommender request the model could not serve (circuit breaker open or
+    deadline spent): the last cached result even if expired, else the action's direct tool
+    result. Re-raises `error` when neither is available.
+    """
+    stale = response_cache.get(cache_key, allow_stale=True) if not data.get('no_cache') else None
+    if stale is not None:
+        api_metrics.degraded_responses.inc(endpoint=endpoint, fallback='stale_cache')
+        return with_timing({
             'success': True,
             'user_id': user_id,
             'action': action,
-            'result': result_cleaned
-        })
+            'format': result_format,
+            'profile_version': stale['profile_version'],
+            'result': stale['result'],
+            'cached': True,
+            'degraded': True,
+            'fallback': 'stale_cache',
+            'degraded_reason': str(error)
+        }, data, started)
+
+    if supports_direct(endpoint, action):
+        try:
+            result = run_direct_action(endpoint, action, data)
+        except DirectActionError:
+            # The request lacks a parameter the agent would have inferred (e.g. job_role)
+            result = None
+        if result is not None:
+            api_metrics.degraded_responses.inc(endpoint=endpoint, fallback='direct')
+            return with_timing({
+                'success': True,
+                'user_id': user_id,
+                'action': action,
+                'mode': 'direct',
+                'result': result,
+                'degraded': True,
+                'fallback': 'direct',
+                'degraded_reason': str(error)
+            }, data, started)
+
+    raise error
+
+
+def degraded_answer(user_id, question, data, fmt, started, error):
+    """
+    Answer a Learning Assistant question the model could not serve (circuit breaker open or
+    deadline spent) with the knowledge base articles matching it, or return None when there
+    are none
+    """
+    try:
+        articles = run_direct_action('assistant', 'search_knowledge_base', data)
+    except DirectActionError:
+        articles = None
+    if not articles:
+        return None
+
+    api_metrics.degraded_responses.inc(endpoint='assistant', fallback='knowledge_base')
+    answer = "Je ne peux pas vous répondre en détail pour le moment. Voici les articles de la base de " \
+        "connaissances Edflex qui correspondent à votre question :\n\n" + \
+        "\n".join(f"- **{article['title']}** : {article['summary']}" for article in articles)
+    return with_timing({
+        'success': True,
+        'user_id': user_id,
+        'question': question,
+        'format': fmt,
+        'result': {'answer': answer, 'suggested_content': None, 'follow_up_questions': None} if fmt == 'structured' else answer,
+        'cached': False,
+        'degraded': True,
+        'fallback': 'knowledge_base',
+        'degraded_reason': str(error)
+    }, data, started)
+
+
+def sse_event(event, data):
+    """
+    Format a Server-Sent Events message with a JSON payload
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def stream_agent_events(pool, prompt, final_payload, lane='standard', route=None, on_result=None, fallback=None):
+    """
+    Stream an agent run as Server-Sent Events.
+
+    Emits `start` immediately, then `token` deltas, `tool_call_started` /
+    `tool_call_completed` and `reasoning_step` progress events, and finally `done`
+    with the same JSON contract as the non-streaming endpoint (or `error`).
+    `on_result` is called with the final result and the run's tool calls before `done` is sent.
+
+    The whole stream runs within the route's deadline budget, counted from the request's
+    arrival. Streams are not hedged: tokens already sent cannot be taken back for a hedge's.
+    When the breaker is open or the deadline is spent before any token was sent, `fallback`
+    (if given) is called with the error and its payload, if any, is sent as a degraded `done`.
+    """
+    yield sse_event('start', final_payload)
+
+    chunks = []
+    tools = []
+    started = time.perf_counter()
+    deadline = route['deadline_seconds'] if route is not None else resilience.default_deadline
+    deadline_at = (route['started'] if route is not None else started) + deadline
+    try:
+        budget = route['reasoning_budget'] if route is not None else None
+        tier = route['tier'] if route is not None else 'standard'
+
+        def remaining():
+            seconds = deadline_at - time.perf_counter()
+            if seconds <= 0:
+                raise DeadlineExceeded(f"Deadline of {deadline}s spent before the agent run started")
+            return seconds
+
+        with resilience.guard(tier), admitted(lane), pool.lease(min(remaining(), pool.checkout_timeout)) as agent, \
+                tool_memo.run_scope() as memo, reasoning_budgets.run_scope(budget) as reasoning:
+            for event in agent_runner.stream(
+                agent,
+                prompt,
+                timeout=deadline,
+                on_submit=lambda future: pool.release_after(agent, future),
+                deadline_at=deadline_at
+            ):
+                event_type = getattr(event, 'event', '')
+
+                if event_type == RunEvent.run_response_content.value:
+                    if isinstance(event.content, str) and event.content:
+                        chunks.append(event.content)
+                        yield sse_event('token', {'content': event.content})
+                elif event_type == RunEvent.tool_call_started.value:
+                    tool = event.tool
+                    if tool is not None:
+                        tools.append(tool)
+                    yield sse_event('tool_call_started', {
+                        'tool_name': tool.tool_name if tool else None,
+                        'tool_args': tool.tool_args if tool else None
+                    })
+                elif event_type == RunEvent.tool_call_completed.value:
+                    tool = event.tool
+                    yield sse_event('tool_call_completed', {
+                        'tool_name': tool.tool_name if tool else None,
+                        'duration_seconds': tool.metrics.time if tool and tool.metrics else None
+                    })
+                elif event_type == RunEvent.reasoning_step.value:
+                    yield sse_event('reasoning_step', {'content': str(event.content)})
+                elif event_type == RunEvent.run_completed.value and not chunks:
+                    # Non-streaming models only deliver the content in the completed event
+                    if event.content:
+                        chunks.append(str(event.content))
+                elif event_type == RunEvent.run_error.value:
+                    raise RuntimeError(event.content)
 
+            seconds = time.perf_counter() - started
+            api_metrics.observe_agent_run(pool.name, agent.run_response, seconds, memo.summary())
+            record_usage(agent.run_response, pool.name, route, tier)
+            api_metrics.observe_reasoning(pool.name, reasoning.summary())
+            if route is not None:
+                api_metrics.observe_route(route, seconds)
+
+        result = clean_agent_response(''.join(chunks))
+        if on_result is not None:
+            on_result(result, tools)
+        yield sse_event('done', {'success': True, **final_payload, 'result': result})
+
+    except AdmissionRejected as e:
+        yield sse_event('error', {'error': str(e), 'status': e.status_code, 'retry_after': e.retry_after})
+    except (CircuitOpenError, TimeoutError) as e:
+        deadline_spent = not isinstance(e, CircuitOpenError) and time.perf_counter() >= deadline_at
+        if deadline_spent:
+            api_metrics.deadline_exceeded.inc(endpoint=route['endpoint'] if route is not None else pool.name)
+        payload = None
+        if fallback is not None and not chunks and (isinstance(e, CircuitOpenError) or deadline_spent):
+            payload = fallback(e)
+        if payload is not None:
+            yield sse_event('done', {**final_payload, **payload})
+        elif isinstance(e, CircuitOpenError):
+            yield sse_event('error', {'error': str(e), 'status': e.status_code, 'retry_after': e.retry_after})
+        else:
+            yield sse_event('error', {'error': str(e), 'status': 504})
+    except Exception as e:
+        yield sse_event('error', {'error': str(e)})
+
+
+def sse_response(events):
+    """
+    Wrap an SSE generator in a streaming Flask response
+    """
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Disable proxy buffering so tokens flush immediately
+        }
+    )
+
+
+def run_profiler(user_id, action, data):
+    """
+    Run a Learner Profiler action and return the response payload
+    """
+    started = time.perf_counter()
+
+    # Deterministic actions can be served straight from their tool, without the LLM
+    if data.get('mode') == 'direct':
+        return direct_payload('profiler', 'learner_profiler', user_id, action, data)
+
+    fmt = response_format(data)
+    expected = expected_format('learner_profiler', action, fmt)
+
+    # The run's tier, reasoning budget and prompt mode are part of the cache and single-flight
+    # key: a request forcing the standard tier or more reasoning never gets a cheaper run's result
+    pool_name, route = route_pool('profiler', 'learner_profiler', action, data, structured=fmt == 'structured')
+
+    # Serve repeated requests from the response cache
+    cache_key = ('profiler', action, user_id, '', fmt, route['tier'], route['reasoning_budget'], route['prompt_mode'])
+    if not data.get('no_cache'):
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return with_timing({
+                'success': True,
+                'user_id': user_id,
+                'action': action,
+                'format': expected,
+                'profile_version': cached['profile_version'],
+                'result': cached['result'],
+                'cached': True
+            }, data, started)
+    generation = response_cache.generation(user_id)
+    # Reported when the run did not read the learner's profile
+    version_at_start = profile_snapshots.version(user_id)
+
+    # Build prompt based on action
+    prompt = build_profiler_prompt(user_id, action)
+
+    def execute():
+        # Run agent on an instance checked out from the pool
+        response, timing = run_pooled_agent(pool_name, prompt, route=route)
+
+        # Extract the validated fields, or the cleaned text
+        result, result_format = agent_result(response, 'learner_profiler', action, fmt)
+        # The version of the profile the run's tools actually read
+        version = timing['profile_versions'].get(user_id, version_at_start)
+
+        # A text fallback is not cached for structured requests (text-only actions are)
+        if result_format == expected:
+            response_cache.set(
+                cache_key,
+                {'result': result, 'profile_version': version},
+                ttl=response_cache.ttl_for('profiler', action),
+                generation=generation
+            )
+        return result, result_format, version, timing
+
+    # Concurrent identical requests wait for the first one instead of running again
+    try:
+        (result, result_format, version, timing), coalesced = single_flight.do(cache_key, execute)
+    except (CircuitOpenError, DeadlineExceeded) as e:
+        return degraded_payload('profiler', user_id, action, data, cache_key, expected, started, e)
+
+    return with_timing({
+        'success': True,
+        'user_id': user_id,
+        'action': action,
+        'format': result_format,
+        'profile_version': version,
+        'result': result,
+        'cached': False,
+        'coalesced': coalesced
+    }, data, started, timing)
+
+
+def run_recommender(user_id, action, data):
+    """
+    Run a Path Recommender action and return the response payload
+    """
+    started = time.perf_counter()
+    goal = data.get('goal', '')
+
+    # Deterministic actions can be served straight from their tool, without the LLM
+    if data.get('mode') == 'direct':
+        return direct_payload('recommender', 'path_recommender', user_id, action, data)
+
+    fmt = response_format(data)
+    expected = expected_format('path_recommender', action, fmt)
+
+    # The run's tier, reasoning budget and prompt mode are part of the cache and single-flight
+    # key: a request forcing the standard tier or more reasoning never gets a cheaper run's result
+    pool_name, route = route_pool('recommender', 'path_recommender', action, data, structured=fmt == 'structured')
+
+    # Serve repeated requests from the response cache
+    cache_key = ('recommender', action, user_id, goal, fmt, route['tier'], route['reasoning_budget'], route['prompt_mode'])
+    if not data.get('no_cache'):
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return with_timing({
+                'success': True,
+                'user_id': user_id,
+                'action': action,
+                'format': expected,
+                'profile_version': cached['profile_version'],
+                'result': cached['result'],
+                'cached': True
+            }, data, started)
+    generation = response_cache.generation(user_id)
+    # Reported when the run did not read the learner's profile
+    version_at_start = profile_snapshots.version(user_id)
+
+    # Build prompt based on action
+    prompt = build_recommender_prompt(user_id, action, goal)
+
+    def execute():
+        # Run agent on an instance checked out from the pool
+        response, timing = run_pooled_agent(pool_name, prompt, route=route)
+
+        # Extract the validated fields, or the cleaned text
+        result, result_format = agent_result(response, 'path_recommender', action, fmt)
+        # The version of the profile the run's tools actually read
+        version = timing['profile_versions'].get(user_id, version_at_start)
+
+        # A text fallback is not cached for structured requests (text-only actions are)
+        if result_format == expected:
+            response_cache.set(
+                cache_key,
+                {'result': result, 'profile_version': version},
+                ttl=response_cache.ttl_for('recommender', action),
+                generation=generation
+            )
+        return result, result_format, version, timing
+
+    # Concurrent identical requests wait for the first one instead of running again
+    try:
+        (result, result_format, version, timing), coalesced = single_flight.do(cache_key, execute)
+    except (CircuitOpenError, DeadlineExceeded) as e:
+        return degraded_payload('recommender', user_id, action, data, cache_key, expected, started, e)
+
+    return with_timing({
+        'success': True,
+        'user_id': user_id,
+        'action': action,
+        'format': result_format,
+        'profile_version': version,
+        'result': result,
+        'cached': False,
+        'coalesced': coalesced
+    }, data, started, timing)
+
+
+def request_data():
+    """
+    Return the JSON body, with `?mode=` / `?debug=` from the query string applied when given
+    """
+    data = request.json or {}
+    if request.args.get('mode'):
+        data = {**data, 'mode': request.args['mode']}
+    if request.args.get('debug'):
+        data = {**data, 'debug': request.args['debug'].lower() in ('1', 'true', 'yes')}
+    return data
+
+
+# Batch endpoint name -> (handler, default action)
+BATCH_HANDLERS = {
+    'profiler': (run_profiler, 'analyze_behavior'),
+    'recommender': (run_recommender, 'recommend_content')
+}
+
+
+@app.route('/api/profiler', methods=['POST'])
+def profiler():
+    """
+    Endpoint for Learner Profiler agent
+    """
+    try:
+        data = request_data()
+        user_id = data.get('user_id')
+        action = data.get('action', 'analyze_behavior')
+
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        return jsonify(run_profiler(user_id, action, data))
+
+    except (DirectActionError, ModelTierError, ReasoningBudgetError, ResponseFormatError, DeadlineError) as e:
+        return jsonify({'error': str(e)}), 400
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
+    except CircuitOpenError as e:
+        return circuit_open_response(e, 'profiler')
+    except TimeoutError as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -98,54 +963,244 @@ def recommender():
     Endpoint for Path Recommender agent
     """
     try:
-        data = request.json
+        data = request_data()
         user_id = data.get('user_id')
         action = data.get('action', 'recommend_content')
-        goal = data.get('goal', '')
 
         if not user_id:
             return jsonify({'error': 'user_id is required'}), 400
 
-        # Build prompt based on action
-        if action == 'recommend_content':
-            prompt = f"Recommander du contenu personnalisé pour user_id: {user_id}"
-        elif action == 'build_learning_path':
-            if goal:
-                prompt = f"Construire un parcours d'apprentissage pour user_id: {user_id} avec l'objectif: {goal}"
-            else:
-                prompt = f"Construire un parcours d'apprentissage pour user_id: {user_id}"
-        elif action == 'get_next_content':
-            prompt = f"Recommander le prochain meilleur contenu pour user_id: {user_id}"
-        elif action == 'check_prerequisites':
-            prompt = f"Vérifier les prérequis pour user_id: {user_id}"
-        else:
-            prompt = f"Recommander du contenu pour user_id: {user_id}"
+        return jsonify(run_recommender(user_id, action, data))
 
-        # Run agent
-        response = path_recommender.run(prompt)
+    except (DirectActionError, ModelTierError, ReasoningBudgetError, ResponseFormatError, DeadlineError) as e:
+        return jsonify({'error': str(e)}), 400
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
+    except CircuitOpenError as e:
+        return circuit_open_response(e, 'recommender')
+    except TimeoutError as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        # Extract and clean content
-        result = response.content if hasattr(response, 'content') else str(response)
-        result = clean_agent_response(result)
+
+def run_batch_item(handler, user_id, action, data):
+    """
+    Run one learner of a batch in the batch admission lane
+    """
+    with in_lane('batch'):
+        return handler(user_id, action, data)
+
+
+def stream_batch_results(handler, user_ids, action, data):
+    """
+    Run one action for many learners on the batch pool and yield NDJSON lines.
+
+    Each learner's result is emitted as soon as it completes; a failure is reported on
+    that learner's line without aborting the rest of the batch. The last line is a summary.
+    """
+    started = time.perf_counter()
+    futures = {
+        batch_executor.submit(run_batch_item, handler, user_id, action, {**data, 'user_id': user_id}): user_id
+        for user_id in user_ids
+    }
+    succeeded = 0
+    failed = 0
+
+    try:
+        for future in as_completed(futures):
+            user_id = futures[future]
+            try:
+                line = future.result()
+                succeeded += 1
+            except Exception as e:
+                line = {'success': False, 'user_id': user_id, 'action': action, 'error': str(e)}
+                failed += 1
+            yield json.dumps(line, default=str) + '\n'
+
+        yield json.dumps({'summary': {
+            'total': len(user_ids),
+            'succeeded': succeeded,
+            'failed': failed,
+            'duration_seconds': round(time.perf_counter() - started, 3)
+        }}) + '\n'
+    finally:
+        # Client went away: drop the learners that have not started yet
+        for future in futures:
+            future.cancel()
+
+
+def run_recommender_job(payload, report_progress):
+    """
+    Job handler executing a queued Path Recommender request
+    """
+    report_progress(0.1)
+    with in_lane('batch'):
+        return run_recommender(payload['user_id'], payload['action'], payload)
+
+
+job_queue.register('recommender', run_recommender_job)
+with startup_report.phase('start_job_queue'):
+    job_queue.start()
+
+
+# Old assistant turns are folded into the session summary by a tool-less agent on the fast
+# tier, on the sessions' background writer
+agent_pools['session_summarizer'] = AgentPool(
+    'session_summarizer', create_session_summarizer_agent, prepare=prepare_agent
+)
+
+
+def summarize_session(summary, turns):
+    """
+    Fold old assistant turns into a learner's session summary
+    """
+    prompt = build_session_summary_prompt(summary, turns)
+    response, _ = run_pooled_agent('session_summarizer', prompt, lane='batch', tier='fast')
+    return response.content if hasattr(response, 'content') else str(response)
+
+
+# Per-learner Learning Assistant sessions: a bounded window of recent turns plus a rolling
+# summary, persisted in SQLite by a background writer
+assistant_sessions = AssistantSessions(summarize=summarize_session)
+with startup_report.phase('start_assistant_sessions'):
+    assistant_sessions.start()
+
+# Tracked interactions are buffered and group-committed to their own SQLite WAL file
+# (see INTERACTION_STORE_*); each commit is reported on /metrics
+interaction_store.add_flush_listener(api_metrics.observe_interaction_flush)
+with startup_report.phase('start_interaction_store'):
+    interaction_store.start()
+
+
+def semantic_cache_intent(question, data, session):
+    """
+    Return the intent under which a question's answer is shared between learners through the
+    semantic cache, or None when the question must run the agent
+
+    A question asked within a learner's ongoing session is never shared: its prompt carries
+    the learner's turns and summary, and a follow-up may read as generic on its own.
+    """
+    if not SEMANTIC_CACHE_ENABLED or data.get('no_cache'):
+        return None
+    if session is not None and (session['turns'] or session['summary']):
+        return None
+    _, reason = model_router.classify_question(question)
+    return reason if reason in semantic_cache.intents else None
+
+
+def called_learner_tools(tools):
+    """
+    Return True when a run called a tool with a learner's user_id (progress, learner context,
+    logging...): its answer is personalised and must not be shared between learners
+    """
+    return any(isinstance(tool.tool_args, dict) and tool.tool_args.get('user_id') for tool in tools or [])
+
+
+def lookup_cached_answer(question, intent, scope):
+    """
+    Return the semantic cache hit (entry id, answer, similarity) for a question, or None
+    """
+    if intent is None:
+        return None
+    hit = semantic_cache.lookup(question, scope)
+    api_metrics.semantic_cache_lookups.inc(intent=intent, outcome='hit' if hit else 'miss')
+    return hit
+
+
+def assistant_session(user_id, data):
+    """
+    Return the learner's session context, or None when the request is answered statelessly
+    """
+    if not ASSISTANT_SESSIONS or data.get('session') is False:
+        return None
+    return assistant_sessions.context(user_id)
+
+
+@app.route('/api/recommender/jobs', methods=['POST'])
+def recommender_job_submit():
+    """
+    Submit a Path Recommender request as a background job (returns a job id to poll)
+    """
+    try:
+        data = request_data()
+        user_id = data.get('user_id')
+        action = data.get('action', 'build_learning_path')
+        goal = data.get('goal', '')
+
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        # The same learner/goal (with the same tier, reasoning and prompt overrides) already
+        # queued or running is returned instead of run twice
+        overrides = ':'.join(str(data.get(name) or '') for name in ('model_tier', 'reasoning_budget', 'prompt_mode'))
+        job_id, created = job_queue.submit(
+            'recommender',
+            {**data, 'user_id': user_id, 'action': action},
+            dedupe_key=f"{action}:{user_id}:{goal}:{overrides}"
+        )
 
         return jsonify({
             'success': True,
-            'user_id': user_id,
-            'action': action,
-            'result': result
-        })
+            'job_id': job_id,
+            'deduplicated': not created,
+            'status_url': f'/api/jobs/{job_id}'
+        }), 202
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Return a job's status, progress and (once finished) result
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+
+    return jsonify(job)
+
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """
+    Endpoint running a profiler/recommender action for a list of learners (NDJSON stream)
+    """
+    data = request_data()
+    endpoint = data.get('endpoint', 'profiler')
+    user_ids = data.get('user_ids')
+
+    if endpoint not in BATCH_HANDLERS:
+        return jsonify({'error': f"endpoint must be one of: {', '.join(BATCH_HANDLERS)}"}), 400
+
+    if not isinstance(user_ids, list) or not user_ids or not all(isinstance(u, str) and u for u in user_ids):
+        return jsonify({'error': 'user_ids must be a non-empty list of user ids'}), 400
+
+    if len(user_ids) > BATCH_MAX_USERS:
+        return jsonify({'error': f'At most {BATCH_MAX_USERS} user_ids per batch'}), 400
+
+    handler, default_action = BATCH_HANDLERS[endpoint]
+    action = data.get('action', default_action)
+    # Duplicate ids would only run the same work twice
+    user_ids = list(dict.fromkeys(user_ids))
+
+    return Response(
+        stream_with_context(stream_batch_results(handler, user_ids, action, data)),
+        mimetype='application/x-ndjson',
+        headers={'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/assistant', methods=['POST'])
 def assistant():
     """
     Endpoint for Learning Assistant agent
     """
     try:
-        data = request.json
+        started = time.perf_counter()
+        data = request_data()
         user_id = data.get('user_id')
         question = data.get('question')
 
@@ -155,27 +1210,245 @@ def assistant():
         if not question:
             return jsonify({'error': 'question is required'}), 400
 
-        # Build prompt
-        prompt = f"User {user_id} demande: {question}"
+        fmt = response_format(data)
+        session = assistant_session(user_id, data)
 
-        # Run agent
-        response = learning_assistant.run(prompt)
+        # Generic questions already answered for any learner are served from the semantic cache
+        intent = semantic_cache_intent(question, data, session)
+        hit = lookup_cached_answer(question, intent, fmt)
+        if hit is not None:
+            entry_id, result, similarity = hit
+            if session is not None:
+                answer = result['answer'] if fmt == 'structured' else result
+                assistant_sessions.record_turn(user_id, question, answer)
+            return jsonify(with_timing({
+                'success': True,
+                'user_id': user_id,
+                'question': question,
+                'format': fmt,
+                'result': result,
+                'cached': True,
+                'semantic_cache': {'id': entry_id, 'similarity': similarity}
+            }, data, started))
 
-        # Extract and clean content
-        result = response.content if hasattr(response, 'content') else str(response)
-        result = clean_agent_response(result)
+        # Build prompt, with the learner's recent turns and session summary
+        prompt = build_assistant_prompt(user_id, question, session)
 
-        return jsonify({
+        # Run agent on an instance checked out from the pool, on the tier the question needs
+        pool_name, route = route_pool(
+            'assistant', 'learning_assistant', None, data, question=question, structured=fmt == 'structured'
+        )
+        try:
+            response, timing = run_pooled_agent(pool_name, prompt, lane='interactive', route=route)
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            degraded = degraded_answer(user_id, question, data, fmt, started, e)
+            if degraded is None:
+                raise
+            return jsonify(degraded)
+
+        # Extract the validated fields, or the cleaned text
+        result, result_format = agent_result(response, 'learning_assistant', None, fmt)
+
+        if session is not None:
+            answer = result['answer'] if result_format == 'structured' else result
+            assistant_sessions.record_turn(user_id, question, answer)
+            timing['session'] = {'turns': len(session['turns']), 'summary': bool(session['summary'])}
+
+        # A text fallback is not cached for structured requests, nor an answer built from learner data
+        if intent is not None and result_format == fmt and not called_learner_tools(getattr(response, 'tools', None)):
+            semantic_cache.store(question, result, scope=fmt, intent=intent)
+
+        return jsonify(with_timing({
             'success': True,
             'user_id': user_id,
             'question': question,
-            'result': result
-        })
+            'format': result_format,
+            'result': result,
+            'cached': False
+        }, data, started, timing))
 
+    except (ModelTierError, ReasoningBudgetError, ResponseFormatError, DeadlineError) as e:
+        return jsonify({'error': str(e)}), 400
+    except AdmissionRejected as e:
+        return admission_rejected_response(e)
+    except CircuitOpenError as e:
+        return circuit_open_response(e, 'assistant')
+    except TimeoutError as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/profiler/stream', methods=['POST'])
+def profiler_stream():
+    """
+    Streaming (SSE) endpoint for Learner Profiler agent
+    """
+    data = request.json or {}
+    user_id = data.get('user_id')
+    action = data.get('action', 'analyze_behavior')
+
+    if not user_id:
+        return jsonify({'error': 'user_id is required'}), 400
+
+    try:
+        pool_name, route = route_pool('profiler', 'learner_profiler', action, data)
+    except (ModelTierError, ReasoningBudgetError, DeadlineError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    prompt = build_profiler_prompt(user_id, action)
+    return sse_response(stream_agent_events(
+        agent_pools[pool_name], prompt, {'user_id': user_id, 'action': action}, route=route
+    ))
+
+
+@app.route('/api/recommender/stream', methods=['POST'])
+def recommender_stream():
+    """
+    Streaming (SSE) endpoint for Path Recommender agent
+    """
+    data = request.json or {}
+    user_id = data.get('user_id')
+    action = data.get('action', 'recommend_content')
+    goal = data.get('goal', '')
+
+    if not user_id:
+        return jsonify({'error': 'user_id is required'}), 400
+
+    try:
+        pool_name, route = route_pool('recommender', 'path_recommender', action, data)
+    except (ModelTierError, ReasoningBudgetError, DeadlineError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    prompt = build_recommender_prompt(user_id, action, goal)
+    return sse_response(stream_agent_events(
+        agent_pools[pool_name], prompt, {'user_id': user_id, 'action': action}, route=route
+    ))
+
+
+@app.route('/api/assistant/stream', methods=['POST'])
+def assistant_stream():
+    """
+    Streaming (SSE) endpoint for Learning Assistant agent
+    """
+    data = request.json or {}
+    user_id = data.get('user_id')
+    question = data.get('question')
+
+    if not user_id:
+        return jsonify({'error': 'user_id is required'}), 400
+
+    if not question:
+        return jsonify({'error': 'question is required'}), 400
+
+    try:
+        pool_name, route = route_pool('assistant', 'learning_assistant', None, data, question=question)
+    except (ModelTierError, ReasoningBudgetError, DeadlineError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    session = assistant_session(user_id, data)
+    final_payload = {'user_id': user_id, 'question': question}
+
+    # Streams carry the text answer
+    intent = semantic_cache_intent(question, data, session)
+    hit = lookup_cached_answer(question, intent, 'text')
+    if hit is not None:
+        entry_id, result, similarity = hit
+        if session is not None:
+            assistant_sessions.record_turn(user_id, question, result)
+        return sse_response(cached_answer_events(final_payload, result, entry_id, similarity))
+
+    def on_result(result, tools):
+        if session is not None:
+            assistant_sessions.record_turn(user_id, question, result)
+        if intent is not None and not called_learner_tools(tools):
+            semantic_cache.store(question, result, scope='text', intent=intent)
+
+    def fallback(error):
+        return degraded_answer(user_id, question, data, 'text', route['started'], error)
+
+    prompt = build_assistant_prompt(user_id, question, session)
+    return sse_response(stream_agent_events(
+        agent_pools[pool_name], prompt, final_payload, lane='interactive', route=route, on_result=on_result,
+        fallback=fallback
+    ))
+
+
+def cached_answer_events(final_payload, result, entry_id, similarity):
+    """
+    Stream a semantic cache hit with the same events as an agent run
+    """
+    yield sse_event('start', final_payload)
+    yield sse_event('token', {'content': result})
+    yield sse_event('done', {
+        'success': True, **final_payload, 'result': result,
+        'cached': True, 'semantic_cache': {'id': entry_id, 'similarity': similarity}
+    })
+
+
+@app.route('/api/assistant/session/<user_id>', methods=['DELETE'])
+def assistant_session_reset(user_id):
+    """
+    Forget a learner's Learning Assistant session (recent turns and summary)
+    """
+    assistant_sessions.reset(user_id)
+    return jsonify({'success': True, 'user_id': user_id})
+
+
+@app.route('/api/assistant/cache', methods=['GET'])
+def assistant_cache_entries():
+    """
+    List the semantic cache entries with their hit counts, most hit first (`?limit=`, default 50)
+    """
+    limit = request.args.get('limit', default=50, type=int)
+    return jsonify({'stats': semantic_cache.stats(), 'entries': semantic_cache.entries(limit)})
+
+
+@app.route('/api/assistant/cache', methods=['DELETE'])
+@app.route('/api/assistant/cache/<int:entry_id>', methods=['DELETE'])
+def assistant_cache_purge(entry_id=None):
+    """
+    Purge the semantic cache, or one entry of it
+    """
+    return jsonify({'success': True, 'removed': semantic_cache.purge(entry_id)})
+
+
+@app.route('/api/usage', methods=['GET'])
+def usage_totals():
+    """
+    Token and cost totals of agent runs, optionally broken down with
+    `?group_by=endpoint|action|agent|user|tool` (`&limit=`, default 20, largest first)
+    """
+    group_by = request.args.get('group_by')
+    limit = request.args.get('limit', default=20, type=int)
+    try:
+        return jsonify(token_ledger.totals(group_by, limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/api/usage/<user_id>', methods=['GET'])
+def user_usage(user_id):
+    """
+    Token and cost totals charged to one learner
+    """
+    totals = token_ledger.user(user_id)
+    if totals is None:
+        return jsonify({'error': f'No usage recorded for {user_id}'}), 404
+    return jsonify({'user_id': user_id, **totals})
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus metrics endpoint (request, agent run, LLM call and tool call latencies, tokens)
+    """
+    api_metrics.observe_admission_stats(admission.stats())
+    api_metrics.observe_resilience_stats(resilience.stats())
+    api_metrics.observe_interaction_store_stats(interaction_store.stats())
+    return Response(api_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """
@@ -187,19 +1460,47 @@ def health():
             'learner_profiler': 'active',
             'path_recommender': 'active',
             'learning_assistant': 'active'
-        }
+        },
+        'pools': {name: pool.stats() for name, pool in list(agent_pools.items())},
+        'cache': response_cache.stats(),
+        'semantic_cache': semantic_cache.stats(),
+        'profile_snapshots': profile_snapshots.stats(),
+        'prompt_cache': api_metrics.prompt_cache_stats(),
+        'usage': token_ledger.stats(),
+        'single_flight': single_flight.stats(),
+        'tool_memo': tool_memo.stats(),
+        'tool_dispatch': tool_dispatcher.stats(),
+        'model_router': model_router.stats(),
+        'reasoning': reasoning_budgets.stats(),
+        'resilience': resilience.stats(),
+        'assistant_sessions': assistant_sessions.stats(),
+        'interaction_store': interaction_store.stats(),
+        'admission': admission.stats(),
+        'runner': agent_runner.stats(),
+        'jobs': job_queue.stats(),
+        'startup': startup_report.report()
     })
 
 
+startup_report.mark_ready()
+print(f"[OK] API ready in {startup_report.ready_ms} ms")
+
+
 if __name__ == '__main__':
     print("\n" + "="*50)
     print("Edflex Personalised Learning API")
     print("="*50)
     print("Server running on http://localhost:5000")
+    print(f"Serving mode: {agent_runner.mode} (max {agent_runner.max_concurrency} concurrent agent runs)")
     print("Learner Profiler: /api/profiler")
     print("Path Recommender: /api/recommender")
-    print("Learning Assistant: /api/assistant")
+    print("Learning Assistant: /api/assistant (sessions: /api/assistant/session/<user_id>)")
+    print("Batch (NDJSON): /api/batch")
+    print("Jobs: /api/recommender/jobs, /api/jobs/<job_id>")
+    print("Streaming (SSE): /api/profiler/stream, /api/recommender/stream, /api/assistant/stream")
+    print("Metrics (Prometheus): /metrics")
+    print("Token usage and cost: /api/usage, /api/usage/<user_id>")
     print("Health Check: /health")
     print("="*50 + "\n")
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,15 @@
+"""
+ASGI entrypoint for the Edflex Personalised Learning API
+
+Serves the Flask app behind an ASGI server so the process can hold many open
+connections while agent runs overlap on the shared AgentRunner event loop.
+
+Usage:
+    uvicorn asgi:asgi_app --app-dir backend --host 0.0.0.0 --port 5000
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+from api import app
+
+asgi_app = WsgiToAsgi(app)
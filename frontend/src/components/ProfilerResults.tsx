@@ -4,11 +4,62 @@ interface ProfilerResultsProps {
   data: {
     user_id: string;
     action: string;
-    result: string;
+    format?: 'structured' | 'text';
+    mode?: 'direct';
+    narrative?: string;
+    result: string | Record<string, any> | any[];
   };
 }
 
+// Profile sections rendered as cards; anything else is shown as JSON in the analysis
+const RENDERED_FIELDS = [
+  'user_id', 'learning_style', 'learning_styles', 'engagement_metrics', 'behavioral_patterns',
+  'skill_profile', 'content_preferences', 'summary', 'insights'
+];
+
+const CHURN_LABELS: Record<string, string> = { low: 'Faible', medium: 'Moyen', high: 'Élevé' };
+
 const ProfilerResults: React.FC<ProfilerResultsProps> = ({ data }) => {
+  // Structured responses carry the profile fields directly; direct-mode (and degraded)
+  // responses carry the tool's own result, which uses some of the same fields
+  const fromProfile = (profile: Record<string, any>) => {
+    const scores = profile.learning_style?.scores || profile.learning_styles || {};
+    const engagement = profile.engagement_metrics || profile;
+    const behavior = profile.behavioral_patterns || profile;
+    const skills = profile.skill_profile || profile;
+    const preferences = profile.content_preferences || {};
+    const unknown = Object.fromEntries(Object.entries(profile).filter(([key]) => !RENDERED_FIELDS.includes(key)));
+    const text = [profile.summary, ...(profile.insights || [])].filter(Boolean).join('\n\n');
+    return {
+      visual: Math.round(scores.visual || 0),
+      auditory: Math.round(scores.auditory || 0),
+      kinesthetic: Math.round(scores.kinesthetic || 0),
+      engagement: Math.round(engagement.engagement_score || 0),
+      completion: Math.round(engagement.completion_rate_percent || 0),
+      autonomy: Math.round(engagement.autonomy_score || 0),
+      currentSkills: skills.current_skills
+        ? skills.current_skills.map((s: any) => s.proficiency ? `${s.skill} (${s.proficiency})` : s.skill)
+        : null,
+      skillGaps: skills.skill_gaps
+        ? skills.skill_gaps.map((g: any) => g.priority ? `${g.skill} (${g.priority})` : g.skill)
+        : null,
+      sessionMinutes: behavior.avg_session_duration_minutes ?? null,
+      sessionsPerWeek: behavior.sessions_per_week ?? null,
+      churnRisk: engagement.risk_of_churn ?? null,
+      preferences: [
+        ['Format préféré', preferences.preferred_format],
+        ['Durée optimale', preferences.optimal_duration_minutes != null ? `${preferences.optimal_duration_minutes} min` : null],
+        ['Difficulté', preferences.preferred_difficulty],
+        ['Langue', preferences.preferred_language],
+        ['Éditeurs favoris', preferences.favorite_publishers?.join(', ')],
+        ['Rythme', profile.behavioral_patterns?.learning_pace],
+        ['Heures de pointe', profile.behavioral_patterns?.peak_learning_hours?.join(', ')]
+      ].filter(([, value]) => value) as [string, string][],
+      rawText: [text, Object.keys(unknown).length ? JSON.stringify(unknown, null, 2) : '']
+        .filter(Boolean).join('\n\n')
+    };
+  };
+
   // Parse the result text to extract data
   const parseResult = (text: string) => {
     // Extract learning style scores
@@ -28,11 +79,25 @@ const ProfilerResults: React.FC<ProfilerResultsProps> = ({ data }) => {
       engagement: engagementMatch ? parseInt(engagementMatch[1]) : 0,
       completion: completionMatch ? parseInt(completionMatch[1]) : 0,
       autonomy: autonomyMatch ? parseInt(autonomyMatch[1]) : 0,
+      currentSkills: null,
+      skillGaps: null,
+      sessionMinutes: null,
+      sessionsPerWeek: null,
+      churnRisk: null,
+      preferences: [] as [string, string][],
       rawText: text
     };
   };
 
-  const parsed = parseResult(data.result);
+  // Tool results (direct mode) may be a list, e.g. the behavior history
+  const parseAny = (result: ProfilerResultsProps['data']['result']) => {
+    if (typeof result === 'string') return parseResult(result);
+    if (Array.isArray(result)) return { ...parseResult(''), rawText: JSON.stringify(result, null, 2) };
+    return fromProfile(result);
+  };
+
+  const parsed = parseAny(data.result);
+  const analysis = [data.narrative, parsed.rawText].filter(Boolean).join('\n\n');
 
   // Progress bar component
   const ProgressBar: React.FC<{ label: string; value: number; max?: number; color: string }> = ({ label, value, max = 100, color }) => {
@@ -114,15 +179,17 @@ const ProfilerResults: React.FC<ProfilerResultsProps> = ({ data }) => {
             <div className="competency-section">
               <div className="section-title">✅ Compétences Actuelles</div>
               <div className="competency-badges">
-                <span className="badge badge-success">Marketing Digital</span>
-                <span className="badge badge-success">Social Media</span>
+                {(parsed.currentSkills || ['Marketing Digital', 'Social Media']).map((skill: string) => (
+                  <span key={skill} className="badge badge-success">{skill}</span>
+                ))}
               </div>
             </div>
             <div className="competency-section">
               <div className="section-title">⚠️ Lacunes Identifiées</div>
               <div className="competency-badges">
-                <span className="badge badge-warning">Data Analytics</span>
-                <span className="badge badge-warning">SEO Strategy</span>
+                {(parsed.skillGaps || ['Data Analytics', 'SEO Strategy']).map((gap: string) => (
+                  <span key={gap} className="badge badge-warning">{gap}</span>
+                ))}
               </div>
             </div>
           </div>
@@ -139,27 +206,49 @@ const ProfilerResults: React.FC<ProfilerResultsProps> = ({ data }) => {
               <div className="activity-stat">
                 <span className="stat-icon">⏱️</span>
                 <div className="stat-info">
-                  <div className="stat-value">25 min</div>
+                  <div className="stat-value">{parsed.sessionMinutes ?? 25} min</div>
                   <div className="stat-label">Session moyenne</div>
                 </div>
               </div>
               <div className="activity-stat">
                 <span className="stat-icon">📅</span>
                 <div className="stat-info">
-                  <div className="stat-value">4.2/semaine</div>
+                  <div className="stat-value">{parsed.sessionsPerWeek ?? 4.2}/semaine</div>
                   <div className="stat-label">Fréquence</div>
                 </div>
               </div>
               <div className="activity-stat">
                 <span className="stat-icon">🔥</span>
                 <div className="stat-info">
-                  <div className="stat-value">Faible</div>
+                  <div className="stat-value">{parsed.churnRisk ? CHURN_LABELS[parsed.churnRisk] || parsed.churnRisk : 'Faible'}</div>
                   <div className="stat-label">Risque churn</div>
                 </div>
               </div>
             </div>
           </div>
         </div>
+
+        {/* Content Preferences Card */}
+        {parsed.preferences.length > 0 && (
+          <div className="stat-card preferences-card">
+            <div className="card-header">
+              <span className="card-icon">🎬</span>
+              <h3>Préférences de Contenu</h3>
+            </div>
+            <div className="card-body">
+              <div className="activity-stats">
+                {parsed.preferences.map(([label, value]) => (
+                  <div key={label} className="activity-stat">
+                    <div className="stat-info">
+                      <div className="stat-value">{value}</div>
+                      <div className="stat-label">{label}</div>
+                    </div>
+                  </div>
+                ))}
+              </div>
+            </div>
+          </div>
+        )}
       </div>
 
       {/* Full Text Analysis */}
@@ -169,7 +258,7 @@ const ProfilerResults: React.FC<ProfilerResultsProps> = ({ data }) => {
           <h3>Analyse Détaillée Complète</h3>
         </div>
         <div className="analysis-content">
-          {parsed.rawText || data.result || 'No analysis available'}
+          {analysis || 'No analysis available'}
         </div>
       </div>
     </div>
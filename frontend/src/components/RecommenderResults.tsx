@@ -4,11 +4,32 @@ interface RecommenderResultsProps {
   data: {
     user_id: string;
     action: string;
-    result: string;
+    format?: 'structured' | 'text';
+    result: string | Record<string, any>;
   };
 }
 
 const RecommenderResults: React.FC<RecommenderResultsProps> = ({ data }) => {
+  // Structured responses: a recommendation list, or a learning path shown as its ordered items
+  const fromStructured = (result: Record<string, any>) => {
+    if (Array.isArray(result.phases)) {
+      const recommendations = result.phases.flatMap((phase: any) =>
+        (phase.content_items || []).map((item: any) => ({
+          ...item,
+          rank: item.sequence,
+          explanation: item.why_included,
+          recommendation_reason: phase.phase_name
+        }))
+      );
+      const finalRecommendation = {
+        recommendations,
+        context: { primary_goal: result.summary, skill_focus: result.skill_target }
+      };
+      return { userProfile: null, recommendations, finalRecommendation };
+    }
+    return { userProfile: null, recommendations: result.recommendations || [], finalRecommendation: result };
+  };
+
   // Parse JSON and Python dict data from the response
   const parseData = (text: string) => {
     try {
@@ -57,7 +78,7 @@ const RecommenderResults: React.FC<RecommenderResultsProps> = ({ data }) => {
     }
   };
 
-  const parsed = parseData(data.result);
+  const parsed = typeof data.result === 'string' ? parseData(data.result) : fromStructured(data.result);
 
   // Progress bar component
   const ProgressBar: React.FC<{ label: string; value: number; max?: number; color: string }> =
@@ -1,5 +1,4 @@
 import React, { useState } from 'react';
-import axios from 'axios';
 import AssistantResults from '../components/AssistantResults';
 
 interface ResponseData {
@@ -15,24 +14,64 @@ const LearningAssistant: React.FC = () => {
   const [loading, setLoading] = useState(false);
   const [result, setResult] = useState<ResponseData | null>(null);
   const [error, setError] = useState('');
+  const [progress, setProgress] = useState('');
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     setLoading(true);
     setError('');
     setResult(null);
+    setProgress('');
 
     try {
-      const response = await axios.post('http://localhost:5000/api/assistant', {
-        user_id: userId,
-        question: question
-      }, {
-        timeout: 120000 // 2 minutes timeout
+      // Stream the answer (Server-Sent Events) so tokens render as they arrive
+      const response = await fetch('http://localhost:5000/api/assistant/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ user_id: userId, question: question })
       });
 
-      setResult(response.data);
+      if (!response.ok || !response.body) {
+        const body = await response.json().catch(() => ({}));
+        throw new Error(body.error || 'An error occurred while processing your request.');
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let text = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const messages = buffer.split('\n\n');
+        buffer = messages.pop() || '';
+
+        for (const message of messages) {
+          const eventLine = message.split('\n').find(line => line.startsWith('event: '));
+          const dataLine = message.split('\n').find(line => line.startsWith('data: '));
+          if (!eventLine || !dataLine) continue;
+
+          const event = eventLine.slice('event: '.length);
+          const payload = JSON.parse(dataLine.slice('data: '.length));
+
+          if (event === 'token') {
+            text += payload.content;
+            setResult({ success: true, user_id: userId, question: question, result: text });
+          } else if (event === 'tool_call_started') {
+            setProgress(`🔧 ${payload.tool_name}...`);
+          } else if (event === 'done') {
+            setResult(payload);
+            setProgress('');
+          } else if (event === 'error') {
+            throw new Error(payload.error);
+          }
+        }
+      }
     } catch (err: any) {
-      setError(err.response?.data?.error || 'An error occurred while processing your request.');
+      setError(err.message || 'An error occurred while processing your request.');
     } finally {
       setLoading(false);
     }
@@ -77,10 +116,11 @@ const LearningAssistant: React.FC = () => {
         </button>
       </form>
 
+      {/* Stays up while the answer streams in: tool calls can start after the first tokens */}
       {loading && (
         <div className="loading">
           <div className="loading-spinner"></div>
-          <p>🤖 Assistant is analyzing your question... This may take 30-60 seconds</p>
+          <p>{result ? '🤖 Assistant is answering...' : '🤖 Assistant is analyzing your question...'} {progress}</p>
         </div>
       )}
 
@@ -6,7 +6,8 @@ interface ResponseData {
   success: boolean;
   user_id: string;
   action: string;
-  result: string;
+  format?: 'structured' | 'text';
+  result: string | Record<string, any>;
 }
 
 const PathRecommender: React.FC = () => {